@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+arcade.py
+A benchmark of how many rule evaluations per second the offline arcade interpreter makes
+
+Every rule is run against features that fill in the fields the rule reads with a rotating set of values, and the
+spatial rules read a grid of county, city and zip code squares.
+
+Usage:
+    python benchmarks/arcade.py [evaluations]
+"""
+
+import itertools
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import rules  # noqa: E402
+from services import analyzer, arcade, geometry  # noqa: E402
+
+VALUES = [None, 1, 5, "OT", "Y", "{0F6C4B3B-1234-4C5D-9E8F-ABCDEF012345}", datetime(2020, 1, 1)]
+
+
+def square(x, y, size):
+    return geometry.Polygon([[(x, y), (x, y + size), (x + size, y + size), (x + size, y)]])
+
+
+def build_store(size=10):
+    store = arcade.FeatureStore()
+    store.add_relationship("FacilityToContact", "UICFacility", "UICContact", "GUID", "Facility_FK")
+
+    for row, column in itertools.product(range(size), range(size)):
+        number = row * size + column
+        store.add("Counties", {"FIPS": number * 2 + 1}, square(column * 10, row * 10, 10))
+        store.add("Municipalities", {"NAME": "city {}".format(number)}, square(column * 10 + 5, row * 10 + 5, 10))
+        store.add("ZipCodes", {"ZIP5": 84000 + number}, square(column * 10, row * 10 + 5, 10))
+        store.add(
+            "UICFacility", {"GUID": "{{{}}}".format(number), "CountyFIPS": 49001}, square(column * 10, row * 10, 2)
+        )
+
+    return store
+
+
+def build_features(rule, table, count):
+    fields = sorted(analyzer.analyze(rule.arcade).fields) or ["guid"]
+    features = []
+
+    for index in range(count):
+        attributes = {field: VALUES[(index + position) % len(VALUES)] for position, field in enumerate(fields)}
+        shape = square(index % 97, index % 89, 3)
+        features.append(arcade.Feature(attributes, shape, table))
+
+    return features
+
+
+def main():
+    evaluations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    store = build_store()
+    total = 0
+    elapsed = 0.0
+    failures = 0
+
+    for name in rules.NAMES:
+        module = rules.load(name)
+
+        for rule in module.RULES:
+            program = arcade.compile_script(rule.arcade)
+            features = build_features(rule, module.TABLE, evaluations)
+
+            start = time.perf_counter()
+            for feature in features:
+                try:
+                    program.evaluate(feature, store)
+                except arcade.ArcadeError:
+                    failures += 1
+            duration = time.perf_counter() - start
+
+            total += len(features)
+            elapsed += duration
+            print("{:<20} {:<40} {:>10.0f}/s".format(name, rule.rule_name, len(features) / duration))
+
+    print(
+        "{} evaluations of {} scripts in {:.2f}s, {:.0f} per second, {} raised errors".format(
+            total, len(arcade._programs), elapsed, total / elapsed, failures
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+location.py
+A benchmark of the facility location rule against the three single field calculations it replaced
+
+Every facility insert is evaluated with the offline arcade interpreter against a local stand in grid of counties with
+smaller overlapping cities and zip codes. The single field calculations are kept in benchmarks/baseline.
+
+Usage:
+    python benchmarks/location.py [inserts]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import rules  # noqa: E402
+from services import arcade, geometry  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baseline"
+
+SCRIPTS = {
+    "CountyFIPS": "fipsCalculation",
+    "FacilityCity": "cityCalculation",
+    "FacilityZIP": "zipCalculation",
+}
+
+
+def square(x, y, size):
+    return geometry.Polygon([[(x, y), (x, y + size), (x + size, y + size), (x + size, y)]])
+
+
+def build_store(generator):
+    store = arcade.FeatureStore()
+
+    for index in range(30):
+        store.add("Counties", {"FIPS": index * 2 + 1}, square(index % 6 * 100, index // 6 * 100, 100))
+
+    for index in range(250):
+        shape = square(generator.uniform(0, 580), generator.uniform(0, 480), 20)
+        store.add("Municipalities", {"NAME": "city {}".format(index)}, shape)
+
+    for index in range(300):
+        store.add("ZipCodes", {"ZIP5": 84000 + index}, square(generator.uniform(0, 560), generator.uniform(0, 460), 40))
+
+    return store
+
+
+def separate(scripts, feature, store):
+    """the three rules each evaluated on their own, an error in any one rejects the insert"""
+    attributes = {}
+
+    for field, script in scripts.items():
+        result = script.evaluate(feature, store)
+
+        if isinstance(result, dict) and "errorMessage" in result:
+            return result
+
+        attributes[field] = result
+
+    return {"result": {"attributes": attributes}}
+
+
+def main():
+    inserts = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    generator = random.Random(0)
+    store = build_store(generator)
+    features = [
+        arcade.Feature({}, square(generator.uniform(0, 595), generator.uniform(0, 495), 5), "UICFacility")
+        for _ in range(inserts)
+    ]
+
+    scripts = {
+        field: arcade.compile_script((BASELINE / "{}.js".format(name)).read_text()) for field, name in SCRIPTS.items()
+    }
+    combined = arcade.compile_script(rules.load("facility").location_calculation.arcade)
+
+    start = time.perf_counter()
+    expected = [separate(scripts, feature, store) for feature in features]
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [combined.evaluate(feature, store) for feature in features]
+    duration = time.perf_counter() - start
+
+    for feature, result, wanted in zip(features, results, expected, strict=True):
+        assert arcade.calculated_attributes(result) == arcade.calculated_attributes(wanted), feature.geometry.extent
+
+    rejected = sum(1 for result in results if not arcade.calculated_attributes(result))
+
+    print("{} inserts, {} rejected without a zip code".format(inserts, rejected))
+    print("{:<24} {:>8.3f}s {:>8.3f}ms per insert".format("three calculations", baseline, baseline / inserts * 1000))
+    print(
+        "{:<24} {:>8.3f}s {:>8.3f}ms per insert {:>6.1f}x".format(
+            "one location calculation", duration, duration / inserts * 1000, baseline / duration
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
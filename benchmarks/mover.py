@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+mover.py
+A benchmark of copying a facility field to its wells a row at a time, a changed chunk at a time and as one update
+
+The geodatabase is stood in for by an in memory sqlite database with a facility for every ten wells. Half of the
+wells already have their facility's value, like a move that was interrupted and is run again.
+
+Usage:
+    python benchmarks/mover.py [wells ...]
+"""
+
+import random
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from services import mover  # noqa: E402
+
+MOVE = {
+    "from_table": "UICFacility",
+    "key": "GUID",
+    "field": "FacilityType",
+    "to_table": "UICWell",
+    "foreign_key": "Facility_FK",
+    "to_field": "ClassIFacilityType",
+}
+TYPES = ["C", "I", "M", None]
+CHUNK_SIZE = 10000
+
+
+def build(wells):
+    generator = random.Random(0)
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE UICFacility (GUID TEXT PRIMARY KEY, FacilityType TEXT)")
+    connection.execute("CREATE TABLE UICWell (OBJECTID INTEGER PRIMARY KEY, Facility_FK TEXT, ClassIFacilityType TEXT)")
+
+    facilities = [("{{{:08d}}}".format(index), generator.choice(TYPES)) for index in range(max(wells // 10, 1))]
+    connection.executemany("INSERT INTO UICFacility VALUES (?, ?)", facilities)
+
+    rows = []
+
+    for objectid in range(1, wells + 1):
+        guid, value = generator.choice(facilities)
+        rows.append((objectid, guid, value if objectid % 2 else None))
+
+    connection.executemany("INSERT INTO UICWell VALUES (?, ?, ?)", rows)
+    connection.commit()
+
+    return connection
+
+
+def row_at_a_time(connection):
+    """the original migration, every well with a facility is written whether it changed or not"""
+    values = dict(connection.execute("SELECT GUID, FacilityType FROM UICFacility"))
+    rows = connection.execute("SELECT OBJECTID, Facility_FK FROM UICWell").fetchall()
+
+    for objectid, foreign_key in rows:
+        if foreign_key not in values:
+            continue
+
+        connection.execute(
+            "UPDATE UICWell SET ClassIFacilityType = ? WHERE OBJECTID = ?", (values[foreign_key], objectid)
+        )
+
+    return len(rows)
+
+
+def changed_chunks(connection):
+    values = dict(connection.execute("SELECT GUID, FacilityType FROM UICFacility"))
+    rows = connection.execute("SELECT OBJECTID, Facility_FK, ClassIFacilityType FROM UICWell")
+    changes = list(mover.find_changes(rows, values))
+
+    for chunk in mover.chunks(changes, CHUNK_SIZE):
+        connection.executemany(
+            "UPDATE UICWell SET ClassIFacilityType = ? WHERE OBJECTID = ?",
+            [(value, objectid) for objectid, value in chunk],
+        )
+
+    return len(changes)
+
+
+def one_update(connection):
+    count = connection.execute(mover.count_sql(MOVE)).fetchone()[0]
+    connection.execute(mover.update_sql(MOVE))
+
+    return count
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [10000, 100000, 1000000]
+    methods = [("row at a time", row_at_a_time), ("changed chunks", changed_chunks), ("one update", one_update)]
+
+    for wells in sizes:
+        results = []
+
+        for label, method in methods:
+            connection = build(wells)
+
+            start = time.perf_counter()
+            written = method(connection)
+            connection.commit()
+            duration = time.perf_counter() - start
+
+            results.append(connection.execute("SELECT * FROM UICWell ORDER BY OBJECTID").fetchall())
+            print(
+                "{:>8} wells {:<16} {:>8} written {:>8.3f}s {:>12.0f} wells/s".format(
+                    wells, label, written, duration, wells / duration
+                )
+            )
+
+        assert all(result == results[0] for result in results[1:])
+
+
+if __name__ == "__main__":
+    main()
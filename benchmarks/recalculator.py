@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+recalculator.py
+A benchmark of recalculating facility locations in bulk against running the calculation rules a row at a time
+
+The boundaries are a local stand in grid of counties with smaller overlapping cities and zip codes.
+
+Usage:
+    python benchmarks/recalculator.py [facilities]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import rules  # noqa: E402
+from services import arcade, geometry, recalculator  # noqa: E402
+
+
+def square(x, y, size):
+    return geometry.Polygon([[(x, y), (x, y + size), (x + size, y + size), (x + size, y)]])
+
+
+def build(generator):
+    store = arcade.FeatureStore()
+    tables = {
+        "Counties": [(index * 2 + 1, square(index % 6 * 100, index // 6 * 100, 100)) for index in range(30)],
+        "Municipalities": [
+            ("city {}".format(index), square(generator.uniform(0, 580), generator.uniform(0, 480), 20))
+            for index in range(250)
+        ],
+        "ZipCodes": [
+            (84000 + index, square(generator.uniform(0, 560), generator.uniform(0, 460), 40)) for index in range(300)
+        ],
+    }
+
+    for location in recalculator.LOCATIONS:
+        for value, shape in tables[location.table]:
+            store.add(location.table, {location.source: value}, shape)
+
+    return store, {table: recalculator.Boundaries(rows) for table, rows in tables.items()}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    generator = random.Random(0)
+    store, boundaries = build(generator)
+    facilities = [
+        (index, square(generator.uniform(0, 595), generator.uniform(0, 495), 5), {}) for index in range(count)
+    ]
+    script = rules.load("facility").location_calculation.arcade
+
+    start = time.perf_counter()
+    rows = {}
+    for objectid, shape, _ in facilities:
+        rows[objectid] = arcade.evaluate(script, arcade.Feature({}, shape, recalculator.TABLE), store)
+    naive = time.perf_counter() - start
+
+    start = time.perf_counter()
+    changes, rejected = recalculator.find_changes(facilities, boundaries)
+    bulk = time.perf_counter() - start
+
+    for objectid, result in rows.items():
+        if recalculator.is_rejected(result):
+            assert "FacilityZIP" in rejected.get(objectid, []) and objectid not in changes, objectid
+
+            continue
+
+        for field, value in arcade.calculated_attributes(result).items():
+            if value is not None:
+                assert changes[objectid][field] == value, (objectid, field)
+
+    print("{} facilities, {} with changes, {} rejected".format(count, len(changes), len(rejected)))
+    print("{:<20} {:>8.3f}s".format("row by row arcade", naive))
+    print("{:<20} {:>8.3f}s {:>6.1f}x".format("bulk", bulk, naive / bulk))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+relink.py
+A benchmark of the memory and time linking contacts to facilities takes with a dictionary and with a merge join
+
+The cross reference and contact tables are generated a page at a time as the database would return them so only what
+each approach holds on to is measured. Four of every five contacts have a facility and half of those are already
+linked, like a migration that was interrupted and is run again.
+
+Usage:
+    python benchmarks/relink.py [contacts ...]
+"""
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from services import relink  # noqa: E402
+
+PAGE_SIZE = 10000
+
+
+def guid(number):
+    return "{:08X}-0000-4000-8000-{:012X}".format(number, number)
+
+
+def xref_row(index):
+    return guid(index), guid(10**9 + index // 4)
+
+
+def contact_row(index):
+    facility = "{" + xref_row(index)[1] + "}" if index % 10 < 4 else None
+
+    return index + 1, "{" + guid(index) + "}", facility
+
+
+def has_facility(index):
+    return index % 5 != 4
+
+
+def fetch_xref(contacts):
+    def fetch(size, after):
+        index = 0 if after is None else int(after[0][:8], 16) + 1
+        rows = []
+
+        while index < contacts and len(rows) < size:
+            if has_facility(index):
+                rows.append(xref_row(index))
+
+            index += 1
+
+        return rows
+
+    return fetch
+
+
+def fetch_contacts(contacts):
+    def fetch(size, after):
+        start = 0 if after is None else int(after[1:9], 16) + 1
+
+        return [contact_row(index) for index in range(start, min(start + size, contacts))]
+
+    return fetch
+
+
+def dictionary(contacts):
+    """the original, the whole cross reference in memory and every linked contact written"""
+    many_to_many = [xref_row(index) for index in range(contacts) if has_facility(index)]
+    lookup = {contact_guid: facility_guid for contact_guid, facility_guid in many_to_many}
+    written = 0
+
+    for index in range(contacts):
+        _, contact_guid, _ = contact_row(index)
+        contact_guid = contact_guid[1:-1]
+
+        if contact_guid in lookup:
+            "{{{}}}".format(lookup[contact_guid])
+            written += 1
+
+    return written
+
+
+def merge_join(contacts):
+    xref = relink.pages(fetch_xref(contacts), PAGE_SIZE, lambda row: row)
+    rows = relink.pages(fetch_contacts(contacts), PAGE_SIZE, lambda row: row[1])
+
+    return sum(1 for _ in relink.changes(relink.merge_join(xref, rows)))
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [100000, 1000000]
+
+    for contacts in sizes:
+        for label, method in [("dictionary", dictionary), ("merge join", merge_join)]:
+            start = time.perf_counter()
+            written = method(contacts)
+            duration = time.perf_counter() - start
+
+            tracemalloc.start()
+            method(contacts)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(
+                "{:>8} contacts {:<12} {:>8} written {:>8.3f}s {:>8.1f}MB peak".format(
+                    contacts, label, written, duration, peak / 1024 / 1024
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+startup.py
+A benchmark of how long the commands that do not talk to a geodatabase take to start
+
+Usage:
+    python benchmarks/startup.py [runs]
+"""
+
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+COMMANDS = [
+    ["ar.py", "--version"],
+    ["ar.py", "--help"],
+    ["ar.py", "fields", "--rule=well"],
+    ["ar.py", "build", "--manifest={}".format(Path(tempfile.gettempdir()) / "rules.manifest.json")],
+    ["ar.py", "plan", "--json"],
+    ["migrations.py", "--version"],
+]
+
+#: fails when any of the modules pull arcpy in at import time
+IMPORT_CHECK = "import sys, ar, migrations, reference, models.rule; sys.exit('arcpy' in sys.modules)"
+
+
+def time_command(command, runs):
+    timings = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *command], cwd=SRC, check=True, capture_output=True)
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    subprocess.run([sys.executable, "-c", IMPORT_CHECK], cwd=SRC, check=True)
+    print("arcpy is not imported at startup")
+
+    for command in COMMANDS:
+        print("{:<40} {:>8.3f}s".format(" ".join(command[:2]), time_command(command, runs)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+validator.py
+A benchmark of validating a whole table with numpy against evaluating every rule a row at a time
+
+The table is a local stand in for UICWell with random values for the fields the templated well constraints read.
+
+Usage:
+    python benchmarks/validator.py [rows] [chunk]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import rules  # noqa: E402
+from services import arcade, validator  # noqa: E402
+
+DOMAIN = [1, 3, 4, 5, 6]
+
+#: mostly valid values like a production table with a few of each kind of violation
+VALUES = DOMAIN * 10 + [None, "", "<null>", 2, 7, "text"]
+
+
+def main():
+    rows_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    chunk = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    generator = random.Random(0)
+
+    module = rules.load("well")
+    checks = [check for check in map(validator.classify, module.RULES) if check is not None]
+    columns = validator.get_columns(checks)
+    rows = [(index, *(generator.choice(VALUES) for _ in columns)) for index in range(rows_count)]
+
+    store = arcade.FeatureStore()
+    for column in columns:
+        store.add_domain(module.TABLE, column, {code: str(code) for code in DOMAIN})
+
+    start = time.perf_counter()
+    summary, violations = validator.validate_table(
+        module.TABLE,
+        checks,
+        (rows[index : index + chunk] for index in range(0, len(rows), chunk)),
+        {column: validator.lookup(DOMAIN) for column in columns},
+    )
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    counts = validator.validate_rows(module.TABLE, checks, rows, store)
+    naive = time.perf_counter() - start
+
+    if counts != [item["violations"] for item in summary]:
+        raise Exception("the vectorized counts {} do not match the row counts {}".format(summary, counts))
+
+    print("{} rows, {} checks, {} violations".format(rows_count, len(checks), len(violations)))
+    print("{:<12} {:>8.3f}s".format("numpy", vectorized))
+    print("{:<12} {:>8.3f}s".format("row by row", naive))
+    print("{:.1f}x faster".format(naive / vectorized))
+
+
+if __name__ == "__main__":
+    main()
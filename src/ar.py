@@ -4,8 +4,17 @@
 ar
 
 Usage:
-    ar update [--rule=<rule> --env=<env>]
-    ar delete [--rule=<rule> --env=<env>]
+    ar update [--rule=<rule> --env=<env> --jobs=<n> --manifest=<file> --trace=<file> --journal=<file> --resume (--diff | --import)]
+    ar delete [--rule=<rule> --env=<env> --jobs=<n> --manifest=<file> --trace=<file>]
+    ar export [--rule=<rule> --env=<env> --output=<folder> --manifest=<file> --snapshot=<file>]
+    ar fields [--rule=<rule> --manifest=<file>]
+    ar sizes [--rule=<rule>]
+    ar build [--manifest=<file> --budget=<n>]
+    ar cost [--rule=<rule> --manifest=<file> --budget=<n> --json]
+    ar plan [--rule=<rule> --manifest=<file> --snapshot=<file> --timings=<file> --json]
+    ar snapshot [--rule=<rule> --env=<env> --snapshot=<file> --manifest=<file>]
+    ar validate [--rule=<rule> --env=<env> --manifest=<file> --report=<file> --chunk=<n>]
+    ar recalculate [--env=<env> --dry-run]
     ar --version
     ar (-h | --help)
 
@@ -14,150 +23,103 @@ Options:
                         area_of_review, art_pen, authorization, authorization_action, contact, correction, enforcement, facility, inspection, mit,
                         operating_status, violation, well, ALL
     --env=<env>     local, dev, prod
+    --diff          Compare with the rules in the database and only add, alter or delete the rules that changed
+    --import        Replace each table's rules with a single ImportAttributeRules call
+    --output=<folder>   The folder to write the ImportAttributeRules csv files to [default: .]
+    --jobs=<n>      The number of tables to deploy at the same time [default: 1]
+    --manifest=<file>   Use the rules compiled by ar build instead of the rule modules. build writes rules.manifest.json by default
+    --snapshot=<file>   The fields and rules recorded from a database by ar snapshot. snapshot writes rules.snapshot.json by default
+    --timings=<file>    A json file of the seconds an add, alter and delete call take, or a --trace file, to estimate the plan duration
+    --trace=<file>  Time every geoprocessing call and write them to a json lines file
+    --journal=<file>    The file that records each rule as it is applied [default: rules.journal.jsonl]
+    --resume        Skip the rules the journal recorded for this environment when an update was interrupted
+    --json          Print the plan or the cost report as json
+    --budget=<n>    Fail when a rule's estimated cost per edit is over n
+    --report=<file>     The csv file validate writes a row to for every violation [default: violations.csv]
+    --chunk=<n>     The number of rows validate reads at a time [default: 10000]
+    --dry-run       Report the facility locations recalculate would change without writing them
     -h --help       Shows this screen
     -v --version    Shows the version
 """
 
+import json
 from datetime import datetime as dt
 from pathlib import Path
 
-import arcpy
-from arcgisscripting import ExecuteError  # pylint: disable=no-name-in-module
 from docopt import docopt
 
+import rules
 from config.config import get_sde_path_for
 from models.rule import RuleGroup
-from rules import (
-    area_of_review,
-    art_pen,
-    authorization,
-    authorization_action,
-    contact,
-    correction,
-    enforcement,
-    facility,
-    inspection,
-    mit,
-    operating_status,
-    violation,
-    well,
-)
+from services import analyzer, cost, loader, manifest, planner, recalculator, scheduler, trace, validator
+from services.backend import ArcpyBackend
+from services.journal import Journal
 
 VERSION = "2025.07.21"
 
 
-def get_rules(sde, rule=None):
-    if rule == "ALL":
-        tables = [
-            facility.TABLE,
-            well.TABLE,
-            area_of_review.TABLE,
-            art_pen.TABLE,
-            authorization.TABLE,
-            authorization_action.TABLE,
-            contact.TABLE,
-            correction.TABLE,
-            enforcement.TABLE,
-            inspection.TABLE,
-            mit.TABLE,
-            operating_status.TABLE,
-            violation.TABLE,
-        ]
+def load_rules(names, manifest_path=None):
+    """returns a (table, rules) tuple for each rule name from the rule modules or a manifest"""
+    if manifest_path is None:
+        return [(module.TABLE, module.RULES) for module in map(rules.load, names)]
 
-        for table in tables:
-            table_path = str(sde / table)
-            attribute_rules = arcpy.Describe(table_path).attributeRules
+    tables = manifest.read(manifest_path)
 
-            calculation_rules = ";".join([ar.name for ar in attribute_rules if "Calculation" in ar.type])
-            constraint_rules = ";".join([ar.name for ar in attribute_rules if "Constraint" in ar.type])
+    for name in names:
+        if name not in tables:
+            raise Exception("{} rule not found in {}".format(name, manifest_path))
 
-            if calculation_rules:
-                print("  deleting calculation rules: {}".format(calculation_rules))
-                try:
-                    arcpy.management.DeleteAttributeRule(
-                        in_table=table_path,
-                        names=calculation_rules,
-                        type="CALCULATION",
-                    )
-                    print("    deleted")
-                except ExecuteError as e:
-                    (message,) = e.args
-
-                    if message.startswith("ERROR 002556"):
-                        print("    rule already deleted, skipping...")
-                    else:
-                        raise e
-
-            if constraint_rules:
-                print("  deleting constraint rules {}".format(constraint_rules))
-                try:
-                    arcpy.management.DeleteAttributeRule(
-                        in_table=str(Path(sde) / table),
-                        names=constraint_rules,
-                        type="CONSTRAINT",
-                    )
-                    print("    deleted")
-                except ExecuteError as e:
-                    (message,) = e.args
+    return [tables[name] for name in names]
 
-                    if message.startswith("ERROR 002556"):
-                        print("    rule already deleted, skipping...")
-                    else:
-                        raise e
+
+def get_rules(sde, rule=None, manifest_path=None):
+    names = rules.NAMES if rule in (None, "ALL") else [rule]
+    definitions = load_rules(names, manifest_path)
+
+    if rule == "ALL":
+        for table, _ in definitions:
+            RuleGroup(sde, table, []).delete_all()
 
         return []
 
-    facility_rules = RuleGroup(sde, facility.TABLE, facility.RULES)
-    well_rules = RuleGroup(sde, well.TABLE, well.RULES)
-    aor_rules = RuleGroup(sde, area_of_review.TABLE, area_of_review.RULES)
-    art_pen_rules = RuleGroup(sde, art_pen.TABLE, art_pen.RULES)
-    authorization_rules = RuleGroup(sde, authorization.TABLE, authorization.RULES)
-    auth_action_rules = RuleGroup(sde, authorization_action.TABLE, authorization_action.RULES)
-    contact_rules = RuleGroup(sde, contact.TABLE, contact.RULES)
-    correction_rules = RuleGroup(sde, correction.TABLE, correction.RULES)
-    enforcement_rules = RuleGroup(sde, enforcement.TABLE, enforcement.RULES)
-    inspection_rules = RuleGroup(sde, inspection.TABLE, inspection.RULES)
-    mit_rules = RuleGroup(sde, mit.TABLE, mit.RULES)
-    operating_status_rules = RuleGroup(sde, operating_status.TABLE, operating_status.RULES)
-    violation_rules = RuleGroup(sde, violation.TABLE, violation.RULES)
-
-    if rule is None:
-        return [
-            facility_rules,
-            well_rules,
-            aor_rules,
-            art_pen_rules,
-            auth_action_rules,
-            authorization_rules,
-            contact_rules,
-            correction_rules,
-            enforcement_rules,
-            inspection_rules,
-            mit_rules,
-            operating_status_rules,
-            violation_rules,
-        ]
+    return [RuleGroup(sde, table, table_rules) for table, table_rules in definitions]
+
+
+def report_fields(rule_groups):
+    """prints the fields each rule reads from $feature which become its triggering fields"""
+    for group in rule_groups:
+        print(group.name)
+
+        for rule in group.meta_rules:
+            analysis = analyzer.analyze(rule.arcade)
+            fields = sorted(analysis.fields)
+
+            if analysis.geometry:
+                fields.append("shape")
+
+            if analysis.dynamic or not fields:
+                fields = ["all fields"]
 
-    rules = {
-        "area_of_review": aor_rules,
-        "art_pen": art_pen_rules,
-        "authorization": authorization_rules,
-        "authorization_action": auth_action_rules,
-        "contact": contact_rules,
-        "correction": correction_rules,
-        "enforcement": enforcement_rules,
-        "facility": facility_rules,
-        "inspection": inspection_rules,
-        "mit": mit_rules,
-        "operating_status": operating_status_rules,
-        "violation": violation_rules,
-        "well": well_rules,
-    }
-
-    return [rules[rule]]
+            print("  {}: {}".format(rule.rule_name, ", ".join(fields)))
+
+
+def check_budget(reports, budget):
+    """prints the rules that cost more than the budget and exits when there are any"""
+    if budget is None:
+        return
+
+    over = cost.over_budget(reports, float(budget))
+
+    for table, rule, total in over:
+        print("{} {} costs {}, the budget is {}".format(table, rule, total, budget))
+
+    if over:
+        exit(1)
 
 
 def update_version(sde, version):
+    import arcpy
+
     with arcpy.da.InsertCursor(
         in_table=str(sde / "Version_Information"), field_names=["name", "version", "date"]
     ) as cursor:
@@ -171,20 +133,150 @@ def main():
     args = docopt(__doc__, version=VERSION)
 
     sde = get_sde_path_for(args["--env"])
+    manifest_path = args["--manifest"]
+
+    if args["build"]:
+        modules = {name: rules.load(name) for name in rules.NAMES}
+        check_budget([cost.table_report(module.TABLE, module.RULES) for module in modules.values()], args["--budget"])
+        path = manifest.write(manifest_path or manifest.DEFAULT_PATH, manifest.build(modules, VERSION))
+        print("wrote {}".format(path))
+
+        return
+
+    #: ALL deletes every rule when updating so the read only commands treat it as every table
+    rule = None if args["--rule"] == "ALL" else args["--rule"]
+
+    if args["fields"]:
+        report_fields(get_rules(sde, rule, manifest_path))
+
+        return
+
+    if args["cost"]:
+        reports = [cost.table_report(group.name, group.meta_rules) for group in get_rules(sde, rule, manifest_path)]
+
+        print(json.dumps(reports, indent=2) if args["--json"] else cost.format_report(reports))
+        check_budget(reports, args["--budget"])
+
+        return
+
+    if args["sizes"]:
+        print(loader.format_size_report(loader.size_report(get_rules(sde, rule))))
+
+        return
+
+    if args["plan"]:
+        snapshots = planner.read_snapshot(args["--snapshot"])
+        plans = [
+            planner.plan_table(group.name, group.meta_rules, snapshots.get(group.name))
+            for group in get_rules(sde, rule, manifest_path)
+        ]
+        summary = planner.summarize(plans, planner.read_timings(args["--timings"]))
+
+        print(json.dumps(summary, indent=2) if args["--json"] else planner.format_summary(summary))
+
+        return
+
+    if args["export"]:
+        #: without a snapshot the triggering fields are read from the tables, which needs a connection but no lock
+        snapshots = planner.read_snapshot(args["--snapshot"])
+
+        for group in get_rules(sde, rule, manifest_path):
+            snapshot = snapshots.get(group.name)
+            get_fields = None if snapshot is None else planner.snapshot_fields(snapshot)
+
+            print("wrote {}".format(group.write_csv(args["--output"], get_fields)))
+
+        return
+
+    #: only the commands that talk to a geodatabase need arcpy
+    import arcpy
+
     print("acting on {}".format(sde))
 
-    if not arcpy.TestSchemaLock(str(sde / facility.TABLE)):
+    if not arcpy.TestSchemaLock(str(sde / "UICFacility")):
         print("Unable to reach the database or acquire the necessary schema lock to add rules")
         exit(0)
 
-    if args["update"]:
-        for rule in get_rules(sde, args["--rule"]):
-            rule.execute()
+    jobs = int(args["--jobs"])
+    tracing = bool(args["--trace"])
+
+    if tracing:
+        trace.enable()
+
+    try:
+        if args["update"]:
+            rule_groups = get_rules(sde, args["--rule"], manifest_path)
+            journal = Journal(args["--journal"], args["--env"])
+            options = {"journal": journal, "resume": args["--resume"]}
+
+            if args["--import"]:
+                _, failures = scheduler.run(
+                    rule_groups, "replace", sde, ArcpyBackend(), jobs=jobs, tracing=tracing, **options
+                )
+            else:
+                _, failures = scheduler.run(
+                    rule_groups,
+                    "execute",
+                    sde,
+                    ArcpyBackend(),
+                    jobs=jobs,
+                    tracing=tracing,
+                    use_diff=args["--diff"],
+                    **options,
+                )
+
+            if failures:
+                print(
+                    "unable to update {}. run again with --resume to skip the rules that were applied".format(
+                        ", ".join(failures)
+                    )
+                )
+                exit(1)
+
+            journal.clear()
+
+            if args["--diff"]:
+                issued = sum(rule.calls_issued for rule in rule_groups)
+                saved = sum(rule.calls_saved for rule in rule_groups)
+                print("issued {} geoprocessing calls, saved {} calls".format(issued, saved))
+
+            update_version(sde, VERSION)
+        elif args["delete"]:
+            _, failures = scheduler.run(
+                get_rules(sde, args["--rule"], manifest_path), "delete", sde, ArcpyBackend(), jobs=jobs, tracing=tracing
+            )
+
+            if failures:
+                print("unable to delete {}".format(", ".join(failures)))
+                exit(1)
+        elif args["snapshot"]:
+            tables = {group.name: group.snapshot() for group in get_rules(sde, rule, manifest_path)}
+            path = Path(args["--snapshot"] or "rules.snapshot.json")
+            path.write_text(json.dumps({"env": args["--env"], "tables": tables}, indent=2), encoding="utf-8")
+            print("wrote {}".format(path))
+        elif args["validate"]:
+            domains = validator.load_domains(sde)
+            summary = []
+            violations = []
+
+            for group in get_rules(sde, rule, manifest_path):
+                table_summary, table_violations = validator.validate_group(group, domains, int(args["--chunk"]))
+                summary.extend(table_summary)
+                violations.extend(table_violations)
+
+            print(validator.format_summary(summary))
+            print("wrote {}".format(validator.write_report(args["--report"], violations)))
+        elif args["recalculate"]:
+            facilities = recalculator.read_facilities(sde)
+            changes, rejected = recalculator.find_changes(facilities, recalculator.load_boundaries(sde))
+
+            print(recalculator.format_summary(facilities, changes, rejected))
 
-        update_version(sde, VERSION)
-    elif args["delete"]:
-        for rule in get_rules(sde, args["--rule"]):
-            rule.delete()
+            if not args["--dry-run"]:
+                print("updated {} facilities".format(recalculator.write_changes(sde, changes)))
+    finally:
+        if tracing:
+            trace.finish(args["--trace"])
 
     arcpy.management.ClearWorkspaceCache(str(sde))
 
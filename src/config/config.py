@@ -23,6 +23,26 @@ rule_types = SimpleNamespace(
     }
 )
 
+#: the arcpy.Describe shape types that spatial rules are generated for
+shape_types = SimpleNamespace(
+    **{
+        "point": "Point",
+        "polygon": "Polygon",
+    }
+)
+
+#: the one to many relationship classes migrations.py creates. rules that look up a parent or its children traverse
+#: these instead of filtering the whole table
+relationships = [
+    SimpleNamespace(
+        name="FacilityToContact",
+        origin="UICFacility",
+        destination="UICContact",
+        primary_key="GUID",
+        foreign_key="Facility_FK",
+    ),
+]
+
 editable = SimpleNamespace(
     **{
         "yes": "EDITABLE",
@@ -4,26 +4,30 @@
 migrations
 
 Usage:
-    migrations migrate [--migration=<m> --env=<env>]
+    migrations migrate [--migration=<m> --env=<env> --jobs=<n> --trace=<file>]
     migrations --version
     migrations (-h | --help)
 
 Options:
     --env=<env>     local, dev, prod
     --migration=<m> The specific migrations
-                        contact, unversion, version
+                        contact, indexes, unversion, version
+    --jobs=<n>      The number of tables to version or unversion or steps to run at the same time [default: 1]
+    --trace=<file>  Time every geoprocessing call and write them to a json lines file
     -h --help       Shows this screen
     -v --version    Shows the version
 """
 
 import os
 from datetime import datetime
+from functools import partial
 
-import arcpy
-from arcgisscripting import ExecuteError  # pylint: disable=no-name-in-module
 from docopt import docopt
 
+import rules
 from config import config
+from services import indexes, mover, relink, scheduler, steps, trace, versioning
+from services.backend import ArcpyBackend, StepBackend
 
 VERSION = "1.0.1"
 
@@ -136,6 +140,41 @@ _domains_to_update = {
     "UICNoMigrationPetStatusDomain": {"code": "WA", "value": "waiting"},
     "UICMITRemediationActionDomain": {"code": "WA", "value": "waiting"},
 }
+#: fields that move from a parent table to the rows that reference it. the to_field is added with add and default
+_field_moves = [
+    {
+        "from_table": "UICFacility",
+        "key": "GUID",
+        "field": "NoMigrationPetStatus",
+        "to_table": "UICWell",
+        "foreign_key": "Facility_FK",
+        "to_field": "NoMigrationPetStatus",
+        "add": {
+            "field_type": "TEXT",
+            "field_alias": "NoMigrationPetStatus",
+            "field_domain": "UICNoMigrationPetStatusDomain",
+            "field_is_nullable": "NULLABLE",
+            "field_length": 2,
+        },
+        "default": "NA",
+    },
+    {
+        "from_table": "UICFacility",
+        "key": "GUID",
+        "field": "FacilityType",
+        "to_table": "UICWell",
+        "foreign_key": "Facility_FK",
+        "to_field": "ClassIFacilityType",
+        "add": {
+            "field_type": "TEXT",
+            "field_alias": "Facility Type for Class I Wells",
+            "field_domain": "UICFacilityTypeDomain",
+            "field_is_nullable": "NULLABLE",
+            "field_length": 1,
+        },
+        "default": None,
+    },
+]
 _tables_to_add = {
     "Version_Information": [
         {"in_table": "Version_Information", "field_name": "Name", "field_type": "TEXT", "field_length": 255},
@@ -150,6 +189,8 @@ _tables_to_add = {
 
 
 def clean_up(sde):
+    import arcpy
+
     print("compressing db")
 
     try:
@@ -171,6 +212,8 @@ def clean_up(sde):
 
 
 def delete_tables(tables, sde):
+    import arcpy
+
     print("removing {} tables".format(len(tables)))
 
     for table in tables:
@@ -180,6 +223,9 @@ def delete_tables(tables, sde):
 
 
 def create_tables(tables, sde):
+    import arcpy
+    from arcgisscripting import ExecuteError  # pylint: disable=no-name-in-module
+
     for table_name in tables:
         print("creating {}".format(table_name))
         try:
@@ -189,53 +235,47 @@ def create_tables(tables, sde):
 
             for field_meta in field_metas:
                 arcpy.management.AddField(**field_meta)
-        except Exception:
-            print("skipping {}".format(table_name))
+        except ExecuteError as e:
+            (message,) = e.args
 
+            if "ERROR 000258" in message:
+                print("skipping {}, it already exists".format(table_name))
+            else:
+                raise e
 
-def version_tables(version, tables, skip_tables, sde):
-    for table_name in tables:
-        parts = table_name.split(".")
-        if parts[2] in skip_tables:
-            continue
 
-        if version:
-            print("updating editor tracking and versioning for {} tables".format(len(tables) - len(skip_tables)))
-            print("  " + table_name)
-            arcpy.management.EnableEditorTracking(
-                in_dataset=os.path.join(sde, table_name),
-                creator_field="CreatedBy",
-                creation_date_field="CreatedOn",
-                last_editor_field="EditedBy",
-                last_edit_date_field="ModifiedOn",
-                add_fields="ADD_FIELDS",
-                # record_dates_in='UTC',
-            )
+def version_tables(version, tables, skip_tables, sde, jobs=1):
+    action = "version" if version else "unversion"
+    tables = versioning.get_tables(sde, tables, skip_tables)
 
-            arcpy.management.RegisterAsVersioned(
-                in_dataset=os.path.join(sde, table_name),
-                edit_to_base="NO_EDITS_TO_BASE",
-            )
-        else:
-            print("unversioning {} tables".format(len(tables) - len(skip_tables)))
-            print("  " + table_name)
-            arcpy.management.UnregisterAsVersioned(
-                in_dataset=os.path.join(sde, table_name),
-                keep_edit="NO_KEEP_EDIT",
-            )
+    print("{}ing {} tables with {} jobs".format(action, len(tables), jobs))
 
-            arcpy.management.DisableEditorTracking(
-                in_dataset=os.path.join(sde, table_name),
-                creator="DISABLE_CREATOR",
-                creation_date="DISABLE_CREATION_DATE",
-                last_editor="DISABLE_LAST_EDITOR",
-                last_edit_date="DISABLE_LAST_EDIT_DATE",
-            )
+    results, failures = scheduler.run(tables, action, sde, ArcpyBackend(), jobs=jobs, tracing=trace.is_enabled())
+
+    if failures:
+        print("retrying {} one at a time".format(", ".join(failures)))
+
+        retried, failures = scheduler.run(
+            [table for table in tables if table.name in failures],
+            action,
+            sde,
+            ArcpyBackend(),
+            tracing=trace.is_enabled(),
+        )
+        results = [result for result in results if result["error"] is None] + retried
+
+    print(versioning.format_timings(results))
+
+    if failures:
+        print("unable to {} {}".format(action, ", ".join(failures)))
 
     print("done")
 
 
 def modify_tables(changes, sde):
+    import arcpy
+    from arcgisscripting import ExecuteError  # pylint: disable=no-name-in-module
+
     print("applying table modifications")
     for table_name in changes:
         modifications = changes[table_name]
@@ -269,6 +309,9 @@ def modify_tables(changes, sde):
 
 
 def delete_domains(domains, sde):
+    import arcpy
+    from arcgisscripting import ExecuteError  # pylint: disable=no-name-in-module
+
     print("removing {} domains".format(len(domains)))
 
     for domain in domains:
@@ -285,105 +328,43 @@ def delete_domains(domains, sde):
     print("done")
 
 
-def migrate_fields():
+def migrate_fields(moves, sde):
+    import arcpy
+
     print("moving fields")
-    move_field = "NoMigrationPetStatus"
-    from_table = "UICFacility"
-    to_table = "UICWell"
-
-    migration_pet_status = False
-    if len(arcpy.ListFields(from_table, move_field)) == 0:
-        migration_pet_status = True
-        print("  migration likely completed")
-
-    if not migration_pet_status:
-        if len(arcpy.ListFields(to_table, move_field)) < 1:
-            arcpy.management.AddField(
-                in_table=to_table,
-                field_name=move_field,
-                field_type="TEXT",
-                field_alias=move_field,
-                field_domain="UICNoMigrationPetStatusDomain",
-                field_is_nullable="NULLABLE",
-                field_length=2,
-            )
 
-            arcpy.management.AssignDefaultToField(in_table=to_table, field_name=move_field, default_value="NA")
-
-        print("building data cache")
-        status_cache = {}
-        with arcpy.da.SearchCursor(in_table=from_table, field_names=["GUID", move_field], where_clause="1=1") as cursor:
-            for pk, status in cursor:
-                status_cache[pk] = status
-        print("done")
-
-        print("updating new field data")
-        ok = True
-        with arcpy.da.UpdateCursor(in_table=to_table, field_names=["Facility_FK", move_field]) as cursor:
-            for fk, _ in cursor:
-                if fk not in status_cache:
-                    continue
-
-                try:
-                    cursor.updateRow((fk, status_cache[fk]))
-                except Exception as e:
-                    ok = False
-                    print("update failed " + str(e))
-        print("done")
-
-        if ok:
-            print("removing field")
-            arcpy.management.DeleteField(from_table, move_field)
-
-    move_field = "FacilityType"
-    new_name = "ClassIFacilityType"
-
-    facility_type = False
-    if len(arcpy.ListFields(from_table, move_field)) < 1:
-        facility_type = True
-        print("  migration likely completed")
-
-    if not facility_type:
-        if len(arcpy.ListFields(to_table, new_name)) < 1:
-            arcpy.management.AddField(
-                in_table=to_table,
-                field_name=new_name,
-                field_type="TEXT",
-                field_alias="Facility Type for Class I Wells",
-                field_domain="UICFacilityTypeDomain",
-                field_is_nullable="NULLABLE",
-                field_length=1,
-            )
+    for move in moves:
+        source = os.path.join(sde, move["from_table"])
+        target = os.path.join(sde, move["to_table"])
 
-            arcpy.management.AssignDefaultToField(in_table=to_table, field_name=new_name)
+        if len(arcpy.ListFields(source, move["field"])) < 1:
+            print("  {} migration likely completed".format(move["field"]))
 
-        print("building data cache")
-        type_cache = {}
-        with arcpy.da.SearchCursor(in_table=from_table, field_names=["GUID", move_field], where_clause="1=1") as cursor:
-            for pk, status in cursor:
-                type_cache[pk] = status
-        print("done")
+            continue
 
-        print("updating new field data")
-        ok = True
-        with arcpy.da.UpdateCursor(in_table=to_table, field_names=["Facility_FK", new_name]) as cursor:
-            for fk, _ in cursor:
-                if fk not in type_cache:
-                    continue
+        if len(arcpy.ListFields(target, move["to_field"])) < 1:
+            arcpy.management.AddField(in_table=target, field_name=move["to_field"], **move["add"])
+            arcpy.management.AssignDefaultToField(
+                in_table=target, field_name=move["to_field"], default_value=move["default"]
+            )
 
-                try:
-                    cursor.updateRow((fk, type_cache[fk]))
-                except Exception as e:
-                    ok = False
-                    print("update failed " + str(e))
-        print("done")
+        try:
+            print("  updated {} rows".format(mover.move_field(sde, move)))
+        except Exception as e:
+            print("update failed " + str(e))
+
+            continue
 
-        if ok:
-            print("removing field")
-            arcpy.management.DeleteField(from_table, move_field)
+        print("removing field")
+        arcpy.management.DeleteField(source, move["field"])
+
+    print("done")
 
 
 def create_contingencies(sde):
+    import arcpy
+    from arcgisscripting import ExecuteError  # pylint: disable=no-name-in-module
+
     print("creating contingent field group for well class")
 
     try:
@@ -440,47 +421,33 @@ def create_contingencies(sde):
 
 
 def alter_domains(changes, sde):
+    import arcpy
+    from arcgisscripting import ExecuteError  # pylint: disable=no-name-in-module
+
     for domain_name in changes:
         modification = changes[domain_name]
 
         try:
             arcpy.management.AddCodedValueToDomain(sde, domain_name, modification["code"], modification["value"])
-        except Exception:
-            print("  domain probably already added")
+        except ExecuteError as e:
+            (message,) = e.args
+
+            if "already exists" in message.lower():
+                print("  domain code already added: {}".format(domain_name))
+            else:
+                raise e
 
 
 def replace_relationship(sde):
+    import arcpy
+
     print("making contacts 1:many")
     if not arcpy.Exists(os.path.join(sde, "UICFacilityToContact")):
         print("  likely already done")
         return
 
-    print("querying xref table")
-    cursor = arcpy.ArcSDESQLExecute(sde)
-    many_to_many = cursor.execute(
-        "SELECT convert(nvarchar(50),FacilityGUID), convert(nvarchar(50),contactGUID) FROM UICFACILITYTOCONTACT"
-    )
-
-    lookup = {contact_guid: facility_guid for facility_guid, contact_guid in many_to_many}
-
-    del cursor  #: removes workspace from in transaction mode
-
-    # edit = arcpy.da.Editor(sde)
-    # edit.startEditing()
-    # edit.startOperation()
-
     print("updating facility_fk for contacts")
-    with arcpy.da.UpdateCursor(
-        in_table=os.path.join(sde, "UICContact"), field_names=["Guid", "Facility_FK"]
-    ) as update_cursor:
-        for row in update_cursor:
-            guid = row[0][1:-1]  #: strip { } from esri guid
-            if guid in lookup:
-                row[1] = "{{{}}}".format(lookup[guid])  #: add them back
-                update_cursor.updateRow(row)
-
-    # edit.stopOperation()
-    # edit.stopEditing(True)
+    print("  updated {} contacts".format(relink.relink(sde, os.path.join(sde, "UICContact"))))
     print("done")
 
     origin = os.path.join(sde, "UICFacility")
@@ -512,6 +479,8 @@ def replace_relationship(sde):
 
 
 def create_relationship(sde):
+    import arcpy
+
     origin = "UICAreaOfReview"
     destination = "UICArtPen"
     output = os.path.join(sde, "AreaOfReviewToArtPen")
@@ -540,7 +509,22 @@ def create_relationship(sde):
         print("  class probably already created")
 
 
+def create_indexes(sde):
+    print("indexing the columns the rules filter by")
+
+    advice = _advice()
+    existing = {table: indexes.existing_indexes(os.path.join(sde, table)) for table in {item.table for item in advice}}
+
+    for item in indexes.missing(advice, {table.lower(): fields for table, fields in existing.items()}):
+        print("  {}.{} for {}".format(item.table, item.column, ", ".join(item.rules)))
+        indexes.add_index(os.path.join(sde, item.table), item)
+
+    print("done")
+
+
 def _get_tables(sde):
+    import arcpy
+
     tables = arcpy.ListFeatureClasses() + arcpy.ListTables()
 
     for dataset in arcpy.ListDatasets("", "Feature"):
@@ -551,6 +535,8 @@ def _get_tables(sde):
 
 
 def update_version(sde, version):
+    import arcpy
+
     with arcpy.da.InsertCursor(
         in_table=os.path.join(sde, "Version_Information"), field_names=["name", "version", "date"]
     ) as cursor:
@@ -559,53 +545,163 @@ def update_version(sde, version):
         cursor.insertRow(("migrations", version, date_string))
 
 
+def _advice():
+    return indexes.advise([rules.load(name) for name in rules.NAMES])
+
+
+def _indexes_added(schema):
+    return steps.indexes_added(_advice(), schema)
+
+
+def _schema_tables(selected):
+    """the tables the probes of the selected steps read"""
+    tables = [table for step in selected for table in step.tables]
+
+    if any(step.name == "create_indexes" for step in selected):
+        tables += [item.table for item in _advice()]
+
+    return tables
+
+
+#: every migration step, the tables it changes, the steps it runs after and the probe that tells it is applied.
+#: only the tables of the steps that are not applied are unversioned while the steps run
+_steps = [
+    steps.Step(
+        "delete_tables",
+        partial(delete_tables, _tables_to_delete),
+        applied=partial(steps.tables_deleted, _tables_to_delete),
+        locks=_tables_to_delete,
+    ),
+    steps.Step(
+        "create_tables",
+        partial(create_tables, _tables_to_add),
+        applied=partial(steps.tables_created, list(_tables_to_add)),
+        locks=list(_tables_to_add),
+    ),
+    steps.Step(
+        "modify_tables",
+        partial(modify_tables, _table_modifications),
+        tables=list(_table_modifications),
+        applied=partial(steps.fields_modified, _table_modifications),
+    ),
+    steps.Step(
+        "delete_domains",
+        partial(delete_domains, _domains_to_delete),
+        after=["delete_tables", "modify_tables"],
+        applied=partial(steps.domains_deleted, _domains_to_delete),
+    ),
+    steps.Step(
+        "migrate_fields",
+        partial(migrate_fields, _field_moves),
+        tables=list(dict.fromkeys(move[key] for move in _field_moves for key in ("from_table", "to_table"))),
+        after=["modify_tables"],
+        applied=partial(steps.fields_moved, _field_moves),
+    ),
+    steps.Step(
+        "create_contingencies",
+        create_contingencies,
+        tables=["UICWell"],
+        after=["modify_tables", "migrate_fields"],
+        applied=partial(steps.field_group_created, "UICWell", "Well Class"),
+    ),
+    steps.Step(
+        "alter_domains",
+        partial(alter_domains, _domains_to_update),
+        after=["modify_tables", "migrate_fields", "create_contingencies"],
+        applied=partial(steps.codes_added, _domains_to_update),
+    ),
+    steps.Step(
+        "replace_relationship",
+        replace_relationship,
+        tables=["UICFacility", "UICContact"],
+        after=["modify_tables", "migrate_fields"],
+        applied=partial(steps.relationship_replaced, "UICFacilityToContact", "FacilityToContact"),
+    ),
+    steps.Step(
+        "create_relationship",
+        create_relationship,
+        tables=["UICAreaOfReview", "UICArtPen"],
+        after=["delete_tables", "modify_tables"],
+        applied=partial(steps.relationship_replaced, "AreaOfReviewToArtificialPenetrations", "AreaOfReviewToArtPen"),
+    ),
+    steps.Step(
+        "create_indexes",
+        create_indexes,
+        after=["modify_tables", "migrate_fields", "replace_relationship"],
+        applied=_indexes_added,
+    ),
+]
+
+#: the steps each --migration runs
+_migrations = {
+    None: [step.name for step in _steps],
+    "contact": ["replace_relationship"],
+    "indexes": ["create_indexes"],
+}
+
+
 def main():
     """Main entry point for program. Parse arguments and pass to engine module"""
     args = docopt(__doc__, version=VERSION)
 
+    import arcpy
+
     arcpy.env.workspace = sde = config.get_sde_path_for(args["--env"])
 
     print("acting on {}".format(sde))
 
-    if args["migrate"]:
-        clean_up(sde)
+    jobs = int(args["--jobs"])
+
+    if args["--trace"]:
+        trace.enable()
+
+    try:
+        if args["migrate"]:
+            clean_up(sde)
 
-        if args["--migration"] == "unversion":
-            tables = _get_tables(sde)
+            if args["--migration"] == "unversion":
+                tables = _get_tables(sde)
 
-            version_tables(False, tables, _skip_tables, sde)
+                version_tables(False, tables, _skip_tables, sde, jobs)
 
-            exit()
+                exit()
 
-        if args["--migration"] == "version":
-            tables = _get_tables(sde)
+            if args["--migration"] == "version":
+                tables = _get_tables(sde)
 
-            version_tables(True, tables, _skip_tables, sde)
+                version_tables(True, tables, _skip_tables, sde, jobs)
 
-            exit()
+                exit()
 
-        if not args["--migration"]:
-            delete_tables(_tables_to_delete, sde)
-            create_tables(_tables_to_add, sde)
+            selected = [step for step in _steps if step.name in _migrations[args["--migration"]]]
 
-        tables = _get_tables(sde)
+            print("reading the schema")
+            schema = steps.read_schema(sde, _schema_tables(selected))
+            selected = steps.pending(selected, schema)
+            tables = versioning.touched(schema.names, selected)
 
-        version_tables(False, tables, _skip_tables, sde)
+            if tables:
+                version_tables(False, tables, _skip_tables, sde, jobs)
+
+            results, failures = steps.run(selected, sde, StepBackend(), jobs=jobs, tracing=trace.is_enabled())
+
+            if results:
+                print(versioning.format_timings(results))
+
+            if failures:
+                print("unable to run {}. the version is not recorded".format(", ".join(failures)))
+            else:
+                update_version(sde, VERSION)
 
-        if not args["--migration"]:
-            modify_tables(_table_modifications, sde)
-            delete_domains(_domains_to_delete, sde)
-            migrate_fields()
-            create_contingencies(sde)
-            alter_domains(_domains_to_update, sde)
-            replace_relationship(sde)
-            create_relationship(sde)
+            if tables:
+                version_tables(True, tables, _skip_tables, sde, jobs)
 
-        if args["--migration"] == "contact":
-            replace_relationship(sde)
+            if failures:
+                exit(1)
 
-        update_version(sde, VERSION)
-        version_tables(True, tables, _skip_tables, sde)
+    finally:
+        if args["--trace"]:
+            trace.finish(args["--trace"])
 
 
 if __name__ == "__main__":
@@ -3,12 +3,14 @@
 """
 rule.py
 A module that acts as the base class for all rules
+
+arcpy is imported by the methods that talk to the geodatabase so rules can be inspected without it
 """
 
+import tempfile
 from pathlib import Path
 
-import arcpy
-from arcgisscripting import ExecuteError  # pylint: disable=no-name-in-module
+from services import analyzer, diff, importer
 
 
 class RuleGroup(object):
@@ -17,79 +19,148 @@ class RuleGroup(object):
         self.table_path = str(Path(sde) / table)
         self.meta_rules = rules
 
-    def execute(self):
+        self.calls_issued = 0
+        self.calls_saved = 0
+
+    def execute(self, use_diff=False, journal=None, resume=False):
+        """creates or updates the rules
+
+        each rule is recorded in the journal once it is applied and when resuming the rules the journal already
+        has are skipped
+        """
         print("creating rules for {}".format(self.name))
-        fields = arcpy.ListFields(self.table_path)
-        field_names = [
-            field.name
-            for field in fields
-            if field.name.lower() not in ("createdon", "modifiedon", "editedby")
-            and field.type.lower() not in ("oid", "guid", "globalid")
-        ]
+        rules = self._get_pending_rules(journal, resume)
+
+        if not rules:
+            return
+
+        self._check_shape_type()
+        get_fields = self._get_triggering_fields()
+
+        if use_diff:
+            self._execute_diff(rules, get_fields, journal)
+
+            return
+
+        for rule in rules:
+            for replaced in diff.replaced_rules(rule):
+                print("  deleting {} rule, it is replaced by {}".format(replaced.rule_name, rule.rule_name))
+                self._delete(replaced)
 
-        for rule in self.meta_rules:
             print("  creating {} rule".format(rule.rule_name))
 
             exists = True
-            args = {
-                "in_table": self.table_path,
-                "name": rule.rule_name,
-                "script_expression": rule.arcade,
-                "triggering_events": rule.triggers,
-                "triggering_fields": ";".join(field_names),
-            }
-
-            if hasattr(rule, "error_number"):
-                args["error_number"] = rule.error_number
-                args["error_message"] = rule.error_message
 
             try:
-                arcpy.management.AlterAttributeRule(**args)
-                print("    updated")
+                self._alter(rule, get_fields)
+                operation = diff.operations["alter"]
             except Exception:
                 exists = False
 
             if not exists:
-                args = {
-                    "in_table": self.table_path,
-                    "name": rule.rule_name,
-                    "type": rule.type,
-                    "script_expression": rule.arcade,
-                    "is_editable": rule.editable,
-                    "triggering_events": rule.triggers,
-                    "description": rule.description,
-                    "subtype": "",
-                    "field": rule.field,
-                    "exclude_from_client_evaluation": "",
-                    "batch": False,
-                    "severity": "",
-                    "tags": rule.tag,
-                    "triggering_fields": ";".join(field_names),
-                }
-
-                if hasattr(rule, "error_number"):
-                    args["error_number"] = rule.error_number
-                    args["error_message"] = rule.error_message
-
-                try:
-                    arcpy.management.AddAttributeRule(**args)
-                    print("    created")
-                except ExecuteError as e:
-                    (message,) = e.args
-
-                    if message.startswith("ERROR 002541"):
-                        print("    rule already exists, skipping...")
-                    else:
-                        raise e
+                self._add(rule, get_fields)
+                operation = diff.operations["add"]
 
-    def delete(self):
-        for rule in self.meta_rules:
-            print("  deleting {} rule".format(rule.rule_name))
+            if journal is not None:
+                journal.record(self.name, rule, operation)
+
+    def _get_pending_rules(self, journal, resume):
+        if not resume or journal is None:
+            return self.meta_rules
+
+        rules = [rule for rule in self.meta_rules if not journal.is_applied(self.name, rule)]
+        print(
+            "  resuming, {} of {} rules already applied".format(len(self.meta_rules) - len(rules), len(self.meta_rules))
+        )
+
+        return rules
+
+    def _execute_diff(self, rules, get_fields, journal=None):
+        import arcpy
+
+        existing = {
+            attribute_rule.name: diff.existing_state(attribute_rule)
+            for attribute_rule in arcpy.Describe(self.table_path).attributeRules
+        }
+
+        steps = diff.plan(rules, existing, get_fields)
+        baseline = diff.legacy_call_count(rules, existing)
+
+        for operation, rule in steps:
+            print("  {} {} rule".format(operation, rule.rule_name))
+
+            if operation == diff.operations["alter"]:
+                self._alter(rule, get_fields)
+            elif operation == diff.operations["add"]:
+                self._add(rule, get_fields)
+            elif operation == diff.operations["delete"]:
+                self._delete(rule)
+
+                continue
+
+            if journal is not None:
+                journal.record(self.name, rule, operation)
+
+        self.calls_saved = baseline - len(steps)
+        print("  {} unchanged rules skipped".format(len(rules) - diff.count_changed(rules, steps)))
+
+    def replace(self, journal=None, resume=False):
+        """replaces every rule in the table with a single ImportAttributeRules call"""
+        import arcpy
+
+        print("replacing rules for {}".format(self.name))
+
+        if not self._get_pending_rules(journal, resume):
+            return
+
+        self._check_shape_type()
+        get_fields = self._get_triggering_fields()
+
+        self.delete_all()
+
+        with tempfile.TemporaryDirectory() as folder:
+            csv_file = self.write_csv(folder, get_fields)
+
+            print("  importing {} rules".format(len(self.meta_rules)))
+            self.calls_issued += 1
+            arcpy.management.ImportAttributeRules(target_table=self.table_path, csv_file=csv_file)
+            print("    imported")
+
+        if journal is not None:
+            for rule in self.meta_rules:
+                journal.record(self.name, rule, "import")
+
+    def write_csv(self, folder, get_fields=None):
+        """writes the rules to <folder>/<table>.csv in the ImportAttributeRules format"""
+        if get_fields is None:
+            get_fields = self._get_triggering_fields()
+
+        return importer.write_csv(Path(folder) / "{}.csv".format(self.name), self.meta_rules, get_fields)
+
+    def delete_all(self):
+        """deletes every rule in the table with one call per rule type"""
+        import arcpy
+        from arcgisscripting import ExecuteError  # pylint: disable=no-name-in-module
+
+        attribute_rules = arcpy.Describe(self.table_path).attributeRules
+
+        calculation_rules = ";".join([ar.name for ar in attribute_rules if "Calculation" in ar.type])
+        constraint_rules = ";".join([ar.name for ar in attribute_rules if "Constraint" in ar.type])
+
+        for names, rule_type in (
+            (calculation_rules, "CALCULATION"),
+            (constraint_rules, "CONSTRAINT"),
+        ):
+            if not names:
+                continue
+
+            print("  deleting {} rules: {}".format(rule_type.lower(), names))
             try:
+                self.calls_issued += 1
                 arcpy.management.DeleteAttributeRule(
                     in_table=self.table_path,
-                    names=rule.rule_name,
-                    type=rule.type,
+                    names=names,
+                    type=rule_type,
                 )
                 print("    deleted")
             except ExecuteError as e:
@@ -99,3 +170,152 @@ class RuleGroup(object):
                     print("    rule already deleted, skipping...")
                 else:
                     raise e
+
+    def snapshot(self):
+        """records the table's fields and existing rules so a deployment can be planned without the database"""
+        import arcpy
+
+        field_names, shape_field = self._get_table_fields()
+
+        return {
+            "fields": field_names,
+            "shape_field": shape_field,
+            "rules": {
+                attribute_rule.name: diff.existing_state(attribute_rule)
+                for attribute_rule in arcpy.Describe(self.table_path).attributeRules
+            },
+        }
+
+    def _get_table_fields(self):
+        """returns the names of the fields that can trigger a rule and the name of the shape field"""
+        import arcpy
+
+        fields = arcpy.ListFields(self.table_path)
+
+        field_names = [
+            field.name
+            for field in fields
+            if field.name.lower() not in ("createdon", "modifiedon", "editedby")
+            and field.type.lower() not in ("oid", "guid", "globalid")
+        ]
+        shape_field = next((field.name for field in fields if field.type.lower() == "geometry"), None)
+
+        return field_names, shape_field
+
+    def _check_shape_type(self):
+        """spatial rules are generated for one shape type so they are not deployed to a table with another"""
+        import arcpy
+
+        generated = [rule for rule in self.meta_rules if getattr(rule, "shape_type", None)]
+
+        if not generated:
+            return
+
+        shape_type = arcpy.Describe(self.table_path).shapeType
+
+        for rule in generated:
+            if rule.shape_type != shape_type:
+                raise Exception(
+                    "{} is generated for {} shapes but {} has {} shapes".format(
+                        rule.rule_name, rule.shape_type, self.name, shape_type
+                    )
+                )
+
+    def _get_triggering_fields(self):
+        """returns a function that gives the fields that should trigger a rule
+
+        the fields are the ones the rule's arcade reads so editing an unrelated field does not fire the rule
+        """
+        field_names, shape_field = self._get_table_fields()
+
+        def get_fields(rule):
+            return analyzer.get_triggering_fields(rule.arcade, field_names, shape_field)
+
+        return get_fields
+
+    def _get_alter_args(self, rule, get_fields):
+        args = {
+            "in_table": self.table_path,
+            "name": rule.rule_name,
+            "script_expression": rule.arcade,
+            "triggering_events": rule.triggers,
+            "triggering_fields": ";".join(get_fields(rule)),
+        }
+
+        if hasattr(rule, "error_number"):
+            args["error_number"] = rule.error_number
+            args["error_message"] = rule.error_message
+
+        return args
+
+    def _get_add_args(self, rule, get_fields):
+        args = {
+            "in_table": self.table_path,
+            "name": rule.rule_name,
+            "type": rule.type,
+            "script_expression": rule.arcade,
+            "is_editable": rule.editable,
+            "triggering_events": rule.triggers,
+            "description": rule.description,
+            "subtype": "",
+            "field": rule.field,
+            "exclude_from_client_evaluation": "",
+            "batch": False,
+            "severity": "",
+            "tags": rule.tag,
+            "triggering_fields": ";".join(get_fields(rule)),
+        }
+
+        if hasattr(rule, "error_number"):
+            args["error_number"] = rule.error_number
+            args["error_message"] = rule.error_message
+
+        return args
+
+    def _alter(self, rule, get_fields):
+        import arcpy
+
+        self.calls_issued += 1
+        arcpy.management.AlterAttributeRule(**self._get_alter_args(rule, get_fields))
+        print("    updated")
+
+    def _add(self, rule, get_fields):
+        import arcpy
+        from arcgisscripting import ExecuteError  # pylint: disable=no-name-in-module
+
+        try:
+            self.calls_issued += 1
+            arcpy.management.AddAttributeRule(**self._get_add_args(rule, get_fields))
+            print("    created")
+        except ExecuteError as e:
+            (message,) = e.args
+
+            if message.startswith("ERROR 002541"):
+                print("    rule already exists, skipping...")
+            else:
+                raise e
+
+    def _delete(self, rule):
+        import arcpy
+        from arcgisscripting import ExecuteError  # pylint: disable=no-name-in-module
+
+        try:
+            self.calls_issued += 1
+            arcpy.management.DeleteAttributeRule(
+                in_table=self.table_path,
+                names=rule.rule_name,
+                type=rule.type,
+            )
+            print("    deleted")
+        except ExecuteError as e:
+            (message,) = e.args
+
+            if message.startswith("ERROR 002556"):
+                print("    rule already deleted, skipping...")
+            else:
+                raise e
+
+    def delete(self):
+        for rule in self.meta_rules:
+            print("  deleting {} rule".format(rule.rule_name))
+            self._delete(rule)
@@ -6,6 +6,17 @@ A module that holds the types of rules
 """
 
 from config import config
+from services.loader import preprocess
+
+#: a composite constraint runs each check as a function and returns the first result that is not true
+COMPOSITE = """{functions}
+
+var editType = $editcontext.editType;
+var result = true;
+
+{branches}
+
+return true;"""
 
 
 class BaseType(object):
@@ -16,9 +27,30 @@ class BaseType(object):
 
         self.description = None
         self.tag = None
+        self.shape_type = None
 
         self.arcade = None
 
+    @property
+    def arcade(self):
+        """the arcade text. rules can be given a function that loads the text so it is only read when used"""
+        if callable(self._arcade):
+            return self._arcade()
+
+        return self._arcade
+
+    @property
+    def source(self):
+        """the arcade as it is written. rules loaded from a file give the text before it is preprocessed"""
+        if callable(getattr(self._arcade, "source", None)):
+            return self._arcade.source()
+
+        return self.arcade
+
+    @arcade.setter
+    def arcade(self, value):
+        self._arcade = value
+
 
 class Constant(BaseType):
     def __init__(self, name, field, value):
@@ -49,6 +81,28 @@ class Calculation(BaseType):
         self.tag = "Calculation"
 
 
+class MultiCalculation(BaseType):
+    """a calculation that sets several fields from one evaluation
+
+    the arcade returns {'result': {'attributes': {field: value}}} so the rule has no field of its own. replaces is the
+    names of the single field calculations it takes the place of so deployments can delete them
+    """
+
+    def __init__(self, name, rule_name, fields, arcade, replaces=None):
+        super(MultiCalculation, self).__init__()
+
+        self.name = name
+        self.field = None
+        self.fields = fields
+        self.replaces = replaces or []
+        self.rule_name = rule_name
+        self.description = name
+
+        self.arcade = arcade
+
+        self.tag = "MultiCalculation"
+
+
 class Constraint(BaseType):
     def __init__(self, name, rule_name, arcade):
         super(Constraint, self).__init__()
@@ -66,3 +120,53 @@ class Constraint(BaseType):
 
         self.error_message = " "
         self.error_number = 20250721
+
+
+class CompositeConstraint(Constraint):
+    """a constraint that runs the checks of several constraints in one evaluation
+
+    each constraint's arcade becomes a function that is only called for the edit types that constraint is triggered by
+    and the first error message is returned. the constraints are replaced so deployments delete them
+    """
+
+    def __init__(self, name, rule_name, constraints):
+        super(CompositeConstraint, self).__init__(name, rule_name, self._combine)
+
+        self.constraints = constraints
+        self.replaces = list(dict.fromkeys(constraint.rule_name for constraint in constraints))
+        self.triggers = [
+            trigger
+            for trigger in (config.triggers.insert, config.triggers.update, config.triggers.delete)
+            if any(trigger in _triggers(constraint) for constraint in constraints)
+        ]
+
+        self.tag = "CompositeConstraint"
+
+        #: the member arcade and the combined arcade from the last time it was built
+        self._combined = (None, None)
+
+    def _combine(self):
+        scripts = [constraint.arcade for constraint in self.constraints]
+
+        if self._combined[0] == scripts:
+            return self._combined[1]
+
+        functions = ["function check{}() {{\n{}\n}}".format(index, script) for index, script in enumerate(scripts)]
+        branches = []
+
+        for trigger in self.triggers:
+            calls = [
+                "result = check{}();\nif (result != true) {{\nreturn result;\n}}".format(index)
+                for index, constraint in enumerate(self.constraints)
+                if trigger in _triggers(constraint)
+            ]
+            branches.append("if (editType == '{}') {{\n{}\n}}".format(trigger, "\n".join(calls)))
+
+        text = preprocess(COMPOSITE.format(functions="\n\n".join(functions), branches="\n\n".join(branches)))
+        self._combined = (scripts, text)
+
+        return text
+
+
+def _triggers(rule):
+    return [rule.triggers] if isinstance(rule.triggers, str) else list(rule.triggers)
@@ -4,20 +4,21 @@
 reference
 
 Usage:
-    reference refresh [--env=<env>]
+    reference refresh [--env=<env> --trace=<file>]
     reference --version
     reference (-h | --help)
 
 Options:
     --env=<env>     local, dev, prod
+    --trace=<file>  Time every geoprocessing call and write them to a json lines file
     -h --help       Shows this screen
     -v --version    Shows the version
 """
 
-import arcpy
 from docopt import docopt
 
 from config.config import get_sde_path_for
+from services import trace
 
 VERSION = "2025.07.21"
 
@@ -27,6 +28,8 @@ def import_sgid_data(sde):
     Imports SGID data for municipalities, zip codes, and county boundaries
     into the specified environment (staging or production).
     """
+    import arcpy
+
     # Define SGID source tables
     sgid_tables = {
         "Municipalities": "https://services1.arcgis.com/99lidPhWCzftIe9K/ArcGIS/rest/services/UtahMunicipalBoundaries/FeatureServer/0",
@@ -39,8 +42,8 @@ def import_sgid_data(sde):
         print(f"Refreshing {sgid_path} to {target_fc}...")
 
         # Truncate the target feature class before appending new data
-        arcpy.management.TruncateTable(target_fc)
-        arcpy.management.Append(sgid_path, target_fc, "NO_TEST")
+        arcpy.management.TruncateTable(in_table=target_fc)
+        arcpy.management.Append(inputs=sgid_path, target=target_fc, schema_type="NO_TEST")
 
 
 def main():
@@ -50,7 +53,14 @@ def main():
     sde = get_sde_path_for(args["--env"])
     print("acting on {}".format(sde))
 
-    import_sgid_data(sde)
+    if args["--trace"]:
+        trace.enable()
+
+    try:
+        import_sgid_data(sde)
+    finally:
+        if args["--trace"]:
+            trace.finish(args["--trace"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+rules
+A registry of the table rule modules that are only imported when they are asked for
+"""
+
+from importlib import import_module
+
+#: the rule module names in deployment order
+NAMES = [
+    "facility",
+    "well",
+    "area_of_review",
+    "art_pen",
+    "authorization_action",
+    "authorization",
+    "contact",
+    "correction",
+    "enforcement",
+    "inspection",
+    "mit",
+    "operating_status",
+    "violation",
+]
+
+
+def load(name):
+    """imports and returns the rules.<name> module which has a TABLE name and a RULES list"""
+    if name not in NAMES:
+        raise Exception("{} rule not found".format(name))
+
+    return import_module("{}.{}".format(__name__, name))
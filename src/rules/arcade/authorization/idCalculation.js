@@ -1,13 +1,12 @@
+#include related/{traversal}/parents
+
 // UTUCCAAXXXXXXX
 // CC = 2 digit CountyFIPS code of associated Facility
 // AA = 2 digit AuthorizationType code (https://github.com/agrc/uic-attribute-rules/issues/5)
 
-function generateId(code, fk) {
+function generateId(code) {
   var field = 'CountyFIPS';
-  var set = FeatureSetByName($datastore, 'UICFacility', [field], false);
-
-  // TODO: One day there will be a relationship traversal operation
-  var facilities = filter(set, 'GUID=@fk');
+  var facilities = getParents([field]);
 
   if (isempty(facilities)) {
     return null;
@@ -24,4 +23,4 @@ function generateId(code, fk) {
 
 var missingRequiredItems = isempty($feature.authorizationtype) || isempty($feature.facility_fk);
 
-return iif(missingRequiredItems, null, generateId($feature.authorizationtype, $feature.facility_fk));
+return iif(missingRequiredItems, null, generateId($feature.authorizationtype));
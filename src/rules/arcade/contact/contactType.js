@@ -1,3 +1,6 @@
+#include related/{traversal}/parents
+#include related/{traversal}/children
+
 if (!haskey($feature, 'guid') || isempty($feature.guid)) {
   return true;
 }
@@ -8,13 +11,7 @@ if (indexof(ownerTypes, $feature.contacttype) > -1) {
   return true;
 }
 
-var facilitySet = FeatureSetByName($datastore, 'UICFacility', ['guid'], false);
-var contactSet = FeatureSetByName($datastore, 'UICContact', ['Facility_FK', 'ContactType'], false);
-
-var pk = $feature.facility_fk;
-
-// TODO: One day there will be a relationship traversal operation
-var facilities = filter(facilitySet, 'guid=@pk');
+var facilities = getParents(['guid']);
 
 if (isempty(facilities)) {
   return {
@@ -22,8 +19,7 @@ if (isempty(facilities)) {
   };
 }
 
-var fk = $feature.facility_fk;
-var contacts = filter(contactSet, 'Facility_FK=@fk');
+var contacts = getChildren(first(facilities), ['Facility_FK', 'ContactType']);
 
 for (var contact in contacts) {
   if (indexof(ownerTypes, contact.contacttype) > -1) {
@@ -0,0 +1,27 @@
+#include lookup/{shape_type}
+
+var zips = intersects(FeatureSetByName($datastore, 'ZipCodes', ['ZIP5'], true), $feature);
+
+if (count(zips) == 0) {
+  return { 'errorMessage': 'No intersection found' };
+}
+
+var counties = intersects(FeatureSetByName($datastore, 'Counties', ['FIPS'], true), $feature);
+var cities = intersects(FeatureSetByName($datastore, 'Municipalities', ['NAME'], true), $feature);
+
+var fips = null;
+
+if (count(counties) > 0) {
+  fips = number('490' + text(getIntersectingAttribute($feature, counties, 'FIPS'), '00'));
+  fips = iif(isnan(fips), null, fips);
+}
+
+return {
+  'result': {
+    'attributes': {
+      'CountyFIPS': fips,
+      'FacilityCity': getIntersectingAttribute($feature, cities, 'NAME'),
+      'FacilityZIP': getIntersectingAttribute($feature, zips, 'ZIP5')
+    }
+  }
+};
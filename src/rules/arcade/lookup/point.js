@@ -0,0 +1,10 @@
+// points are inside one boundary or on the edge of some so the first one is used
+function getIntersectingAttribute(feat, items, field) {
+  var item = first(items);
+
+  if (isempty(item)) {
+    return null;
+  }
+
+  return item[field];
+}
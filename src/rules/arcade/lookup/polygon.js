@@ -0,0 +1,28 @@
+// polygons use the boundary they overlap the most
+function getIntersectingAttribute(feat, items, field) {
+  var counts = count(items);
+
+  if (counts == 0) {
+    return null;
+  }
+
+  if (counts == 1) {
+    var result = first(items);
+
+    return result[field];
+  }
+
+  var largest = -1;
+  var result;
+
+  for (var item in items) {
+    var size = area(intersection(item, feat));
+
+    if (size > largest) {
+      largest = size;
+      result = item[field];
+    }
+  }
+
+  return result;
+}
@@ -0,0 +1,6 @@
+// the child_table rows whose foreign_key is the parent's parent_key, filtered from the whole table
+function getChildren(parent, fields) {
+  var pk = parent[parent_key];
+
+  return filter(FeatureSetByName($datastore, child_table, fields, false), foreign_key + '=@pk');
+}
@@ -0,0 +1,11 @@
+// the parent_table rows whose parent_key is $feature's foreign_key, filtered from the whole table, none without a
+// foreign_key
+function getParents(fields) {
+  var fk = $feature[foreign_key];
+
+  if (isempty(fk)) {
+    return null;
+  }
+
+  return filter(FeatureSetByName($datastore, parent_table, fields, false), parent_key + '=@fk');
+}
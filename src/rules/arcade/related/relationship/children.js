@@ -0,0 +1,5 @@
+// the child_table rows related to a parent through the relationship_name relationship class. the parent needs the
+// parent_key field
+function getChildren(parent, fields) {
+  return FeatureSetByRelationshipName(parent, relationship_name, fields, false);
+}
@@ -0,0 +1,9 @@
+// the parent_table rows related to $feature through the relationship_name relationship class, none without a
+// foreign_key
+function getParents(fields) {
+  if (isempty($feature[foreign_key])) {
+    return null;
+  }
+
+  return FeatureSetByRelationshipName($feature, relationship_name, fields, false);
+}
@@ -7,7 +7,7 @@ A module that has the UICArtPen rules
 
 from config import config
 from models.ruletypes import Constant, Constraint
-from services.loader import load_rule_for
+from services.loader import lazy_rule_for
 
 from . import common
 
@@ -33,17 +33,17 @@ well_type_constraint_update = Constraint(
 well_type_constraint_update.triggers = [config.triggers.update]
 
 review_date_constraint = Constraint(
-    "Art Pen Review Date", "Artpen_ReviewDate", load_rule_for(FOLDER, "reviewDateConstraint")
+    "Art Pen Review Date", "Artpen_ReviewDate", lazy_rule_for(FOLDER, "reviewDateConstraint")
 )
 review_date_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
-catype_constraint = Constraint("Art Pen Review Date", "ArtPen_CAType", load_rule_for(FOLDER, "caTypeConstraint"))
+catype_constraint = Constraint("Art Pen Review Date", "ArtPen_CAType", lazy_rule_for(FOLDER, "caTypeConstraint"))
 catype_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
-cadate_constraint = Constraint("CA Date", "ArtPen_CADate", load_rule_for(FOLDER, "caDateConstraint"))
+cadate_constraint = Constraint("CA Date", "ArtPen_CADate", lazy_rule_for(FOLDER, "caDateConstraint"))
 cadate_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
-comment_constraint = Constraint("Art Pen Other Ca", "Comments", load_rule_for(FOLDER, "commentConstraint"))
+comment_constraint = Constraint("Art Pen Other Ca", "Comments", lazy_rule_for(FOLDER, "commentConstraint"))
 comment_constraint.triggers = [config.triggers.update]
 
 RULES = [
@@ -7,7 +7,7 @@ A module that has the UICAuthorization rules
 
 from config import config
 from models.ruletypes import Calculation, Constant, Constraint
-from services.loader import load_rule_for
+from services.loader import lazy_rule_for
 
 from . import common
 
@@ -16,7 +16,11 @@ FOLDER = "authorization"
 
 guid_constant = Constant("Authorization Guid", "GUID", "GUID()")
 
-id_calculation = Calculation("Authorization Id", "AuthorizationID", load_rule_for(FOLDER, "idCalculation"))
+id_calculation = Calculation(
+    "Authorization Id",
+    "AuthorizationID",
+    lazy_rule_for(FOLDER, "idCalculation", **common.related("UICFacility", TABLE, "GUID", "Facility_FK")),
+)
 id_calculation.triggers = [config.triggers.insert, config.triggers.update]
 id_calculation.editable = config.editable.no
 
@@ -37,7 +41,7 @@ type_domain_constraint_update = Constraint(
 type_domain_constraint_update.triggers = [config.triggers.update]
 
 type_constraint = Constraint(
-    "Authorization Type Default", "AuthorizationTypeDefault", load_rule_for(FOLDER, "authorizationTypeConstraint")
+    "Authorization Type Default", "AuthorizationTypeDefault", lazy_rule_for(FOLDER, "authorizationTypeConstraint")
 )
 type_constraint.triggers = [config.triggers.update]
 
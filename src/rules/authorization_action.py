@@ -7,7 +7,7 @@ A module that has the UICAuthorizationAction rules
 
 from config import config
 from models.ruletypes import Constant, Constraint
-from services.loader import load_rule_for
+from services.loader import lazy_rule_for
 
 from . import common
 
@@ -32,14 +32,14 @@ action_type_domain_constraint_update.triggers = [config.triggers.update]
 action_date_constraint = Constraint(
     "Authorization Action Date",
     "AuthorizationActionDate and AuthorizationActionType",
-    load_rule_for(FOLDER, "dateConstraint"),
+    lazy_rule_for(FOLDER, "dateConstraint"),
 )
 action_date_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
 action_type_constraint = Constraint(
     "Authorization Action Type",
     "AuthorizationActionType and AuthorizationActionDate",
-    load_rule_for(FOLDER, "typeConstraint"),
+    lazy_rule_for(FOLDER, "typeConstraint"),
 )
 action_type_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
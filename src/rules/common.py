@@ -5,6 +5,9 @@ common.py
 A module that holds common arcade expressions
 """
 
+from config import config
+from services.loader import preprocess
+
 ALLOW_EMPTY = """if (!haskey($feature, '{0}') || isempty($feature.{0})) {{
   return true;
 }}
@@ -37,10 +40,36 @@ def constrain_to_domain(field, allow_null=True, domain=None):
         domain = " " + domain
 
     if allow_null:
-        return ALLOW_EMPTY.format(field, domain)
+        return preprocess(ALLOW_EMPTY.format(field, domain))
 
-    return NO_EMPTY.format(field, domain)
+    return preprocess(NO_EMPTY.format(field, domain))
 
 
 def constrain_to_required(field):
-    return REQUIRED.format(field)
+    return preprocess(REQUIRED.format(field))
+
+
+def related(parent_table, child_table, parent_key, foreign_key):
+    """the constants for a rule that includes related/{traversal}/parents or children to read the related rows
+
+    a relationship class between the tables is traversed and the whole table is filtered when there is none
+    """
+    wanted = (parent_table.lower(), child_table.lower(), parent_key.lower(), foreign_key.lower())
+    traversal = "filter"
+    name = None
+
+    for relationship in config.relationships:
+        keys = (relationship.origin, relationship.destination, relationship.primary_key, relationship.foreign_key)
+
+        if tuple(key.lower() for key in keys) == wanted:
+            traversal = "relationship"
+            name = relationship.name
+
+    return {
+        "traversal": traversal,
+        "relationship_name": name,
+        "parent_table": parent_table,
+        "child_table": child_table,
+        "parent_key": parent_key,
+        "foreign_key": foreign_key,
+    }
@@ -6,8 +6,8 @@ A module that has the UICContact rules
 """
 
 from config import config
-from models.ruletypes import Constant, Constraint
-from services.loader import load_rule_for
+from models.ruletypes import CompositeConstraint, Constant, Constraint
+from services.loader import lazy_rule_for
 
 from . import common
 
@@ -65,19 +65,31 @@ type_constraint_update = Constraint(
 )
 type_constraint_update.triggers = [config.triggers.update]
 
-contact_type_constraint = Constraint("Owner Operator", "OwnerType", load_rule_for(FOLDER, "contactType"))
+contact_type_constraint = Constraint(
+    "Owner Operator",
+    "OwnerType",
+    lazy_rule_for(FOLDER, "contactType", **common.related("UICFacility", TABLE, "GUID", "Facility_FK")),
+)
 contact_type_constraint.triggers = [config.triggers.update]
 
+field_constraint = CompositeConstraint(
+    "Contact required fields and domains",
+    "Contact.fields",
+    [
+        name_constraint_update,
+        type_constraint,
+        type_constraint_update,
+        organization_constraint_update,
+        address_constraint_update,
+        city_constraint_update,
+        state_constraint,
+        state_constraint_update,
+        phone_constraint_update,
+    ],
+)
+
 RULES = [
     guid_constant,
-    name_constraint_update,
+    field_constraint,
     contact_type_constraint,
-    type_constraint,
-    type_constraint_update,
-    organization_constraint_update,
-    address_constraint_update,
-    city_constraint_update,
-    state_constraint,
-    state_constraint_update,
-    phone_constraint_update,
 ]
@@ -7,7 +7,7 @@ A module that has the UICCorrection rules
 
 from config import config
 from models.ruletypes import Constant, Constraint
-from services.loader import load_rule_for
+from services.loader import lazy_rule_for
 
 from . import common
 
@@ -29,7 +29,7 @@ type_constraint_update = Constraint(
 )
 type_constraint_update.triggers = [config.triggers.update]
 
-comment_constraint = Constraint("Comment", "Comment", load_rule_for(FOLDER, "commentConstraint"))
+comment_constraint = Constraint("Comment", "Comment", lazy_rule_for(FOLDER, "commentConstraint"))
 comment_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
 RULES = [
@@ -6,8 +6,8 @@ A module that has the UICInspection rules
 """
 
 from config import config
-from models.ruletypes import Constant, Constraint
-from services.loader import load_rule_for
+from models.ruletypes import CompositeConstraint, Constant, Constraint
+from services.loader import lazy_rule_for
 
 from . import common
 
@@ -55,14 +55,14 @@ deficiency_domain_constraint_update = Constraint(
 )
 deficiency_domain_constraint_update.triggers = [config.triggers.update]
 
-foreign_key_constraint = Constraint("One parent relation", "Single Parent", load_rule_for(FOLDER, "oneFKConstraint"))
+foreign_key_constraint = Constraint("One parent relation", "Single Parent", lazy_rule_for(FOLDER, "oneFkConstraint"))
 foreign_key_constraint.triggers = [config.triggers.update]
 
-facility_only_constraint = Constraint("NW for facility only", "InspectionType", load_rule_for(FOLDER, "typeConstraint"))
+facility_only_constraint = Constraint("NW for facility only", "InspectionType", lazy_rule_for(FOLDER, "typeConstraint"))
 facility_only_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
 inspection_date_constraint = Constraint(
-    "Well operating status date", "InspectionDate", load_rule_for(FOLDER, "dateConstraint")
+    "Well operating status date", "InspectionDate", lazy_rule_for(FOLDER, "dateConstraint")
 )
 inspection_date_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
@@ -72,25 +72,33 @@ inspection_date_required_constraint = Constraint(
 inspection_date_required_constraint.triggers = [config.triggers.update]
 
 deficiency_constraint = Constraint(
-    "No Deficiency", "InspectionDeficiency", load_rule_for(FOLDER, "deficiencyConstraint")
+    "No Deficiency", "InspectionDeficiency", lazy_rule_for(FOLDER, "deficiencyConstraint")
 )
 deficiency_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
 name_constraint_update = Constraint("Name is required", "Inspector", common.constrain_to_required("Inspector"))
 name_constraint_update.triggers = [config.triggers.update]
 
+field_constraint = CompositeConstraint(
+    "Inspection required fields and domains",
+    "Inspection.fields",
+    [
+        type_domain_constraint,
+        type_domain_constraint_update,
+        inspection_date_required_constraint,
+        assistance_domain_constraint,
+        assistance_domain_constraint_update,
+        deficiency_domain_constraint,
+        deficiency_domain_constraint_update,
+        name_constraint_update,
+    ],
+)
+
 RULES = [
     guid_constant,
-    type_domain_constraint,
-    type_domain_constraint_update,
+    field_constraint,
     inspection_date_constraint,
-    inspection_date_required_constraint,
-    assistance_domain_constraint,
-    assistance_domain_constraint_update,
-    deficiency_domain_constraint,
-    deficiency_domain_constraint_update,
     foreign_key_constraint,
     facility_only_constraint,
     deficiency_constraint,
-    name_constraint_update,
 ]
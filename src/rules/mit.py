@@ -7,7 +7,7 @@ A module that has the UICMIT rules
 
 from config import config
 from models.ruletypes import Constant, Constraint
-from services.loader import load_rule_for
+from services.loader import lazy_rule_for
 
 from . import common
 
@@ -27,31 +27,43 @@ date_constraint_update.triggers = [config.triggers.update]
 result_constraint_update = Constraint("MIT result", "MITResult.update", common.constrain_to_required("MITResult"))
 result_constraint_update.triggers = [config.triggers.update]
 
-type_constraint = Constraint("MIT Date and Type", "MITDate", load_rule_for(FOLDER, "typeConstraint"))
+type_constraint = Constraint("MIT Date and Type", "MITDate", lazy_rule_for(FOLDER, "typeConstraint"))
 type_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
-result_constraint = Constraint("MIT Result and Type", "MITResult", load_rule_for(FOLDER, "resultConstraint"))
+result_constraint = Constraint("MIT Result and Type", "MITResult", lazy_rule_for(FOLDER, "resultConstraint"))
 result_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
 remediation_constraint = Constraint(
-    "MIT Remediation Action and Result", "RemediationAction", load_rule_for(FOLDER, "remediationConstraint")
+    "MIT Remediation Action and Result", "RemediationAction", lazy_rule_for(FOLDER, "remediationConstraint")
 )
 remediation_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
 remediation_date_constraint = Constraint(
-    "Remediation Action Date and Remediation Action", "RemActDate", load_rule_for(FOLDER, "remediationDate")
+    "Remediation Action Date and Remediation Action", "RemActDate", lazy_rule_for(FOLDER, "remediationDate")
 )
 remediation_date_constraint.triggers = [config.triggers.update]
 
-comment_constraint = Constraint("Comment for Other Action", "Comment", load_rule_for(FOLDER, "commentConstraint"))
+comment_constraint = Constraint("Comment for Other Action", "Comment", lazy_rule_for(FOLDER, "commentConstraint"))
 comment_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
+#: the mit types that need a comment, lower cased like the domain name the rule compares them with
+OTHER_TYPES = ["1 - other significant leak test", "2 - other fluid migration test"]
+
 comment_mittype_constraint = Constraint(
-    "Comment for MIT Type", "Comment.MITType", load_rule_for(FOLDER, "commentMitTypeConstraint")
+    "Comment for MIT Type",
+    "Comment.MITType",
+    lazy_rule_for(
+        FOLDER,
+        "commentMitTypeConstraint",
+        other_types=OTHER_TYPES,
+        other_types_message="If MITType is {}, describe the alternative MIT method in the Comments field.".format(
+            " or ".join("`{}`".format(mit_type) for mit_type in OTHER_TYPES)
+        ),
+    ),
 )
 comment_mittype_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
-mit_rem_date_constraint = Constraint("Rem ACT date", "MITRemActDate", load_rule_for(FOLDER, "dateConstraint"))
+mit_rem_date_constraint = Constraint("Rem ACT date", "MITRemActDate", lazy_rule_for(FOLDER, "dateConstraint"))
 mit_rem_date_constraint.triggers = [config.triggers.update]
 
 RULES = [
@@ -7,7 +7,7 @@ A module that has the UICWellOperatingStatus rules
 
 from config import config
 from models.ruletypes import Constant, Constraint
-from services.loader import load_rule_for
+from services.loader import lazy_rule_for
 
 from . import common
 
@@ -23,13 +23,13 @@ type_domain_constraint = Constraint(
 )
 type_domain_constraint.triggers = [config.triggers.update]
 
-date_constraint = Constraint("Operating Status Date", "OperatingStatusDate", load_rule_for(FOLDER, "dateConstraint"))
+date_constraint = Constraint("Operating Status Date", "OperatingStatusDate", lazy_rule_for(FOLDER, "dateConstraint"))
 date_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
 type_constraint = Constraint(
     "Operating status type needs a date",
     "OperatingStatusType date requirement",
-    load_rule_for(FOLDER, "typeConstraint"),
+    lazy_rule_for(FOLDER, "typeConstraint"),
 )
 type_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
@@ -6,8 +6,8 @@ A module that has the UICViolation rules
 """
 
 from config import config
-from models.ruletypes import Calculation, Constant, Constraint
-from services.loader import load_rule_for
+from models.ruletypes import Calculation, CompositeConstraint, Constant, Constraint
+from services.loader import lazy_rule_for
 
 from . import common
 
@@ -36,7 +36,7 @@ contamination_domain_constraint = Constraint(
 )
 
 contamination_domain_constraint_update = Constraint(
-    "Contamination", "USDWContamination.update", load_rule_for(FOLDER, "wellRequiresContaminationConstraint")
+    "Contamination", "USDWContamination.update", lazy_rule_for(FOLDER, "wellRequiresContaminationConstraint")
 )
 contamination_domain_constraint_update.triggers = [config.triggers.update]
 
@@ -54,7 +54,7 @@ endanger_domain_constraint_update.triggers = [config.triggers.update]
 contamination_calculation = Calculation(
     "Significant Non Compliance",
     "SignificantNonCompliance",
-    load_rule_for(FOLDER, "significantNonComplianceCalculation"),
+    lazy_rule_for(FOLDER, "significantNonComplianceCalculation"),
 )
 contamination_calculation.triggers = [config.triggers.insert, config.triggers.update]
 
@@ -71,38 +71,46 @@ noncompliance_domain_constraint_update = Constraint(
 )
 noncompliance_domain_constraint_update.triggers = [config.triggers.update]
 
-comment_constraint = Constraint("Comments required for other", "Comments", load_rule_for(FOLDER, "commentConstraint"))
+comment_constraint = Constraint("Comments required for other", "Comments", lazy_rule_for(FOLDER, "commentConstraint"))
 comment_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
 violation_constraint = Constraint(
-    "Violation Type For Facility vs Well", "FacilityWellTypes", load_rule_for(FOLDER, "facilityWellTypesConstraint")
+    "Violation Type For Facility vs Well", "FacilityWellTypes", lazy_rule_for(FOLDER, "facilityWellTypesConstraint")
 )
 violation_constraint.triggers = [config.triggers.update]
 
 violation_date_constraint = Constraint("Violation Date", "ViolationDate", common.constrain_to_required("ViolationDate"))
 violation_date_constraint.triggers = [config.triggers.update]
 
-foreign_key_constraint = Constraint("One parent relation", "Single Parent", load_rule_for(FOLDER, "oneFKConstraint"))
+foreign_key_constraint = Constraint("One parent relation", "Single Parent", lazy_rule_for(FOLDER, "oneFkConstraint"))
 foreign_key_constraint.triggers = [config.triggers.update]
 
 facility_no_contamination_calculation = Calculation(
-    "Facilities no contamination", "USDWContamination", load_rule_for(FOLDER, "facilityContaminationCalculation")
+    "Facilities no contamination", "USDWContamination", lazy_rule_for(FOLDER, "facilityContaminationCalculation")
+)
+
+field_constraint = CompositeConstraint(
+    "Violation required fields and domains",
+    "Violation.fields",
+    [
+        type_domain_constraint,
+        type_domain_constraint_update,
+        contamination_domain_constraint,
+        endanger_domain_constraint,
+        endanger_domain_constraint_update,
+        noncompliance_domain_constraint,
+        noncompliance_domain_constraint_update,
+        violation_date_constraint,
+    ],
 )
 
 RULES = [
     guid_constant,
-    type_domain_constraint,
-    type_domain_constraint_update,
+    field_constraint,
     violation_constraint,
-    contamination_domain_constraint,
     contamination_domain_constraint_update,
-    endanger_domain_constraint,
-    endanger_domain_constraint_update,
-    noncompliance_domain_constraint,
-    noncompliance_domain_constraint_update,
     facility_no_contamination_calculation,
     contamination_calculation,
     comment_constraint,
-    violation_date_constraint,
     foreign_key_constraint,
 ]
@@ -5,24 +5,30 @@ well.py
 A module that holds the rules for uic wells
 """
 
-from . import common
 from config import config
-from services.loader import load_rule_for
 from models.ruletypes import Calculation, Constant, Constraint
+from services.loader import lazy_rule_for
+
+from . import common
 
 TABLE = "UICWell"
 FOLDER = "well"
+SHAPE_TYPE = config.shape_types.point
 
 guid_constant = Constant("Well Guid", "GUID", "Guid()")
 
-id_calculation = Calculation("Well Id", "WellId", load_rule_for(FOLDER, "idCalculation"))
+id_calculation = Calculation("Well Id", "WellId", lazy_rule_for(FOLDER, "idCalculation", shape_type=SHAPE_TYPE))
+id_calculation.shape_type = SHAPE_TYPE
 id_calculation.triggers = [config.triggers.insert, config.triggers.update]
 id_calculation.editable = config.editable.no
 
 well_name_constraint = Constraint("Well Name", "WellName", common.constrain_to_required("WellName"))
 well_name_constraint.triggers = [config.triggers.update]
 
-facility_calculation = Calculation("Facility Fk", "Facility_Fk", load_rule_for(FOLDER, "facilityCalculation"))
+facility_calculation = Calculation(
+    "Facility Fk", "Facility_Fk", lazy_rule_for(FOLDER, "facilityCalculation", shape_type=SHAPE_TYPE)
+)
+facility_calculation.shape_type = SHAPE_TYPE
 
 class_constraint = Constraint(
     "Well Class", "Class", common.constrain_to_domain("WellClass", allow_null=True, domain="UICWellClassDomain")
@@ -33,10 +39,10 @@ class_constraint_update = Constraint(
 )
 class_constraint_update.triggers = [config.triggers.update]
 
-subclass_constraint = Constraint("Well Subclass", "Subclass", load_rule_for(FOLDER, "subClassConstraint"))
+subclass_constraint = Constraint("Well Subclass", "Subclass", lazy_rule_for(FOLDER, "subClassConstraint"))
 subclass_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
-highpriority_constraint = Constraint("High Priority", "HighPriority", load_rule_for(FOLDER, "highPriorityConstraint"))
+highpriority_constraint = Constraint("High Priority", "HighPriority", lazy_rule_for(FOLDER, "highPriorityConstraint"))
 highpriority_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
 injection_aquifer_constraint = Constraint(
@@ -47,21 +53,21 @@ injection_aquifer_constraint = Constraint(
 injection_aquifer_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
 no_migration_pet_status_constraint = Constraint(
-    "No Migration Pet Status", "NoMigrationPetStatus", load_rule_for(FOLDER, "noMigrationPetStatusConstraint")
+    "No Migration Pet Status", "NoMigrationPetStatus", lazy_rule_for(FOLDER, "noMigrationPetStatusConstraint")
 )
 no_migration_pet_status_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
 facility_type_constraint = Constraint(
-    "Class I Facility Type", "ClassIFacilityType", load_rule_for(FOLDER, "facilityTypeConstraint")
+    "Class I Facility Type", "ClassIFacilityType", lazy_rule_for(FOLDER, "facilityTypeConstraint")
 )
 facility_type_constraint.triggers = [config.triggers.insert, config.triggers.update]
 
 remediation_type_constraint = Constraint(
-    "Remediation Project Type", "RemediationProjectType", load_rule_for(FOLDER, "remediationConstraint_insert")
+    "Remediation Project Type", "RemediationProjectType", lazy_rule_for(FOLDER, "remediationConstraint_insert")
 )
 
 remediation_type_constraint_update = Constraint(
-    "Remediation Project Type", "RemediationProjectType.update", load_rule_for(FOLDER, "remediationConstraint_update")
+    "Remediation Project Type", "RemediationProjectType.update", lazy_rule_for(FOLDER, "remediationConstraint_update")
 )
 remediation_type_constraint_update.triggers = [config.triggers.update]
 
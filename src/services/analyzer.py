@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+analyzer.py
+A module that statically inspects arcade expressions
+"""
+
+import re
+from types import SimpleNamespace
+
+_comments = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+_attribute = re.compile(r"\$feature\s*\.\s*(\w+)")
+_index = re.compile(r"\$feature\s*\[\s*(?:'(\w+)'|\"(\w+)\"|([^\]]+))\s*\]")
+_field_argument = re.compile(
+    r"\b(?:haskey|domainname|domaincode)\s*\(\s*\$feature\s*,\s*(?:'(\w+)'|\"(\w+)\"|([\w\[\]]+))", re.IGNORECASE
+)
+_bare_feature = re.compile(r"\$feature(?!\s*[.\[\w])")
+_function_name = re.compile(r"(\w*)\s*$")
+_string_variable = re.compile(r"(?:var\s+(\w+)\s*=|#define\s+(\w+))\s*'(\w+)'")
+_array_variable = re.compile(r"var\s+(\w+)\s*=\s*\[([^\]]*)\]")
+_strings = re.compile(r"'(\w+)'|\"(\w+)\"")
+
+#: functions that take $feature to read a field's schema rather than its geometry
+_schema_functions = ("haskey", "domainname", "domaincode", "schema", "subtypes", "subtypecode", "subtypename")
+
+
+def strip_comments(arcade):
+    return _comments.sub("", arcade)
+
+
+def _resolve(name, arcade):
+    """resolves a variable used as a field name to the string literals it was assigned"""
+    name = name.split("[")[0]
+
+    for variable, define, value in _string_variable.findall(arcade):
+        if name in (variable, define):
+            return {value.lower()}
+
+    for variable, values in _array_variable.findall(arcade):
+        if variable == name:
+            return {(single or double).lower() for single, double in _strings.findall(values)}
+
+    return None
+
+
+def _enclosing_function(arcade, position):
+    """returns the lower cased name of the function call that the text at position is an argument of"""
+    depth = 0
+
+    for index in range(position - 1, -1, -1):
+        character = arcade[index]
+
+        if character in ")]}":
+            depth += 1
+        elif character in "([{":
+            if depth == 0:
+                if character != "(":
+                    return ""
+
+                return _function_name.search(arcade[:index]).group(1).lower()
+
+            depth -= 1
+
+    return ""
+
+
+def analyze(arcade):
+    """returns the fields an expression reads from $feature and whether it uses the feature geometry
+
+    dynamic is true when a field name could not be resolved so the caller should assume any field is used
+    """
+    arcade = strip_comments(arcade or "")
+    fields = {name.lower() for name in _attribute.findall(arcade)}
+    dynamic = False
+
+    for single, double, other in _index.findall(arcade) + _field_argument.findall(arcade):
+        if single or double:
+            fields.add((single or double).lower())
+
+            continue
+
+        resolved = _resolve(other.strip(), arcade)
+
+        if resolved is None:
+            dynamic = True
+        else:
+            fields.update(resolved)
+
+    geometry = any(
+        _enclosing_function(arcade, match.start()) not in _schema_functions for match in _bare_feature.finditer(arcade)
+    )
+
+    return SimpleNamespace(fields=fields, geometry=geometry, dynamic=dynamic)
+
+
+def get_triggering_fields(arcade, table_fields, shape_field=None):
+    """returns the subset of table_fields, in table order, that the expression reads
+
+    falls back to every field in table_fields when the expression reads fields dynamically or no fields at all
+    since an empty triggering field list means every field.
+    """
+    analysis = analyze(arcade)
+
+    if analysis.dynamic:
+        return list(table_fields)
+
+    fields = [field for field in table_fields if field.lower() in analysis.fields]
+
+    if analysis.geometry and shape_field and shape_field not in fields:
+        fields.append(shape_field)
+
+    if not fields:
+        return list(table_fields)
+
+    return fields
@@ -0,0 +1,1601 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+arcade.py
+A module that evaluates the subset of arcade the rules use without a geodatabase
+
+Scripts are parsed into a tree of Nodes, compiled into python closures and cached by their text so a rule is only
+parsed once no matter how many features it is evaluated against. Features and the tables FeatureSetByName reads
+come from an in memory FeatureStore.
+"""
+
+import calendar
+import math
+import operator
+import re
+import uuid
+from datetime import datetime, timedelta
+
+from services import geometry as geometry_service
+
+#: every parsed script, keyed by its text
+_programs = {}
+
+_keywords = {"var", "function", "if", "else", "for", "in", "while", "return", "break", "continue"}
+_constants = {"true": True, "false": False, "null": None}
+
+_token_pattern = re.compile(
+    r"""
+    (?P<space>[ \t\r]+)
+    |(?P<newline>\n)
+    |(?P<comment>//[^\n]*|/\*.*?\*/)
+    |(?P<number>\d+\.\d*|\.\d+|\d+)
+    |(?P<string>'(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*")
+    |(?P<name>\$?[A-Za-z_][A-Za-z0-9_]*)
+    |(?P<operator>==|!=|<=|>=|&&|\|\||\+=|-=|[-+*/%<>!=(){}\[\],;:.])
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_escapes = {"n": "\n", "t": "\t", "r": "\r"}
+
+
+class ArcadeError(Exception):
+    """raised when a script can not be parsed or fails while it runs"""
+
+
+class Node(object):
+    """a parsed arcade syntax node
+
+    kind is the type of node, value holds the literal, name or operator and children holds the nested nodes
+    """
+
+    __slots__ = ("children", "kind", "line", "value")
+
+    def __init__(self, kind, value=None, children=None, line=0):
+        self.kind = kind
+        self.value = value
+        self.children = children or []
+        self.line = line
+
+    def __repr__(self):
+        return "Node({}, {!r})".format(self.kind, self.value)
+
+
+def walk(node):
+    """yields a node and every node below it"""
+    yield node
+
+    for child in node.children:
+        if child is not None:
+            yield from walk(child)
+
+
+def tokenize(script, keep_newlines=False):
+    """returns (kind, text, line) tuples. newlines are only kept for tools that rewrite the script"""
+    tokens = []
+    line = 1
+    position = 0
+
+    while position < len(script):
+        match = _token_pattern.match(script, position)
+
+        if match is None:
+            raise ArcadeError("unexpected character {!r} on line {}".format(script[position], line))
+
+        kind = match.lastgroup
+        text = match.group()
+        position = match.end()
+
+        if kind == "newline":
+            if keep_newlines:
+                tokens.append((kind, text, line))
+
+            line += 1
+        elif kind == "comment":
+            line += text.count("\n")
+        elif kind != "space":
+            tokens.append((kind, text, line))
+
+    tokens.append(("end", None, line))
+
+    return tokens
+
+
+def unquote(text):
+    """the value of a string literal"""
+    return re.sub(r"\\(.)", lambda match: _escapes.get(match.group(1), match.group(1)), text[1:-1])
+
+
+class _Parser(object):
+    def __init__(self, script):
+        self.tokens = tokenize(script)
+        self.position = 0
+
+    def peek(self, offset=0):
+        return self.tokens[min(self.position + offset, len(self.tokens) - 1)]
+
+    def next(self):
+        token = self.tokens[self.position]
+        self.position += 1
+
+        return token
+
+    def at(self, text, offset=0):
+        kind, value, _ = self.peek(offset)
+
+        if kind == "name":
+            return value.lower() == text
+
+        return kind == "operator" and value == text
+
+    def accept(self, text):
+        if self.at(text):
+            return self.next()
+
+        return None
+
+    def expect(self, text):
+        if not self.at(text):
+            _, value, line = self.peek()
+
+            raise ArcadeError("expected {} but found {} on line {}".format(text, value or "the end", line))
+
+        return self.next()
+
+    def name(self):
+        kind, value, line = self.next()
+
+        if kind != "name" or value.lower() in _keywords:
+            raise ArcadeError("expected a name but found {} on line {}".format(value or "the end", line))
+
+        return value.lower()
+
+    def program(self):
+        statements = []
+
+        while self.peek()[0] != "end":
+            statements.append(self.statement())
+
+        return Node("program", children=statements)
+
+    def block(self):
+        line = self.expect("{")[2]
+        statements = []
+
+        while not self.at("}"):
+            if self.peek()[0] == "end":
+                raise ArcadeError("missing }} for the block on line {}".format(line))
+
+            statements.append(self.statement())
+
+        self.expect("}")
+
+        return Node("block", children=statements, line=line)
+
+    def end_statement(self):
+        self.accept(";")
+
+    def statement(self):
+        line = self.peek()[2]
+
+        if self.at("{"):
+            return self.block()
+
+        if self.accept("var"):
+            name = self.name()
+            initial = self.expression() if self.accept("=") else None
+            self.end_statement()
+
+            return Node("var", name, [initial], line)
+
+        if self.accept("function"):
+            name = self.name()
+            self.expect("(")
+            parameters = []
+
+            while not self.accept(")"):
+                parameters.append(self.name())
+                self.accept(",")
+
+            return Node("function", (name, parameters), [self.block()], line)
+
+        if self.accept("if"):
+            self.expect("(")
+            condition = self.expression()
+            self.expect(")")
+            then = self.statement()
+            otherwise = self.statement() if self.accept("else") else None
+
+            return Node("if", children=[condition, then, otherwise], line=line)
+
+        if self.accept("for"):
+            self.expect("(")
+            self.accept("var")
+            name = self.name()
+
+            if not self.accept("in"):
+                raise ArcadeError("only for in loops are supported on line {}".format(line))
+
+            iterable = self.expression()
+            self.expect(")")
+
+            return Node("for", name, [iterable, self.statement()], line)
+
+        if self.accept("while"):
+            self.expect("(")
+            condition = self.expression()
+            self.expect(")")
+
+            return Node("while", children=[condition, self.statement()], line=line)
+
+        if self.accept("return"):
+            value = None
+
+            if not self.at(";") and not self.at("}") and self.peek()[0] != "end":
+                value = self.expression()
+            self.end_statement()
+
+            return Node("return", children=[value], line=line)
+
+        if self.accept("break") or self.accept("continue"):
+            kind = self.tokens[self.position - 1][1].lower()
+            self.end_statement()
+
+            return Node(kind, line=line)
+
+        if self.peek()[0] == "name" and self.peek(1)[1] in ("=", "+=", "-="):
+            name = self.name()
+            symbol = self.next()[1]
+            value = self.expression()
+            self.end_statement()
+
+            if symbol != "=":
+                value = Node("binary", symbol[0], [Node("name", name, line=line), value], line)
+
+            return Node("assign", name, [value], line)
+
+        expression = self.expression()
+        self.end_statement()
+
+        return Node("expression", children=[expression], line=line)
+
+    def expression(self):
+        return self.logical_or()
+
+    def logical_or(self):
+        node = self.logical_and()
+
+        while self.at("||"):
+            line = self.next()[2]
+            node = Node("logical", "||", [node, self.logical_and()], line)
+
+        return node
+
+    def logical_and(self):
+        node = self.equality()
+
+        while self.at("&&"):
+            line = self.next()[2]
+            node = Node("logical", "&&", [node, self.equality()], line)
+
+        return node
+
+    def _binary(self, operators, operand):
+        node = operand()
+
+        while self.peek()[0] == "operator" and self.peek()[1] in operators:
+            _, symbol, line = self.next()
+            node = Node("binary", symbol, [node, operand()], line)
+
+        return node
+
+    def equality(self):
+        return self._binary(("==", "!="), self.relational)
+
+    def relational(self):
+        return self._binary(("<", "<=", ">", ">="), self.additive)
+
+    def additive(self):
+        return self._binary(("+", "-"), self.multiplicative)
+
+    def multiplicative(self):
+        return self._binary(("*", "/", "%"), self.unary)
+
+    def unary(self):
+        if self.peek()[0] == "operator" and self.peek()[1] in ("!", "-", "+"):
+            _, symbol, line = self.next()
+
+            return Node("unary", symbol, [self.unary()], line)
+
+        return self.postfix()
+
+    def postfix(self):
+        node = self.primary()
+
+        while True:
+            line = self.peek()[2]
+
+            if self.accept("."):
+                kind, value, _ = self.next()
+
+                if kind != "name":
+                    raise ArcadeError("expected a member name on line {}".format(line))
+
+                node = Node("member", value, [node], line)
+            elif self.accept("["):
+                key = self.expression()
+                self.expect("]")
+                node = Node("index", children=[node, key], line=line)
+            elif self.at("(") and node.kind == "name":
+                self.next()
+                arguments = []
+
+                while not self.accept(")"):
+                    arguments.append(self.expression())
+
+                    if not self.at(")"):
+                        self.expect(",")
+
+                node = Node("call", node.value, arguments, line)
+            else:
+                return node
+
+    def primary(self):
+        kind, value, line = self.next()
+
+        if kind == "number":
+            number = float(value)
+
+            return Node("literal", int(number) if number.is_integer() and "." not in value else number, line=line)
+
+        if kind == "string":
+            return Node("literal", unquote(value), line=line)
+
+        if kind == "name":
+            lowered = value.lower()
+
+            if lowered in _constants:
+                return Node("literal", _constants[lowered], line=line)
+
+            if lowered in _keywords:
+                raise ArcadeError("unexpected {} on line {}".format(value, line))
+
+            return Node("name", lowered, line=line)
+
+        if value == "(":
+            node = self.expression()
+            self.expect(")")
+
+            return node
+
+        if value == "[":
+            items = []
+
+            while not self.accept("]"):
+                items.append(self.expression())
+
+                if not self.at("]"):
+                    self.expect(",")
+
+            return Node("array", children=items, line=line)
+
+        if value == "{":
+            keys = []
+            values = []
+
+            while not self.accept("}"):
+                key_kind, key, key_line = self.next()
+
+                if key_kind not in ("string", "name"):
+                    raise ArcadeError("expected a dictionary key on line {}".format(key_line))
+
+                keys.append(unquote(key) if key_kind == "string" else key)
+                self.expect(":")
+                values.append(self.expression())
+
+                if not self.at("}"):
+                    self.expect(",")
+
+            return Node("dictionary", keys, values, line)
+
+        raise ArcadeError("unexpected {} on line {}".format(value or "the end of the script", line))
+
+
+def parse(script):
+    """returns the syntax tree of a script"""
+    return _Parser(script).program()
+
+
+class Feature(object):
+    """a row with case insensitive field names and an optional geometry"""
+
+    def __init__(self, attributes, geometry=None, table=None):
+        self.attributes = {key.lower(): value for key, value in attributes.items()}
+        self.geometry = geometry
+        self.table = table
+
+    def has(self, field):
+        return field.lower() in self.attributes
+
+    def get(self, field):
+        try:
+            return self.attributes[field.lower()]
+        except KeyError:
+            raise ArcadeError("field {} is not available on {}".format(field, self.table or "the feature")) from None
+
+    def project(self, fields, with_geometry):
+        """a copy with only fields and the geometry when it is asked for"""
+        if fields is None:
+            attributes = self.attributes
+        else:
+            attributes = {field.lower(): self.attributes.get(field.lower()) for field in fields}
+
+        return Feature(attributes, self.geometry if with_geometry else None, self.table)
+
+    def __repr__(self):
+        return "Feature({})".format(self.attributes)
+
+
+class FeatureSet(object):
+    """the rows of a table that FeatureSetByName, filter and intersects return"""
+
+    def __init__(self, features, fields=None, with_geometry=True):
+        self.features = features
+        self.fields = fields
+        self.with_geometry = with_geometry
+
+    def derive(self, features):
+        return FeatureSet(features, self.fields, self.with_geometry)
+
+    def __iter__(self):
+        for feature in self.features:
+            yield feature.project(self.fields, self.with_geometry)
+
+    def __len__(self):
+        return len(self.features)
+
+
+class FeatureStore(object):
+    """the tables and coded value domains a script can read through $datastore"""
+
+    def __init__(self):
+        self.tables = {}
+        self.domains = {}
+        self.relationships = {}
+
+    def add(self, table, attributes, geometry=None):
+        feature = Feature(attributes, geometry, table)
+        self.tables.setdefault(table.lower(), []).append(feature)
+
+        return feature
+
+    def add_domain(self, table, field, codes):
+        """codes is a dictionary of code to name"""
+        self.domains.setdefault(table.lower(), {})[field.lower()] = codes
+
+    def add_relationship(self, name, origin, destination, primary_key, foreign_key):
+        """a one to many relationship class from the origin primary key to the destination foreign key"""
+        self.relationships[name.lower()] = (origin, destination, primary_key, foreign_key)
+
+    def feature_set(self, table, fields=None, with_geometry=True):
+        if fields is not None and "*" in fields:
+            fields = None
+
+        return FeatureSet(self.tables.get(table.lower(), []), fields, with_geometry)
+
+    def related(self, feature, name, fields=None, with_geometry=True):
+        """the rows related to a feature through a relationship class, from either end of it"""
+        if name.lower() not in self.relationships:
+            raise ArcadeError("{} relationship class not found".format(name))
+
+        origin, destination, primary_key, foreign_key = self.relationships[name.lower()]
+
+        if (feature.table or "").lower() == origin.lower():
+            table, key, value = destination, foreign_key, feature.attributes.get(primary_key.lower())
+        else:
+            table, key, value = origin, primary_key, feature.attributes.get(foreign_key.lower())
+
+        features = self.feature_set(table, fields, with_geometry)
+
+        return features.derive(
+            [
+                row
+                for row in features.features
+                if value is not None and _sql_equals(row.attributes.get(key.lower()), value)
+            ]
+        )
+
+    def get_domain(self, table, field):
+        return self.domains.get((table or "").lower(), {}).get(field.lower())
+
+
+class UserFunction(object):
+    def __init__(self, name, parameters, body, scope):
+        self.name = name
+        self.parameters = parameters
+        self.body = body
+        self.scope = scope
+
+    def __call__(self, *arguments):
+        if len(arguments) != len(self.parameters):
+            raise ArcadeError(
+                "{} expects {} arguments but was given {}".format(self.name, len(self.parameters), len(arguments))
+            )
+
+        scope = _Scope(dict(zip(self.parameters, arguments, strict=True)), self.scope)
+        signal = self.body(scope)
+
+        if isinstance(signal, _Return):
+            return signal.value
+
+        return None
+
+
+class _Scope(object):
+    __slots__ = ("parent", "state", "values")
+
+    def __init__(self, values, parent=None):
+        self.values = values
+        self.parent = parent
+        self.state = parent.state if parent is not None else {}
+
+    def find(self, name):
+        scope = self
+
+        while scope is not None:
+            if name in scope.values:
+                return scope.values
+
+            scope = scope.parent
+
+        return None
+
+    def lookup(self, name):
+        values = self.find(name)
+
+        if values is None:
+            raise ArcadeError("{} is not defined".format(name))
+
+        return values[name]
+
+    def assign(self, name, value):
+        values = self.find(name)
+
+        if values is None:
+            raise ArcadeError("{} is assigned before it is declared".format(name))
+
+        values[name] = value
+
+
+class _Return(object):
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+_BREAK = object()
+_CONTINUE = object()
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _truthy(value):
+    if isinstance(value, bool):
+        return value
+
+    if value is None:
+        return False
+
+    if _is_number(value):
+        return value != 0 and not math.isnan(value)
+
+    if isinstance(value, str):
+        return len(value) > 0
+
+    return True
+
+
+def _to_number(value):
+    if value is None:
+        return 0
+
+    if isinstance(value, bool):
+        return int(value)
+
+    if _is_number(value):
+        return value
+
+    if isinstance(value, datetime):
+        return value.timestamp() * 1000
+
+    if isinstance(value, str):
+        text = value.strip()
+
+        if not text:
+            return 0
+
+        try:
+            number = float(text)
+        except ValueError:
+            return math.nan
+
+        return int(number) if number.is_integer() and "." not in text and "e" not in text.lower() else number
+
+    return math.nan
+
+
+def _format_number(value, pattern):
+    whole, _, decimals = pattern.partition(".")
+    places = len(decimals)
+    minimum = whole.count("0")
+    grouping = "," if "," in whole else ""
+    text = "{:{}.{}f}".format(abs(value), grouping, places)
+    digits = text.split(".")[0].replace(",", "")
+
+    if len(digits) < minimum:
+        text = "0" * (minimum - len(digits)) + text
+
+    return "-" + text if value < 0 else text
+
+
+_date_tokens = [
+    ("YYYY", "%Y"),
+    ("YY", "%y"),
+    ("MMMM", "%B"),
+    ("MMM", "%b"),
+    ("MM", "%m"),
+    ("DD", "%d"),
+    ("HH", "%H"),
+    ("hh", "%I"),
+    ("mm", "%M"),
+    ("ss", "%S"),
+    ("A", "%p"),
+]
+
+
+def _format_date(value, pattern):
+    for token, directive in _date_tokens:
+        pattern = pattern.replace(token, directive)
+
+    return value.strftime(pattern)
+
+
+def text(value, pattern=None):
+    """arcade's Text function and the conversion used when a value is added to a string"""
+    if value is None:
+        return ""
+
+    if isinstance(value, bool):
+        return "true" if value else "false"
+
+    if isinstance(value, str):
+        return value
+
+    if _is_number(value):
+        if math.isnan(value):
+            return "NaN"
+
+        if pattern:
+            return _format_number(value, pattern)
+
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+
+        return str(value)
+
+    if isinstance(value, datetime):
+        return _format_date(value, pattern) if pattern else value.isoformat()
+
+    if isinstance(value, list):
+        return "[" + ",".join(_quote(item) for item in value) + "]"
+
+    if isinstance(value, dict):
+        return "{" + ",".join("{}:{}".format(_quote(key), _quote(item)) for key, item in value.items()) + "}"
+
+    return str(value)
+
+
+def _quote(value):
+    if isinstance(value, str):
+        return '"{}"'.format(value)
+
+    return text(value)
+
+
+def _equals(left, right):
+    if _is_number(left) and _is_number(right):
+        return left == right
+
+    if type(left) is not type(right):
+        return False
+
+    return left == right
+
+
+def _comparison(compare):
+    """arcade compares text as text and everything else as numbers, with null as zero and dates as milliseconds"""
+
+    def apply(left, right):
+        if isinstance(left, str) and isinstance(right, str):
+            return compare(left, right)
+
+        return compare(_to_number(left), _to_number(right))
+
+    return apply
+
+
+def _add(left, right):
+    if isinstance(left, str) or isinstance(right, str) or isinstance(left, list) or isinstance(right, list):
+        return text(left) + text(right)
+
+    return _to_number(left) + _to_number(right)
+
+
+def _divide(left, right):
+    left, right = _to_number(left), _to_number(right)
+
+    if right == 0:
+        return math.nan if left == 0 else math.copysign(math.inf, left)
+
+    return left / right
+
+
+def _modulo(left, right):
+    left, right = _to_number(left), _to_number(right)
+
+    if right == 0:
+        return math.nan
+
+    return math.fmod(left, right)
+
+
+_binary_operators = {
+    "+": _add,
+    "-": lambda left, right: _to_number(left) - _to_number(right),
+    "*": lambda left, right: _to_number(left) * _to_number(right),
+    "/": _divide,
+    "%": _modulo,
+    "==": _equals,
+    "!=": lambda left, right: not _equals(left, right),
+    "<": _comparison(operator.lt),
+    "<=": _comparison(operator.le),
+    ">": _comparison(operator.gt),
+    ">=": _comparison(operator.ge),
+}
+
+
+def _member(target, name):
+    if isinstance(target, Feature):
+        return target.get(name)
+
+    if isinstance(target, dict):
+        if name in target:
+            return target[name]
+
+        for key, value in target.items():
+            if key.lower() == name.lower():
+                return value
+
+        raise ArcadeError("{} is not a key in the dictionary".format(name))
+
+    raise ArcadeError("{} can not be read from {}".format(name, text(target) or "null"))
+
+
+def _index(target, key):
+    if isinstance(target, (list, str)):
+        if not _is_number(key) or not 0 <= key < len(target):
+            raise ArcadeError("index {} is out of range".format(text(key)))
+
+        return target[int(key)]
+
+    if isinstance(target, str) or isinstance(key, str):
+        return _member(target, key)
+
+    raise ArcadeError("{} can not be indexed".format(text(target) or "null"))
+
+
+def _iterate(value):
+    if isinstance(value, (list, str)):
+        return range(len(value))
+
+    if isinstance(value, dict):
+        return list(value)
+
+    if isinstance(value, FeatureSet):
+        return iter(value)
+
+    raise ArcadeError("{} can not be looped over".format(text(value) or "null"))
+
+
+def _compile_block(statements, top=False):
+    compiled = [_compile_statement(statement, top) for statement in statements]
+
+    def run(scope):
+        for statement in compiled:
+            signal = statement(scope)
+
+            if signal is not None:
+                return signal
+
+        return None
+
+    return run
+
+
+def _compile_statement(node, top=False):
+    kind = node.kind
+
+    if kind == "block":
+        return _compile_block(node.children, top)
+
+    if kind == "var":
+        name = node.value
+        initial = _compile(node.children[0]) if node.children[0] is not None else None
+
+        def declare(scope):
+            scope.values[name] = initial(scope) if initial is not None else None
+
+        return declare
+
+    if kind == "assign":
+        name = node.value
+        value = _compile(node.children[0])
+
+        def assign(scope):
+            scope.assign(name, value(scope))
+
+        return assign
+
+    if kind == "function":
+        name, parameters = node.value
+        body = _compile_block(node.children[0].children)
+
+        def define(scope):
+            scope.values[name] = UserFunction(name, parameters, body, scope)
+
+        return define
+
+    if kind == "if":
+        condition = _compile(node.children[0])
+        then = _compile_statement(node.children[1], top)
+        otherwise = _compile_statement(node.children[2], top) if node.children[2] is not None else None
+
+        def branch(scope):
+            if _truthy(condition(scope)):
+                return then(scope)
+
+            if otherwise is not None:
+                return otherwise(scope)
+
+            return None
+
+        return branch
+
+    if kind == "for":
+        name = node.value
+        iterable = _compile(node.children[0])
+        body = _compile_statement(node.children[1], top)
+
+        def loop(scope):
+            for item in _iterate(iterable(scope)):
+                scope.values[name] = item
+                signal = body(scope)
+
+                if signal is _BREAK:
+                    break
+
+                if signal is not None and signal is not _CONTINUE:
+                    return signal
+
+            return None
+
+        return loop
+
+    if kind == "while":
+        condition = _compile(node.children[0])
+        body = _compile_statement(node.children[1], top)
+
+        def repeat(scope):
+            while _truthy(condition(scope)):
+                signal = body(scope)
+
+                if signal is _BREAK:
+                    break
+
+                if signal is not None and signal is not _CONTINUE:
+                    return signal
+
+            return None
+
+        return repeat
+
+    if kind == "return":
+        value = _compile(node.children[0]) if node.children[0] is not None else None
+
+        def finish(scope):
+            return _Return(value(scope) if value is not None else None)
+
+        return finish
+
+    if kind == "break":
+        return lambda scope: _BREAK
+
+    if kind == "continue":
+        return lambda scope: _CONTINUE
+
+    expression = _compile(node.children[0])
+
+    if not top:
+
+        def evaluate_expression(scope):
+            expression(scope)
+
+        return evaluate_expression
+
+    #: a script without a return statement returns the value of the last expression it ran
+    def remember(scope):
+        scope.state["last"] = expression(scope)
+
+    return remember
+
+
+def _compile(node):
+    kind = node.kind
+
+    if kind == "literal":
+        value = node.value
+
+        return lambda scope: value
+
+    if kind == "name":
+        name = node.value
+
+        return lambda scope: scope.lookup(name)
+
+    if kind == "array":
+        items = [_compile(child) for child in node.children]
+
+        return lambda scope: [item(scope) for item in items]
+
+    if kind == "dictionary":
+        keys = node.value
+        values = [_compile(child) for child in node.children]
+
+        return lambda scope: {key: value(scope) for key, value in zip(keys, values, strict=True)}
+
+    if kind == "member":
+        target = _compile(node.children[0])
+        name = node.value
+
+        return lambda scope: _member(target(scope), name)
+
+    if kind == "index":
+        target = _compile(node.children[0])
+        key = _compile(node.children[1])
+
+        return lambda scope: _index(target(scope), key(scope))
+
+    if kind == "unary":
+        operand = _compile(node.children[0])
+
+        if node.value == "!":
+            return lambda scope: not _truthy(operand(scope))
+
+        if node.value == "-":
+            return lambda scope: -_to_number(operand(scope))
+
+        return lambda scope: _to_number(operand(scope))
+
+    if kind == "logical":
+        left = _compile(node.children[0])
+        right = _compile(node.children[1])
+
+        if node.value == "&&":
+            return lambda scope: _truthy(left(scope)) and _truthy(right(scope))
+
+        return lambda scope: _truthy(left(scope)) or _truthy(right(scope))
+
+    if kind == "binary":
+        left = _compile(node.children[0])
+        right = _compile(node.children[1])
+        apply = _binary_operators[node.value]
+
+        return lambda scope: apply(left(scope), right(scope))
+
+    if kind == "call":
+        return _compile_call(node)
+
+    raise ArcadeError("{} nodes can not be evaluated".format(kind))
+
+
+def _compile_call(node):
+    name = node.value
+    arguments = [_compile(child) for child in node.children]
+    line = node.line
+
+    #: iif only evaluates the branch it returns
+    if name == "iif":
+        if len(arguments) != 3:
+            raise ArcadeError("iif expects 3 arguments on line {}".format(line))
+
+        condition, then, otherwise = arguments
+
+        return lambda scope: then(scope) if _truthy(condition(scope)) else otherwise(scope)
+
+    def call(scope):
+        values = scope.find(name)
+
+        if values is not None:
+            function = values[name]
+
+            if not isinstance(function, UserFunction):
+                raise ArcadeError("{} is not a function on line {}".format(name, line))
+
+            return function(*[argument(scope) for argument in arguments])
+
+        values = [argument(scope) for argument in arguments]
+
+        try:
+            if name in _scoped_functions:
+                return _scoped_functions[name](scope, *values)
+
+            if name in functions:
+                return functions[name](*values)
+        except TypeError as error:
+            raise ArcadeError("{} on line {}: {}".format(name, line, error)) from error
+
+        raise ArcadeError("{} is not a supported function on line {}".format(name, line))
+
+    return call
+
+
+class Program(object):
+    """a compiled script that can be run against many features"""
+
+    def __init__(self, script):
+        self.tree = parse(script)
+        self.run = _compile_block(self.tree.children, top=True)
+
+    def evaluate(self, feature=None, store=None, edit_type="INSERT"):
+        scope = _Scope(
+            {
+                "$feature": feature,
+                "$datastore": store,
+                "$editcontext": {"editType": edit_type},
+            }
+        )
+        signal = self.run(scope)
+
+        if isinstance(signal, _Return):
+            return signal.value
+
+        return scope.state.get("last")
+
+
+def compile_script(script):
+    """returns the cached program for a script, parsing it the first time it is seen"""
+    program = _programs.get(script)
+
+    if program is None:
+        program = _programs[script] = Program(script)
+
+    return program
+
+
+def evaluate(script, feature=None, store=None, edit_type="INSERT"):
+    """runs a script against a feature and returns what the script returns"""
+    return compile_script(script).evaluate(feature, store, edit_type)
+
+
+def is_valid(result):
+    """true when a constraint result lets the edit through"""
+    return result is True
+
+
+def calculated_attributes(result, field=None):
+    """the field values a calculation result writes
+
+    a dictionary can set several fields with {'result': {'attributes': {field: value}}} and a result with an error
+    message rejects the edit so nothing is written
+    """
+    if isinstance(result, dict):
+        if "errorMessage" in result:
+            return {}
+
+        if "result" in result:
+            result = result["result"]
+
+            if isinstance(result, dict) and "attributes" in result:
+                return dict(result["attributes"])
+
+    return {field: result}
+
+
+#: functions
+def _haskey(value, key):
+    if isinstance(value, Feature):
+        return value.has(key)
+
+    if isinstance(value, dict):
+        return key in value
+
+    raise ArcadeError("haskey needs a feature or a dictionary")
+
+
+def _isempty(value):
+    return value is None or value == ""
+
+
+def _get_domain(scope, feature, field):
+    if not isinstance(feature, Feature):
+        raise ArcadeError("domain functions need a feature")
+
+    store = scope.lookup("$datastore")
+
+    if store is None:
+        return None
+
+    return store.get_domain(feature.table, field)
+
+
+def _domainname(scope, feature, field, value=None):
+    if value is None:
+        value = feature.get(field)
+
+    codes = _get_domain(scope, feature, field)
+
+    if codes is None:
+        return value
+
+    return codes.get(value)
+
+
+def _domaincode(scope, feature, field, value=None):
+    if value is None:
+        value = feature.get(field)
+
+    codes = _get_domain(scope, feature, field)
+
+    if codes is None or value in codes:
+        return value
+
+    for code, name in codes.items():
+        if name == value:
+            return code
+
+    return None
+
+
+def _indexof(values, value):
+    for index, item in enumerate(values):
+        if _equals(item, value):
+            return index
+
+    return -1
+
+
+def _count(value):
+    if isinstance(value, (FeatureSet, list, str)):
+        return len(value)
+
+    raise ArcadeError("count needs a feature set, array or text")
+
+
+def _first(value):
+    if isinstance(value, FeatureSet):
+        return next(iter(value), None)
+
+    if isinstance(value, list):
+        return value[0] if value else None
+
+    raise ArcadeError("first needs a feature set or an array")
+
+
+def _featuresetbyname(store, table, fields=None, with_geometry=True):
+    if not isinstance(store, FeatureStore):
+        raise ArcadeError("FeatureSetByName needs a $datastore")
+
+    return store.feature_set(table, fields, with_geometry)
+
+
+def _featuresetbyrelationshipname(scope, feature, name, fields=None, with_geometry=True):
+    store = scope.lookup("$datastore")
+
+    if not isinstance(feature, Feature) or not isinstance(store, FeatureStore):
+        raise ArcadeError("FeatureSetByRelationshipName needs a feature and a $datastore")
+
+    return store.related(feature, name, fields, with_geometry)
+
+
+def _geometry(value):
+    if isinstance(value, Feature):
+        return value.geometry
+
+    return value
+
+
+def _intersects(left, right):
+    if isinstance(left, FeatureSet):
+        shape = _geometry(right)
+
+        if not left.with_geometry:
+            raise ArcadeError("intersects needs a feature set that returns geometry")
+
+        return left.derive(
+            [feature for feature in left.features if geometry_service.intersects(feature.geometry, shape)]
+        )
+
+    return geometry_service.intersects(_geometry(left), _geometry(right))
+
+
+def _intersection(left, right):
+    return geometry_service.intersection(_geometry(left), _geometry(right))
+
+
+def _area(value, unit=None):
+    return geometry_service.area(_geometry(value))
+
+
+def _substring(value, start, length=None):
+    value = text(value)
+    start = max(int(_to_number(start)), 0)
+
+    if length is None:
+        return value[start:]
+
+    return value[start : start + max(int(_to_number(length)), 0)]
+
+
+def _left(value, count):
+    return text(value)[: max(int(_to_number(count)), 0)]
+
+
+def _right(value, count):
+    count = max(int(_to_number(count)), 0)
+
+    return text(value)[-count:] if count else ""
+
+
+def _number(value, pattern=None):
+    return _to_number(value)
+
+
+def _isnan(value):
+    return _is_number(value) and math.isnan(value)
+
+
+def _date(*parts):
+    if not parts:
+        return datetime.now()
+
+    if len(parts) == 1:
+        value = parts[0]
+
+        if value is None:
+            return None
+
+        if isinstance(value, datetime):
+            return value
+
+        if _is_number(value):
+            return datetime.fromtimestamp(value / 1000)
+
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+
+    year, month, day, *time = [int(_to_number(part)) for part in parts]
+
+    #: arcade months start at zero
+    return datetime(year, month + 1, day, *time)
+
+
+def _today():
+    return datetime.combine(datetime.now().date(), datetime.min.time())
+
+
+_units = {
+    "milliseconds": timedelta(milliseconds=1),
+    "seconds": timedelta(seconds=1),
+    "minutes": timedelta(minutes=1),
+    "hours": timedelta(hours=1),
+    "days": timedelta(days=1),
+    "weeks": timedelta(weeks=1),
+}
+
+
+def _add_months(value, months):
+    month = value.month - 1 + months
+    year = value.year + month // 12
+    month = month % 12 + 1
+
+    return value.replace(year=year, month=month, day=min(value.day, calendar.monthrange(year, month)[1]))
+
+
+def _dateadd(value, amount, unit="milliseconds"):
+    if value is None:
+        return None
+
+    unit = unit.lower()
+    amount = _to_number(amount)
+
+    if unit == "months":
+        return _add_months(value, int(amount))
+
+    if unit == "years":
+        return _add_months(value, int(amount) * 12)
+
+    if unit not in _units:
+        raise ArcadeError("{} is not a supported date unit".format(unit))
+
+    return value + _units[unit] * amount
+
+
+def _datediff(left, right, unit="milliseconds"):
+    if left is None or right is None:
+        return None
+
+    unit = unit.lower()
+
+    if unit == "years":
+        return (left - right).days / 365.25
+
+    if unit == "months":
+        return (left - right).days / (365.25 / 12)
+
+    if unit not in _units:
+        raise ArcadeError("{} is not a supported date unit".format(unit))
+
+    return (left - right) / _units[unit]
+
+
+def _guid(format_name=None):
+    return "{" + str(uuid.uuid4()) + "}"
+
+
+def _filter(scope, features, where):
+    if not isinstance(features, FeatureSet):
+        raise ArcadeError("filter needs a feature set")
+
+    predicate = _compile_where(where)
+
+    return features.derive([feature for feature in features.features if predicate(feature, scope)])
+
+
+_where_pattern = re.compile(
+    r"\s*(?:(?P<variable>@[A-Za-z_]\w*)|(?P<string>'(?:[^']|'')*')|(?P<number>-?\d+(?:\.\d+)?)"
+    r"|(?P<operator><>|!=|<=|>=|=|<|>)|(?P<name>[A-Za-z_]\w*)|(?P<parenthesis>[(),]))"
+)
+
+_where_clauses = {}
+_where_keywords = {"AND", "OR", "NOT", "IS", "NULL", "IN"}
+
+
+def _where_tokens(where):
+    tokens = []
+    position = 0
+    where = where.strip()
+
+    while position < len(where):
+        match = _where_pattern.match(where, position)
+
+        if match is None or match.end() == position:
+            raise ArcadeError("{} is not a supported filter".format(where))
+
+        tokens.append((match.lastgroup, match.group(match.lastgroup)))
+        position = match.end()
+
+    tokens.append(("end", None))
+
+    return tokens
+
+
+def where_fields(where):
+    """the field names a filter where clause compares, in the order they are written"""
+    return [value for kind, value in _where_tokens(where) if kind == "name" and value.upper() not in _where_keywords]
+
+
+def _sql_value(kind, value):
+    if kind == "string":
+        return lambda scope: value[1:-1].replace("''", "'")
+
+    if kind == "number":
+        number = float(value)
+
+        return lambda scope: int(number) if number.is_integer() else number
+
+    if kind == "variable":
+        name = value[1:].lower()
+
+        return lambda scope: scope.lookup(name)
+
+    raise ArcadeError("{} is not a supported filter value".format(value))
+
+
+def _sql_equals(left, right):
+    if isinstance(left, str) and isinstance(right, str):
+        return left.lower() == right.lower()
+
+    return _equals(left, right)
+
+
+_sql_operators = {
+    "=": _sql_equals,
+    "<>": lambda left, right: not _sql_equals(left, right),
+    "!=": lambda left, right: not _sql_equals(left, right),
+    "<": _binary_operators["<"],
+    "<=": _binary_operators["<="],
+    ">": _binary_operators[">"],
+    ">=": _binary_operators[">="],
+}
+
+
+def _either(left, right):
+    return lambda feature, scope: left(feature, scope) or right(feature, scope)
+
+
+def _both(left, right):
+    return lambda feature, scope: left(feature, scope) and right(feature, scope)
+
+
+def _compile_where(where):
+    """compiles the sql subset rules filter with: comparisons, IS [NOT] NULL, IN, NOT, AND, OR and parentheses"""
+    predicate = _where_clauses.get(where)
+
+    if predicate is not None:
+        return predicate
+
+    tokens = _where_tokens(where)
+    position = [0]
+
+    def peek():
+        return tokens[position[0]]
+
+    def take():
+        token = tokens[position[0]]
+        position[0] += 1
+
+        return token
+
+    def keyword(word):
+        kind, value = peek()
+
+        if kind == "name" and value.upper() == word:
+            take()
+
+            return True
+
+        return False
+
+    def any_of():
+        left = all_of()
+
+        while keyword("OR"):
+            right = all_of()
+            left = _either(left, right)
+
+        return left
+
+    def all_of():
+        left = condition()
+
+        while keyword("AND"):
+            right = condition()
+            left = _both(left, right)
+
+        return left
+
+    def condition():
+        if keyword("NOT"):
+            inner = condition()
+
+            return lambda feature, scope: not inner(feature, scope)
+
+        if peek() == ("parenthesis", "("):
+            take()
+            inner = any_of()
+
+            if take() != ("parenthesis", ")"):
+                raise ArcadeError("{} is missing a )".format(where))
+
+            return inner
+
+        kind, field = take()
+
+        if kind != "name":
+            raise ArcadeError("{} is not a supported filter".format(where))
+
+        field = field.lower()
+
+        if keyword("IS"):
+            negate = keyword("NOT")
+
+            if not keyword("NULL"):
+                raise ArcadeError("{} is not a supported filter".format(where))
+
+            return lambda feature, scope: (feature.attributes.get(field) is None) != negate
+
+        if keyword("IN"):
+            if take() != ("parenthesis", "("):
+                raise ArcadeError("{} is not a supported filter".format(where))
+
+            values = []
+
+            while peek() != ("parenthesis", ")"):
+                values.append(_sql_value(*take()))
+
+                if peek() == ("parenthesis", ","):
+                    take()
+
+            take()
+
+            return lambda feature, scope: any(
+                _sql_equals(feature.attributes.get(field), value(scope)) for value in values
+            )
+
+        kind, operator = take()
+
+        if kind != "operator":
+            raise ArcadeError("{} is not a supported filter".format(where))
+
+        compare = _sql_operators[operator]
+        value = _sql_value(*take())
+
+        return lambda feature, scope: compare(feature.attributes.get(field), value(scope))
+
+    predicate = any_of()
+
+    if peek()[0] != "end":
+        raise ArcadeError("{} is not a supported filter".format(where))
+
+    _where_clauses[where] = predicate
+
+    return predicate
+
+
+#: the arcade functions that need the calling scope, like filter reading @variables and the domains in $datastore
+_scoped_functions = {
+    "filter": _filter,
+    "domainname": _domainname,
+    "domaincode": _domaincode,
+    "featuresetbyrelationshipname": _featuresetbyrelationshipname,
+}
+
+functions = {
+    "haskey": _haskey,
+    "isempty": _isempty,
+    "indexof": _indexof,
+    "includes": lambda values, value: _indexof(values, value) > -1,
+    "count": _count,
+    "first": _first,
+    "featuresetbyname": _featuresetbyname,
+    "geometry": _geometry,
+    "intersects": _intersects,
+    "intersection": _intersection,
+    "area": _area,
+    "text": text,
+    "mid": _substring,
+    "left": _left,
+    "right": _right,
+    "lower": lambda value: text(value).lower(),
+    "upper": lambda value: text(value).upper(),
+    "trim": lambda value: text(value).strip(),
+    "number": _number,
+    "isnan": _isnan,
+    "abs": lambda value: abs(_to_number(value)),
+    "round": lambda value, places=0: round(_to_number(value), int(places)),
+    "date": _date,
+    "now": datetime.now,
+    "today": _today,
+    "dateadd": _dateadd,
+    "datediff": _datediff,
+    "year": lambda value: value.year,
+    "month": lambda value: value.month - 1,
+    "day": lambda value: value.day,
+    "guid": _guid,
+}
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+backend.py
+A module that runs rule group actions against a geodatabase or a stand in for one
+"""
+
+import os
+import time
+
+
+class SchemaLockError(Exception):
+    """raised when a table's schema lock cannot be acquired and the action can be retried"""
+
+
+class ArcpyBackend(object):
+    """runs rule group actions with arcpy"""
+
+    def connect(self, sde):
+        import arcpy
+
+        arcpy.management.ClearWorkspaceCache(str(sde))
+        arcpy.env.workspace = str(sde)
+
+    def run(self, group, action, **options):
+        self._call(group.name, [group.table_path], getattr(group, action), **options)
+
+    def _call(self, name, table_paths, function, *args, **options):
+        import arcpy
+        from arcgisscripting import ExecuteError  # pylint: disable=no-name-in-module
+
+        for table_path in table_paths:
+            if not arcpy.TestSchemaLock(table_path):
+                raise SchemaLockError("unable to acquire a schema lock on {}".format(name))
+
+        try:
+            function(*args, **options)
+        except ExecuteError as e:
+            (message,) = e.args
+
+            if "ERROR 000464" in message:
+                raise SchemaLockError(message) from e
+
+            raise e
+
+
+class StepBackend(ArcpyBackend):
+    """runs migration steps with arcpy once every table the step locks can be locked
+
+    a table that does not exist yet, or was already deleted, can not be locked by anyone else so it is not tested
+    """
+
+    def connect(self, sde):
+        super().connect(sde)
+        self.sde = str(sde)
+
+    def run(self, step, action, **options):
+        import arcpy
+
+        table_paths = [os.path.join(self.sde, table) for table in step.locks]
+        table_paths = [table_path for table_path in table_paths if arcpy.Exists(table_path)]
+
+        self._call(step.name, table_paths, getattr(step, action), self.sde, **options)
+
+
+class FakeBackend(object):
+    """stands in for a geodatabase so the scheduler can be used without arcpy
+
+    locks is a dictionary of table name to the number of times the table reports a schema lock before succeeding.
+    failures is a list of table names that raise an error.
+    """
+
+    def __init__(self, delay=0, locks=None, failures=None):
+        self.delay = delay
+        self.locks = dict(locks or {})
+        self.failures = failures or []
+        self.sde = None
+
+    def connect(self, sde):
+        self.sde = sde
+
+    def run(self, group, action, **options):
+        if self.locks.get(group.name, 0) > 0:
+            self.locks[group.name] -= 1
+
+            raise SchemaLockError("unable to acquire a schema lock on {}".format(group.name))
+
+        if group.name in self.failures:
+            raise Exception("{} failed".format(group.name))
+
+        print("{} rules for {}".format(action, group.name))
+        for rule in group.meta_rules:
+            print("  {} {} rule".format(action, rule.rule_name))
+            group.calls_issued += 1
+
+        time.sleep(self.delay)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+cost.py
+A module that estimates the work each rule does when a row is edited
+
+The rules are parsed with the offline arcade parser and every FeatureSet that is opened, filter and intersects call,
+loop over a feature set and geometry operation is counted. The work inside a loop over a feature set is counted
+LOOP_ROWS times and a call to a function in the script counts the work in the function. Both branches of an if are
+counted so the cost is the most a rule can do rather than what it does for a particular row.
+"""
+
+from config import config
+from services import arcade
+
+KINDS = ["featureset", "filter", "intersects", "loop", "geometry"]
+
+#: the relative cost of each operation. opening a feature set, filter and intersects query the database
+WEIGHTS = {
+    "featureset": 5,
+    "filter": 10,
+    "intersects": 10,
+    "loop": 1,
+    "geometry": 2,
+}
+
+#: the number of rows a loop over a feature set is expected to read
+LOOP_ROWS = 10
+
+TRIGGERS = [config.triggers.insert, config.triggers.update, config.triggers.delete]
+
+_opens = {"featuresetbyname", "featuresetbyid", "featuresetbyrelationshipname", "featuresetbyportalitem"}
+_queries = {"filter", "intersects"}
+_featureset_results = _opens | _queries | {"orderby", "top", "distinct"}
+_geometry = {
+    "area",
+    "areageodetic",
+    "buffer",
+    "centroid",
+    "clip",
+    "contains",
+    "crosses",
+    "cut",
+    "difference",
+    "distance",
+    "intersection",
+    "length",
+    "overlaps",
+    "touches",
+    "union",
+    "within",
+}
+
+
+class _Estimate(object):
+    def __init__(self, tree):
+        self.functions = {node.value[0]: node for node in arcade.walk(tree) if node.kind == "function"}
+        self.featuresets = set()
+        self.featureset_functions = set()
+
+        self._find_featuresets(tree)
+
+    def _is_featureset(self, node):
+        if node is None:
+            return False
+
+        if node.kind == "call":
+            return node.value in _featureset_results or node.value in self.featureset_functions
+
+        return node.kind == "name" and node.value in self.featuresets
+
+    def _find_featuresets(self, tree):
+        """the variables, function parameters and functions that hold or return a feature set, wherever they are used"""
+        changed = True
+
+        while changed:
+            changed = False
+
+            for node in arcade.walk(tree):
+                names = []
+
+                if node.kind in ("var", "assign") and self._is_featureset(node.children[0]):
+                    names.append(node.value)
+                elif node.kind == "call" and node.value in self.functions:
+                    parameters = self.functions[node.value].value[1]
+                    names.extend(
+                        parameter
+                        for parameter, argument in zip(parameters, node.children)
+                        if self._is_featureset(argument)
+                    )
+
+                for name in names:
+                    if name not in self.featuresets:
+                        self.featuresets.add(name)
+                        changed = True
+
+            for name, function in self.functions.items():
+                returns = (node for node in arcade.walk(function.children[0]) if node.kind == "return")
+
+                if name not in self.featureset_functions and any(
+                    self._is_featureset(node.children[0]) for node in returns
+                ):
+                    self.featureset_functions.add(name)
+                    changed = True
+
+    def count(self, node, counts, times=1, stack=()):
+        if node is None or node.kind == "function":
+            return
+
+        if node.kind == "call":
+            if node.value in _opens:
+                counts["featureset"] += times
+            elif node.value in _queries:
+                counts[node.value] += times
+            elif node.value in _geometry:
+                counts["geometry"] += times
+            elif node.value in self.functions and node.value not in stack:
+                self.count(self.functions[node.value].children[0], counts, times, (*stack, node.value))
+
+        if node.kind == "for" and self._is_featureset(node.children[0]):
+            counts["loop"] += times
+            self.count(node.children[0], counts, times, stack)
+            self.count(node.children[1], counts, times * LOOP_ROWS, stack)
+
+            return
+
+        for child in node.children:
+            self.count(child, counts, times, stack)
+
+
+def estimate(script):
+    """returns the number of each kind of operation a script does and their weighted cost"""
+    counts = dict.fromkeys(KINDS, 0)
+    tree = arcade.compile_script(script).tree
+    _Estimate(tree).count(tree, counts)
+
+    return counts, sum(WEIGHTS[kind] * count for kind, count in counts.items())
+
+
+def _triggers(rule):
+    return [rule.triggers] if isinstance(rule.triggers, str) else list(rule.triggers)
+
+
+def table_report(table, rules):
+    """the cost of every rule in a table and the total cost of an insert, update and delete"""
+    items = []
+
+    for rule in rules:
+        counts, total = estimate(rule.arcade)
+        items.append({"rule": rule.rule_name, "triggers": _triggers(rule), "cost": total, **counts})
+
+    return {
+        "table": table,
+        "rules": items,
+        "edits": {trigger: sum(item["cost"] for item in items if trigger in item["triggers"]) for trigger in TRIGGERS},
+    }
+
+
+def over_budget(reports, budget):
+    """the (table, rule, cost) of every rule that costs more than the budget"""
+    return [
+        (report["table"], item["rule"], item["cost"])
+        for report in reports
+        for item in report["rules"]
+        if item["cost"] > budget
+    ]
+
+
+def format_report(reports):
+    lines = []
+
+    for report in sorted(reports, key=lambda report: -max(report["edits"].values())):
+        lines.append(
+            "{}: {}".format(
+                report["table"],
+                ", ".join("{} {}".format(trigger.lower(), cost) for trigger, cost in report["edits"].items()),
+            )
+        )
+
+        for item in sorted(report["rules"], key=lambda item: -item["cost"]):
+            if not item["cost"]:
+                continue
+
+            lines.append(
+                "  {:<32} {:>5} {}".format(
+                    item["rule"],
+                    item["cost"],
+                    ", ".join("{} {}".format(kind, item[kind]) for kind in KINDS if item[kind]),
+                )
+            )
+
+    return "\n".join(lines)
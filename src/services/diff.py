@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+diff.py
+A module that compares the rules in a RULES list against the rules already in a table
+"""
+
+import hashlib
+import json
+from types import SimpleNamespace
+
+from config import config
+
+_rule_types = {
+    "esriARTCalculation": config.rule_types.calculation,
+    "esriARTConstraint": config.rule_types.constraint,
+}
+
+_events = {
+    "esriARTEInsert": config.triggers.insert,
+    "esriARTEUpdate": config.triggers.update,
+    "esriARTEDelete": config.triggers.delete,
+}
+
+operations = {
+    "add": "add",
+    "alter": "alter",
+    "delete": "delete",
+}
+
+
+def _normalize_triggers(triggers):
+    if isinstance(triggers, str):
+        triggers = [triggers]
+
+    return sorted(_events.get(trigger, trigger).upper() for trigger in triggers)
+
+
+def _normalize_arcade(arcade):
+    return "\n".join(line.rstrip() for line in (arcade or "").replace("\r\n", "\n").strip().split("\n"))
+
+
+def rule_hash(arcade, triggers, triggering_fields, editable, error_number):
+    """a stable sha256 of the parts of a rule that AlterAttributeRule and AddAttributeRule write"""
+    payload = json.dumps(
+        [
+            _normalize_arcade(arcade),
+            _normalize_triggers(triggers),
+            sorted(field.lower() for field in triggering_fields),
+            editable,
+            None if error_number is None else int(error_number),
+        ]
+    )
+
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def desired_state(rule, triggering_fields):
+    return {
+        "type": rule.type,
+        "editable": rule.editable,
+        "hash": rule_hash(
+            rule.arcade, rule.triggers, triggering_fields, rule.editable, getattr(rule, "error_number", None)
+        ),
+    }
+
+
+def existing_state(attribute_rule):
+    """converts an arcpy.Describe attribute rule into the same shape as desired_state"""
+    rule_type = _rule_types.get(attribute_rule.type, attribute_rule.type)
+    editable = config.editable.yes if attribute_rule.isEditable else config.editable.no
+    error_number = None
+
+    if rule_type == config.rule_types.constraint:
+        error_number = attribute_rule.errorNumber
+
+    return {
+        "type": rule_type,
+        "editable": editable,
+        "hash": rule_hash(
+            attribute_rule.scriptExpression,
+            attribute_rule.triggeringEvents,
+            getattr(attribute_rule, "triggeringFields", None) or [],
+            editable,
+            error_number,
+        ),
+    }
+
+
+def replaced_rules(rule, existing=None):
+    """stand ins for the rules a rule takes the place of so they can be deleted
+
+    with existing only the replaced rules that are in the table are returned
+    """
+    return [
+        SimpleNamespace(rule_name=name, type=rule.type)
+        for name in getattr(rule, "replaces", [])
+        if existing is None or name in existing
+    ]
+
+
+def plan(rules, existing, get_fields):
+    """returns a list of (operation, rule) tuples needed to make existing match rules
+
+    existing is a dictionary of rule name to existing_state and get_fields returns the triggering fields for a
+    rule. AlterAttributeRule cannot change the type or editability of a rule so those are deleted and added again.
+    the rules a rule replaces are deleted before it.
+    """
+    existing = dict(existing)
+    steps = []
+
+    for rule in rules:
+        for replaced in replaced_rules(rule, existing):
+            steps.append((operations["delete"], replaced))
+            del existing[replaced.rule_name]
+
+        desired = desired_state(rule, get_fields(rule))
+        current = existing.get(rule.rule_name)
+
+        if current is None:
+            steps.append((operations["add"], rule))
+        elif current["type"] != desired["type"] or current["editable"] != desired["editable"]:
+            #: the rule in the table is deleted by its own type, which may not be the new one
+            steps.append((operations["delete"], SimpleNamespace(rule_name=rule.rule_name, type=current["type"])))
+            steps.append((operations["add"], rule))
+        elif current["hash"] != desired["hash"]:
+            steps.append((operations["alter"], rule))
+
+        existing[rule.rule_name] = desired
+
+    return steps
+
+
+def legacy_call_count(rules, existing):
+    """the number of gp calls the alter then add deployment makes for the same rules"""
+    names = set(existing)
+    count = 0
+
+    for rule in rules:
+        count += len(replaced_rules(rule))
+        count += 1 if rule.rule_name in names else 2
+        names.add(rule.rule_name)
+
+    return count
+
+
+def count_changed(rules, steps):
+    """the number of rules that have a step, the deleted stand ins for replaced rules are not counted"""
+    changed = {id(rule) for _, rule in steps}
+
+    return sum(1 for rule in rules if id(rule) in changed)
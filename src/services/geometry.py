@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+geometry.py
+A module that holds the planar geometry used to evaluate rules without a database
+
+Polygons are a list of rings and every ring is treated as its own part. Holes are not supported, which is fine for
+the county, city and zip code boundaries the rules intersect.
+"""
+
+import math
+
+
+class Point(object):
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.extent = (x, y, x, y)
+
+    def __repr__(self):
+        return "Point({}, {})".format(self.x, self.y)
+
+
+class Polygon(object):
+    def __init__(self, rings):
+        self.rings = [ring for ring in (_open_ring(ring) for ring in rings) if len(ring) > 2]
+
+        if self.rings:
+            xs = [x for ring in self.rings for x, _ in ring]
+            ys = [y for ring in self.rings for _, y in ring]
+            self.extent = (min(xs), min(ys), max(xs), max(ys))
+        else:
+            self.extent = None
+
+        self._triangles = None
+
+    @property
+    def triangles(self):
+        """the rings split into counter clockwise triangles, worked out once per polygon"""
+        if self._triangles is None:
+            self._triangles = [triangle for ring in self.rings for triangle in _triangulate(ring)]
+
+        return self._triangles
+
+    def __repr__(self):
+        return "Polygon({} rings)".format(len(self.rings))
+
+
+def _open_ring(ring):
+    """drops the closing vertex so every ring is a list of distinct corners"""
+    ring = [tuple(vertex) for vertex in ring]
+
+    if len(ring) > 1 and ring[0] == ring[-1]:
+        return ring[:-1]
+
+    return ring
+
+
+def _signed_area(ring):
+    total = 0.0
+
+    for index, (x1, y1) in enumerate(ring):
+        x2, y2 = ring[(index + 1) % len(ring)]
+        total += x1 * y2 - x2 * y1
+
+    return total / 2.0
+
+
+def area(geometry):
+    """the planar area of a geometry. points and empty geometries have no area"""
+    if not isinstance(geometry, Polygon):
+        return 0.0
+
+    return sum(abs(_signed_area(ring)) for ring in geometry.rings)
+
+
+def extents_overlap(a, b):
+    if a is None or b is None:
+        return False
+
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _ring_contains(ring, x, y):
+    inside = False
+    x2, y2 = ring[-1]
+
+    for x1, y1 in ring:
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+
+        x2, y2 = x1, y1
+
+    return inside
+
+
+def contains_point(polygon, x, y):
+    if not extents_overlap(polygon.extent, (x, y, x, y)):
+        return False
+
+    return any(_ring_contains(ring, x, y) for ring in polygon.rings)
+
+
+def _cross(origin, a, b):
+    return (a[0] - origin[0]) * (b[1] - origin[1]) - (a[1] - origin[1]) * (b[0] - origin[0])
+
+
+def _on_segment(a, b, point):
+    return min(a[0], b[0]) <= point[0] <= max(a[0], b[0]) and min(a[1], b[1]) <= point[1] <= max(a[1], b[1])
+
+
+def _segments_intersect(a, b, c, d):
+    d1 = _cross(c, d, a)
+    d2 = _cross(c, d, b)
+    d3 = _cross(a, b, c)
+    d4 = _cross(a, b, d)
+
+    if ((d1 > 0) != (d2 > 0) and d1 != 0 and d2 != 0) and ((d3 > 0) != (d4 > 0) and d3 != 0 and d4 != 0):
+        return True
+
+    return (
+        (d1 == 0 and _on_segment(c, d, a))
+        or (d2 == 0 and _on_segment(c, d, b))
+        or (d3 == 0 and _on_segment(a, b, c))
+        or (d4 == 0 and _on_segment(a, b, d))
+    )
+
+
+def _edges(polygon):
+    for ring in polygon.rings:
+        for index, vertex in enumerate(ring):
+            yield vertex, ring[(index + 1) % len(ring)]
+
+
+def intersects(a, b):
+    """true when two geometries share any point"""
+    if a is None or b is None or not extents_overlap(a.extent, b.extent):
+        return False
+
+    if isinstance(a, Point) and isinstance(b, Point):
+        return a.x == b.x and a.y == b.y
+
+    if isinstance(a, Point):
+        return contains_point(b, a.x, a.y)
+
+    if isinstance(b, Point):
+        return contains_point(a, b.x, b.y)
+
+    #: one inside the other is the common case and cheaper to test than every pair of edges
+    if any(contains_point(b, *ring[0]) for ring in a.rings) or any(contains_point(a, *ring[0]) for ring in b.rings):
+        return True
+
+    edges = list(_edges(b))
+
+    for start, end in _edges(a):
+        for other_start, other_end in edges:
+            if _segments_intersect(start, end, other_start, other_end):
+                return True
+
+    return False
+
+
+def _triangulate(ring):
+    """splits a simple ring into triangles by clipping ears"""
+    if _signed_area(ring) < 0:
+        ring = list(reversed(ring))
+
+    remaining = list(ring)
+    triangles = []
+
+    while len(remaining) > 3:
+        for index in range(len(remaining)):
+            previous, current, following = (
+                remaining[index - 1],
+                remaining[index],
+                remaining[(index + 1) % len(remaining)],
+            )
+
+            if _cross(previous, current, following) <= 0:
+                continue
+
+            triangle = [previous, current, following]
+            if any(
+                _ring_contains(triangle, *vertex)
+                for vertex in remaining
+                if vertex not in (previous, current, following)
+            ):
+                continue
+
+            triangles.append(triangle)
+            del remaining[index]
+
+            break
+        else:
+            #: a degenerate ring has no ear left, keep what is there
+            break
+
+    triangles.append(remaining)
+
+    return triangles
+
+
+def _clip(ring, triangle):
+    """clips a ring to a counter clockwise triangle"""
+    output = ring
+
+    for index, edge_start in enumerate(triangle):
+        edge_end = triangle[(index + 1) % len(triangle)]
+        points, output = output, []
+
+        if not points:
+            break
+
+        previous = points[-1]
+        previous_inside = _cross(edge_start, edge_end, previous) >= 0
+
+        for current in points:
+            current_inside = _cross(edge_start, edge_end, current) >= 0
+
+            if current_inside != previous_inside:
+                output.append(_line_intersection(previous, current, edge_start, edge_end))
+
+            if current_inside:
+                output.append(current)
+
+            previous = current
+            previous_inside = current_inside
+
+    return output
+
+
+def _line_intersection(a, b, c, d):
+    a1 = _cross(c, d, a)
+    a2 = _cross(c, d, b)
+    ratio = a1 / (a1 - a2)
+
+    return (a[0] + (b[0] - a[0]) * ratio, a[1] + (b[1] - a[1]) * ratio)
+
+
+def intersection(a, b):
+    """the part of a that is inside b"""
+    if not intersects(a, b):
+        return Polygon([])
+
+    if isinstance(a, Point):
+        return a
+
+    if isinstance(b, Point):
+        return b
+
+    return _clip_polygon(a, b)
+
+
+def _clip_polygon(a, b):
+    rings = []
+
+    for triangle in b.triangles:
+        for ring in a.rings:
+            clipped = _clip(ring, triangle)
+
+            if len(clipped) > 2:
+                rings.append(clipped)
+
+    return Polygon(rings)
+
+
+def overlap_area(a, b):
+    """area(intersection(a, b)) for geometries already known to intersect"""
+    if isinstance(a, Point) or isinstance(b, Point):
+        return 0.0
+
+    return area(_clip_polygon(a, b))
+
+
+def from_geo_interface(shape):
+    """reads the __geo_interface__ mapping of an arcpy point or polygon"""
+    if shape is None:
+        return None
+
+    if not isinstance(shape, dict):
+        shape = shape.__geo_interface__
+
+    kind = shape["type"]
+    coordinates = shape["coordinates"]
+
+    if kind == "Point":
+        return Point(*coordinates[:2])
+
+    if kind == "Polygon":
+        return Polygon(coordinates)
+
+    if kind == "MultiPolygon":
+        return Polygon([ring for polygon in coordinates for ring in polygon])
+
+    raise Exception("{} is not a supported geometry type".format(kind))
+
+
+def _union(extents):
+    return (
+        min(extent[0] for extent in extents),
+        min(extent[1] for extent in extents),
+        max(extent[2] for extent in extents),
+        max(extent[3] for extent in extents),
+    )
+
+
+class STRtree(object):
+    """a sort tile recursive tree of geometry extents
+
+    query returns the positions of the geometries whose extent overlaps, in the order the geometries were given, so
+    callers that depend on feature order see the same order a full scan would.
+    """
+
+    def __init__(self, geometries, capacity=10):
+        self.geometries = list(geometries)
+        self.capacity = capacity
+        self.root = None
+
+        entries = [
+            (shape.extent, index)
+            for index, shape in enumerate(self.geometries)
+            if shape is not None and shape.extent is not None
+        ]
+
+        if not entries:
+            return
+
+        nodes = self._pack(entries, leaf=True)
+
+        while len(nodes) > 1:
+            nodes = self._pack(nodes, leaf=False)
+
+        self.root = nodes[0]
+
+    def _pack(self, items, leaf):
+        """groups items into nodes of up to capacity items that are close together"""
+        node_count = math.ceil(len(items) / self.capacity)
+        slice_size = math.ceil(math.sqrt(node_count)) * self.capacity
+        items = sorted(items, key=lambda item: item[0][0] + item[0][2])
+        nodes = []
+
+        for start in range(0, len(items), slice_size):
+            column = sorted(items[start : start + slice_size], key=lambda item: item[0][1] + item[0][3])
+
+            for group_start in range(0, len(column), self.capacity):
+                group = column[group_start : group_start + self.capacity]
+                nodes.append((_union([extent for extent, _ in group]), (leaf, group)))
+
+        return nodes
+
+    def query(self, extent):
+        """the positions of the geometries whose extent overlaps extent"""
+        found = []
+
+        if self.root is None or extent is None:
+            return found
+
+        stack = [self.root]
+
+        while stack:
+            node_extent, (leaf, children) = stack.pop()
+
+            if not extents_overlap(node_extent, extent):
+                continue
+
+            if leaf:
+                found.extend(index for child_extent, index in children if extents_overlap(child_extent, extent))
+            else:
+                stack.extend(children)
+
+        return sorted(found)
+
+
+def from_wkt(wkt):
+    """reads a POINT, POLYGON or MULTIPOLYGON well known text string"""
+    kind, _, body = wkt.strip().partition("(")
+    kind = kind.strip().upper()
+    body = "(" + body
+
+    def read_ring(text):
+        return [tuple(float(value) for value in pair.split()) for pair in text.strip("() ").split(",")]
+
+    if kind == "POINT":
+        x, y = read_ring(body)[0][:2]
+
+        return Point(x, y)
+
+    if kind in ("POLYGON", "MULTIPOLYGON"):
+        rings = []
+        start = None
+
+        #: the innermost parentheses hold the rings
+        for index, character in enumerate(body):
+            if character == "(":
+                start = index
+            elif character == ")" and start is not None:
+                rings.append(read_ring(body[start : index + 1]))
+                start = None
+
+        return Polygon(rings)
+
+    raise Exception("{} is not a supported geometry type".format(kind))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+importer.py
+A module that renders rules into the csv format used by ImportAttributeRules
+"""
+
+import csv
+
+from config import config
+
+COLUMNS = [
+    "NAME",
+    "DESCRIPTION",
+    "TYPE",
+    "SUBTYPE",
+    "FIELD",
+    "ISEDITABLE",
+    "TRIGGERINSERT",
+    "TRIGGERDELETE",
+    "TRIGGERUPDATE",
+    "SCRIPTEXPRESSION",
+    "ERRORNUMBER",
+    "ERRORMESSAGE",
+    "EXCLUDECLIENTEVALUATION",
+    "ISENABLED",
+    "BATCH",
+    "SEVERITY",
+    "TAGS",
+    "CATEGORY",
+    "CHECKPARAMETERS",
+    "TRIGGERINGFIELDS",
+]
+
+_rule_types = {
+    config.rule_types.calculation: "esriARTCalculation",
+    config.rule_types.constraint: "esriARTConstraint",
+}
+
+
+def _flag(value):
+    return "True" if value else "False"
+
+
+def render_row(rule, triggering_fields):
+    triggers = [rule.triggers] if isinstance(rule.triggers, str) else rule.triggers
+
+    return {
+        "NAME": rule.rule_name,
+        "DESCRIPTION": rule.description or "",
+        "TYPE": _rule_types[rule.type],
+        "SUBTYPE": "",
+        "FIELD": rule.field or "",
+        "ISEDITABLE": _flag(rule.editable == config.editable.yes),
+        "TRIGGERINSERT": _flag(config.triggers.insert in triggers),
+        "TRIGGERDELETE": _flag(config.triggers.delete in triggers),
+        "TRIGGERUPDATE": _flag(config.triggers.update in triggers),
+        "SCRIPTEXPRESSION": rule.arcade,
+        "ERRORNUMBER": getattr(rule, "error_number", ""),
+        "ERRORMESSAGE": getattr(rule, "error_message", ""),
+        "EXCLUDECLIENTEVALUATION": "False",
+        "ISENABLED": "True",
+        "BATCH": "False",
+        "SEVERITY": "",
+        "TAGS": rule.tag or "",
+        "CATEGORY": "",
+        "CHECKPARAMETERS": "",
+        "TRIGGERINGFIELDS": ";".join(triggering_fields),
+    }
+
+
+def render_rows(rules, get_fields):
+    """renders the rules as csv rows using get_fields to find each rule's triggering fields
+
+    rule names must be unique for an import. when a RULES list reuses a name the last rule wins, which matches
+    the alter then add deployment where the second rule alters the first.
+    """
+    rows = {}
+
+    for rule in rules:
+        if rule.rule_name in rows:
+            print("  duplicate rule name {}, using the last definition".format(rule.rule_name))
+
+        rows[rule.rule_name] = render_row(rule, get_fields(rule))
+
+    return list(rows.values())
+
+
+def write_csv(path, rules, get_fields):
+    """writes the rules to a csv file that ImportAttributeRules accepts"""
+    with open(path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=COLUMNS, quoting=csv.QUOTE_MINIMAL)
+        writer.writeheader()
+        writer.writerows(render_rows(rules, get_fields))
+
+    return path
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+indexes.py
+A module that finds the columns the rules look up related rows by so they can be given attribute indexes
+
+Every filter call in the arcade is traced back to the FeatureSetByName call that opened its feature set and the
+columns its where clause compares are paired with that table. FeatureSetByRelationshipName reads the key columns of
+its relationship class. Without an index on those columns each edit that runs the rule scans the whole related table.
+"""
+
+from types import SimpleNamespace
+
+from config import config
+from services import arcade
+
+_opens = {"featuresetbyname"}
+
+#: calls that return a subset of the feature set passed to them
+_subsets = {"filter", "orderby", "top", "distinct"}
+
+
+def _table(node, tables):
+    """the table a feature set expression reads or None when it can not be traced"""
+    if node is None:
+        return None
+
+    if node.kind == "name":
+        return tables.get(node.value)
+
+    if node.kind != "call" or not node.children:
+        return None
+
+    if node.value in _opens and len(node.children) > 1:
+        name = node.children[1]
+
+        return name.value if name.kind == "literal" and isinstance(name.value, str) else None
+
+    if node.value in _subsets:
+        return _table(node.children[0], tables)
+
+    return None
+
+
+def lookups(script):
+    """the (table, column) pairs a script's filter calls compare and its relationship classes join on"""
+    tree = arcade.compile_script(script).tree
+    tables = {}
+
+    for node in arcade.walk(tree):
+        if node.kind in ("var", "assign"):
+            table = _table(node.children[0], tables)
+
+            if table is not None:
+                tables[node.value] = table
+
+    relationships = {relationship.name.lower(): relationship for relationship in config.relationships}
+    pairs = []
+
+    for node in arcade.walk(tree):
+        if node.kind == "call" and node.value == "featuresetbyrelationshipname" and len(node.children) > 1:
+            name = node.children[1].value if node.children[1].kind == "literal" else None
+            relationship = relationships.get(str(name).lower())
+
+            if relationship is not None:
+                pairs.append((relationship.origin, relationship.primary_key))
+                pairs.append((relationship.destination, relationship.foreign_key))
+
+        if node.kind != "call" or node.value != "filter" or len(node.children) != 2:
+            continue
+
+        table = _table(node.children[0], tables)
+        where = node.children[1]
+
+        if table is None or where.kind != "literal" or not isinstance(where.value, str):
+            continue
+
+        pairs.extend((table, column) for column in arcade.where_fields(where.value))
+
+    return pairs
+
+
+def advise(modules):
+    """the columns to index for the rule modules, named the way the modules name their tables
+
+    returns a list of namespaces with the table, the column and the rules that filter by it
+    """
+    names = {module.TABLE.lower(): module.TABLE for module in modules}
+    advice = {}
+
+    for module in modules:
+        for rule in module.RULES:
+            for table, column in lookups(rule.arcade):
+                key = (table.lower(), column.lower())
+
+                if key not in advice:
+                    advice[key] = SimpleNamespace(table=names.get(key[0], table), column=column, rules=[])
+
+                name = "{}.{}".format(module.TABLE, rule.rule_name)
+
+                if name not in advice[key].rules:
+                    advice[key].rules.append(name)
+
+    return [advice[key] for key in sorted(advice)]
+
+
+def missing(advice, existing):
+    """the advice that is not covered by an existing index
+
+    existing is a dictionary of lower cased table name to a list of each index's field names. an index covers a
+    column when the column is the first field in it
+    """
+    covered = {
+        (table.lower(), fields[0].lower()) for table, indexes in existing.items() for fields in indexes if fields
+    }
+
+    return [item for item in advice if (item.table.lower(), item.column.lower()) not in covered]
+
+
+def index_name(item):
+    return "IX_{}_{}".format(item.table, item.column).upper()
+
+
+def existing_indexes(table_path):
+    """the field names of every attribute index on a table"""
+    import arcpy
+
+    return [[field.name for field in index.fields] for index in arcpy.ListIndexes(str(table_path))]
+
+
+def add_index(table_path, item):
+    import arcpy
+
+    arcpy.management.AddIndex(
+        in_table=str(table_path),
+        fields=[item.column],
+        index_name=index_name(item),
+        unique="NON_UNIQUE",
+        ascending="ASCENDING",
+    )
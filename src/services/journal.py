@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+journal.py
+A module that records the rules that were deployed so an interrupted deployment can be resumed
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+from services.manifest import content_hash
+
+
+class Journal(object):
+    """a json lines file of the rules applied to an environment
+
+    each line is keyed by environment, table, rule name and rule content hash so a rule that changed since it was
+    recorded is deployed again.
+    """
+
+    def __init__(self, path, env):
+        self.path = Path(path)
+        self.env = env or "local"
+        self._applied = None
+
+    def _read(self):
+        if not self.path.exists():
+            return []
+
+        with open(self.path, encoding="utf-8") as journal_file:
+            return [json.loads(line) for line in journal_file if line.strip()]
+
+    def _key(self, table, rule):
+        return (self.env, table, rule.rule_name, content_hash(rule))
+
+    def is_applied(self, table, rule):
+        if self._applied is None:
+            self._applied = {
+                (entry["env"], entry["table"], entry["rule"], entry["hash"])
+                for entry in self._read()
+                if entry["env"] == self.env
+            }
+
+        return self._key(table, rule) in self._applied
+
+    def record(self, table, rule, operation):
+        env, table, rule_name, rule_hash = self._key(table, rule)
+        entry = {
+            "env": env,
+            "table": table,
+            "rule": rule_name,
+            "hash": rule_hash,
+            "operation": operation,
+            "date": datetime.now().isoformat(timespec="seconds"),
+        }
+
+        #: a single write of one line per rule so workers appending at the same time do not interleave
+        with open(self.path, "a", encoding="utf-8") as journal_file:
+            journal_file.write(json.dumps(entry) + "\n")
+
+    def clear(self):
+        """forgets this environment's entries once a deployment finishes"""
+        entries = [entry for entry in self._read() if entry["env"] != self.env]
+
+        if not entries:
+            self.path.unlink(missing_ok=True)
+
+            return
+
+        with open(self.path, "w", encoding="utf-8") as journal_file:
+            journal_file.writelines(json.dumps(entry) + "\n" for entry in entries)
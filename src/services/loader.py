@@ -3,17 +3,241 @@
 """
 loader.py
 A module that loads js arcade scripts into text
+
+The scripts are preprocessed as they are loaded. A line with #include <folder>/<name> pastes in that file once and
+#define NAME <literal> replaces the name with the literal everywhere in the script. The constants a rule module
+passes to lazy_rule_for are defined the same way and fill in {name} placeholders in the include paths in lower case.
+Strings that are added together are folded into one and the comments and whitespace are stripped.
 """
 
+import json
+from functools import partial
 from pathlib import Path
 
+from services import arcade
+
 ARCADE_PATH = Path(__file__).resolve().parent.parent / "rules" / "arcade"
 
+#: (rule file path, constants) to ({file path: modified time}, text) so a rule is only preprocessed again when one of
+#: the files it reads changes
+_cache = {}
+
+#: a statement can not end with these tokens so a newline after them is not needed
+_continues = {";", "{", "(", "[", ",", ":", ".", "=", "+=", "-=", "==", "!=", "<", ">", "<=", ">=", "&&", "||", "!"}
+_continues |= {"+", "-", "*", "/", "%"}
+
+#: a statement can not start with these tokens so a newline before them is not needed
+_continued = {";", "}", ")", "]", ",", ".", ":", "=", "==", "!=", "<=", ">=", "&&", "||", "*", "/", "%", "+", "-"}
+
+#: tokens that bind tighter than + so a string next to them is not folded
+_binds_tighter = {"-", "*", "/", "%", "!", ".", "[", "("}
+
+#: token kinds that run together into one word without a space between them
+_words = {"name", "number"}
+
+
+def literal(value):
+    """renders a python value as an arcade literal"""
+    if value is None:
+        return "null"
+
+    if isinstance(value, bool):
+        return "true" if value else "false"
+
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(literal(item) for item in value) + "]"
+
+    if isinstance(value, str):
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\n") + "'"
+
+    return json.dumps(value)
+
+
+def _read(path, files):
+    try:
+        files[path] = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise Exception(f"rule file not found: {path}")
+
+    return path.read_text()
+
+
+def _modified(path):
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _expand(path, constants, defines, files, keep_defines=False):
+    """pastes in the #include files once each and collects the #define literals"""
+    lines = []
+
+    for line in _read(path, files).splitlines():
+        directive, _, argument = line.strip().partition(" ")
+
+        if directive == "#include":
+            placeholders = {name: str(value).lower() for name, value in constants.items()}
+
+            try:
+                include = ARCADE_PATH / "{}.js".format(argument.strip().format(**placeholders))
+            except KeyError as e:
+                raise Exception("{} includes {} without the {} constant".format(path.name, argument, e)) from e
+
+            if include not in files:
+                lines.append(_expand(include, constants, defines, files, keep_defines))
+        elif directive == "#define":
+            name, _, value = argument.strip().partition(" ")
+            defines[name] = value.strip()
+
+            if keep_defines:
+                lines.append(line)
+        else:
+            lines.append(line)
+
+    return "\n".join(lines)
+
+
+def _tokens(script, defines):
+    """the tokens with the defined names replaced and only the newlines that can end a statement"""
+    replaced = " ".join(
+        defines.get(text, text) if kind == "name" else text
+        for kind, text, _ in arcade.tokenize(script, keep_newlines=True)
+        if kind != "end"
+    )
+    tokens = []
+
+    for token in arcade.tokenize(replaced, keep_newlines=True):
+        kind, text, _ = token
+
+        if kind == "newline" and (not tokens or tokens[-1][0] == "newline" or tokens[-1][1] in _continues):
+            continue
+
+        if text in _continued and tokens and tokens[-1][0] == "newline":
+            tokens.pop()
+
+        tokens.append(token)
+
+    return tokens
+
 
-def load_rule_for(rule_type, name):
+def _fold(tokens):
+    """folds strings that are added together into a single string"""
+    folded = []
+    index = 0
+
+    while index < len(tokens):
+        kind, text, line = tokens[index]
+        end = index + 1
+
+        if kind == "string" and (not folded or folded[-1][1] not in _binds_tighter):
+            value = arcade.unquote(text)
+
+            while tokens[end][1] == "+" and tokens[end + 1][0] == "string" and tokens[end + 2][1] not in _binds_tighter:
+                value += arcade.unquote(tokens[end + 1][1])
+                end += 2
+
+        if end > index + 1:
+            folded.append(("string", literal(value), line))
+        else:
+            folded.append(tokens[index])
+
+        index = end
+
+    return folded
+
+
+def _needs_space(previous, following):
+    """two tokens need a space between them when both are words or they would be read as one token without it
+
+    arcade reads $ as part of a name so a keyword and $feature are always kept apart, whatever our lexer thinks
+    """
+    if previous[0] in _words and following[0] in _words:
+        return True
+
+    return arcade.tokenize(previous[1] + following[1])[0][1] != previous[1]
+
+
+def preprocess(script, defines=None):
+    """replaces the defined names with their literals, folds the strings and strips the comments and whitespace"""
+    output = []
+    previous = None
+
+    for kind, text, _ in _fold(_tokens(script, defines or {})):
+        if kind == "end":
+            break
+
+        starts_line = previous is None or previous[0] == "newline"
+
+        if kind != "newline" and not starts_line and _needs_space(previous, (kind, text)):
+            output.append(" ")
+
+        output.append(text)
+        previous = (kind, text)
+
+    return "".join(output).strip()
+
+
+def expand(rule_type, name, **constants):
+    """the rule file as it is written with the included files pasted in and the constants it is given defined"""
+    lines = ["#define {} {}".format(constant, literal(value)) for constant, value in constants.items()]
+    lines.append(_expand(ARCADE_PATH / rule_type / f"{name}.js", constants, {}, {}, keep_defines=True))
+
+    return "\n".join(lines)
+
+
+def load_rule_for(rule_type, name, **constants):
+    """reads and preprocesses a rule file. constants are defined as literals and fill in the include paths"""
     rule_location = ARCADE_PATH / rule_type / f"{name}.js"
+    key = (rule_location, tuple(sorted((constant, repr(value)) for constant, value in constants.items())))
+
+    cached = _cache.get(key)
+
+    if cached is not None and all(_modified(path) == modified for path, modified in cached[0].items()):
+        return cached[1]
+
+    files = {}
+    defines = {constant: literal(value) for constant, value in constants.items()}
+    text = preprocess(_expand(rule_location, constants, defines, files), defines)
+    _cache[key] = (files, text)
+
+    return text
+
+
+def lazy_rule_for(rule_type, name, **constants):
+    """returns a function that loads the rule file when the arcade is first used"""
+    load = partial(load_rule_for, rule_type, name, **constants)
+    load.source = partial(expand, rule_type, name, **constants)
+
+    return load
+
+
+def size_report(rule_groups):
+    """the bytes of each rule's arcade as it is written and as it is deployed"""
+    return [
+        {
+            "table": group.name,
+            "rule": rule.rule_name,
+            "source": len(rule.source.encode("utf-8")),
+            "deployed": len(rule.arcade.encode("utf-8")),
+        }
+        for group in rule_groups
+        for rule in group.meta_rules
+    ]
+
+
+def format_size_report(rows):
+    lines = [
+        "{}: {} {} bytes, {} saved".format(row["table"], row["rule"], row["deployed"], row["source"] - row["deployed"])
+        for row in rows
+    ]
 
-    if not rule_location.exists():
-        raise Exception(f"rule file not found: {rule_location}")
+    source = sum(row["source"] for row in rows)
+    deployed = sum(row["deployed"] for row in rows)
+    lines.append(
+        "{} bytes deployed from {} bytes of arcade, {} saved ({:.0%})".format(
+            deployed, source, source - deployed, (source - deployed) / source if source else 0
+        )
+    )
 
-    return rule_location.read_text()
+    return "\n".join(lines)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+manifest.py
+A module that compiles the rule modules into a single json file and loads them back
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from models.ruletypes import BaseType, Calculation, CompositeConstraint, Constant, Constraint, MultiCalculation
+
+#: bump when the shape of the manifest changes so older files are rejected
+FORMAT = 4
+
+DEFAULT_PATH = Path("rules.manifest.json")
+
+_fields = [
+    "name",
+    "rule_name",
+    "field",
+    "fields",
+    "replaces",
+    "shape_type",
+    "type",
+    "triggers",
+    "editable",
+    "tag",
+    "description",
+    "error_number",
+    "error_message",
+    "arcade",
+]
+
+_types = {
+    "Constant": Constant,
+    "Calculation": Calculation,
+    "MultiCalculation": MultiCalculation,
+    "Constraint": Constraint,
+    "CompositeConstraint": CompositeConstraint,
+}
+
+
+def rule_to_dict(rule):
+    data = {field: getattr(rule, field, None) for field in _fields}
+    data["hash"] = content_hash(rule)
+
+    if hasattr(rule, "constraints"):
+        #: the members are kept so validate can run their checks without the rule modules
+        data["constraints"] = [rule_to_dict(constraint) for constraint in rule.constraints]
+
+    return data
+
+
+def rule_from_dict(data):
+    rule = BaseType.__new__(_types[data["tag"]])
+    BaseType.__init__(rule)
+
+    for field in _fields:
+        if field in ("error_number", "error_message", "fields", "replaces") and data[field] is None:
+            continue
+
+        setattr(rule, field, data[field])
+
+    if "constraints" in data:
+        rule.constraints = [rule_from_dict(constraint) for constraint in data["constraints"]]
+
+    return rule
+
+
+def content_hash(rule):
+    """a sha256 of everything that is deployed for a rule"""
+    payload = json.dumps({field: getattr(rule, field, None) for field in _fields}, sort_keys=True)
+
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build(modules, version):
+    """returns the manifest for a dictionary of rule name to rule module"""
+    return {
+        "format": FORMAT,
+        "version": version,
+        "tables": {
+            name: {
+                "table": module.TABLE,
+                "rules": [rule_to_dict(rule) for rule in module.RULES],
+            }
+            for name, module in modules.items()
+        },
+    }
+
+
+def write(path, manifest):
+    Path(path).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    return path
+
+
+def _check_hash(rule, data, name):
+    if content_hash(rule) != data["hash"]:
+        raise Exception("manifest rule {} in {} does not match its hash".format(rule.rule_name, name))
+
+    for constraint, constraint_data in zip(getattr(rule, "constraints", []), data.get("constraints", [])):
+        _check_hash(constraint, constraint_data, name)
+
+
+def read(path):
+    """reads a manifest and returns a dictionary of rule name to (table, rules)"""
+    manifest = json.loads(Path(path).read_text(encoding="utf-8"))
+
+    if manifest.get("format") != FORMAT:
+        raise Exception("manifest format {} is not supported, rebuild it".format(manifest.get("format")))
+
+    tables = {}
+
+    for name, table in manifest["tables"].items():
+        table_rules = [rule_from_dict(rule) for rule in table["rules"]]
+
+        for rule, data in zip(table_rules, table["rules"]):
+            _check_hash(rule, data, name)
+
+        tables[name] = (table["table"], table_rules)
+
+    return tables
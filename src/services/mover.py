@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+mover.py
+A module that copies a field from a parent table to the rows that reference it
+
+A move is a dictionary of the from_table and its key, the to_table and its foreign_key, the field to read and the
+to_field to write. The copy is pushed down to the database as one UPDATE when the tables are in an enterprise
+geodatabase and not versioned. Otherwise the parent values are read once and only the rows whose value is different
+are updated, a chunk at a time, with a cursor. Both only write the rows whose to_field is null or different so a move
+that was interrupted picks up where it stopped when it is run again.
+"""
+
+import itertools
+import os
+
+
+def _different(target, source):
+    """a null safe target <> source"""
+    return "(({0} IS NULL AND {1} IS NOT NULL) OR ({0} IS NOT NULL AND {1} IS NULL) OR {0} <> {1})".format(
+        target, source
+    )
+
+
+def _pending(move):
+    """the join condition for the to_table rows whose parent has a different value"""
+    return "parent.{key} = {to_table}.{foreign_key} AND {different}".format(
+        different=_different("{to_table}.{to_field}".format(**move), "parent.{field}".format(**move)), **move
+    )
+
+
+def count_sql(move):
+    """counts the rows a move will write"""
+    return "SELECT COUNT(*) FROM {to_table} JOIN {from_table} parent ON {pending}".format(
+        pending=_pending(move), **move
+    )
+
+
+def update_sql(move):
+    """a single UPDATE joined to the parent table that copies its values into the rows that are null or different
+
+    UPDATE ... FROM runs on sql server, postgres and sqlite 3.33 or newer
+    """
+    return "UPDATE {to_table} SET {to_field} = parent.{field} FROM {from_table} parent WHERE {pending}".format(
+        pending=_pending(move), **move
+    )
+
+
+def find_changes(rows, values):
+    """yields the (objectid, value) of each row whose value is not its parent's
+
+    rows are (objectid, foreign key, current value) and values is a dictionary of parent key to value. rows without a
+    parent are skipped
+    """
+    for objectid, foreign_key, current in rows:
+        if foreign_key not in values:
+            continue
+
+        value = values[foreign_key]
+
+        if current != value:
+            yield objectid, value
+
+
+def chunks(items, size):
+    """yields lists of up to size items"""
+    items = iter(items)
+
+    while True:
+        chunk = list(itertools.islice(items, size))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def supports_sql(sde, move):
+    """true when the move can be pushed down to the database as one UPDATE
+
+    versioned tables keep their edits in delta tables so they are only changed through a cursor
+    """
+    import arcpy
+
+    if arcpy.Describe(str(sde)).workspaceType != "RemoteDatabase":
+        return False
+
+    return not any(
+        arcpy.Describe(os.path.join(sde, table)).isVersioned for table in (move["from_table"], move["to_table"])
+    )
+
+
+def move_with_sql(sde, move):
+    import arcpy
+
+    connection = arcpy.ArcSDESQLExecute(str(sde))
+    count = int(connection.execute(count_sql(move)))
+
+    if count:
+        connection.execute(update_sql(move))
+
+    return count
+
+
+def move_with_cursor(sde, move, chunk_size):
+    import arcpy
+
+    source = os.path.join(sde, move["from_table"])
+    target = os.path.join(sde, move["to_table"])
+
+    with arcpy.da.SearchCursor(source, [move["key"], move["field"]]) as cursor:
+        values = dict(cursor)
+
+    with arcpy.da.SearchCursor(target, ["OID@", move["foreign_key"], move["to_field"]]) as cursor:
+        changes = list(find_changes(cursor, values))
+
+    oid_field = arcpy.Describe(target).OIDFieldName
+
+    for chunk in chunks(changes, chunk_size):
+        updates = dict(chunk)
+        where = "{} IN ({})".format(oid_field, ",".join(str(objectid) for objectid in updates))
+
+        with arcpy.da.UpdateCursor(target, ["OID@", move["to_field"]], where_clause=where) as cursor:
+            for objectid, _ in cursor:
+                cursor.updateRow((objectid, updates[objectid]))
+
+    return len(changes)
+
+
+def move_field(sde, move, chunk_size=10000):
+    """copies the field and returns the number of rows that were written"""
+    if supports_sql(sde, move):
+        print("  copying {field} to {to_table}.{to_field} with one update".format(**move))
+
+        return move_with_sql(sde, move)
+
+    print("  copying {field} to {to_table}.{to_field} with a cursor".format(**move))
+
+    return move_with_cursor(sde, move, chunk_size)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+planner.py
+A module that plans the geoprocessing calls a deployment will make without talking to the database
+"""
+
+import json
+from pathlib import Path
+
+from services import analyzer, diff, trace
+
+#: seconds per call used when there are no recorded timings
+DEFAULT_TIMINGS = {
+    diff.operations["add"]: 8.0,
+    diff.operations["alter"]: 6.0,
+    diff.operations["delete"]: 4.0,
+}
+
+
+#: the traced geoprocessing tool for each operation
+_traced_operations = {
+    diff.operations["add"]: "AddAttributeRule",
+    diff.operations["alter"]: "AlterAttributeRule",
+    diff.operations["delete"]: "DeleteAttributeRule",
+}
+
+
+def read_snapshot(path):
+    """reads a snapshot written by ar snapshot. returns a dictionary of table name to snapshot"""
+    if path is None:
+        return {}
+
+    return json.loads(Path(path).read_text(encoding="utf-8"))["tables"]
+
+
+def read_timings(path):
+    """reads a json dictionary of operation to seconds per call, or a trace file, and fills in the defaults"""
+    timings = dict(DEFAULT_TIMINGS)
+
+    if path is None:
+        return timings
+
+    if Path(path).suffix == ".jsonl":
+        averages = trace.average_durations(path)
+
+        for operation, tool in _traced_operations.items():
+            if tool in averages:
+                timings[operation] = averages[tool]
+
+        return timings
+
+    timings.update(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    return timings
+
+
+def snapshot_fields(snapshot):
+    """returns a function that gives a rule's triggering fields from the fields a snapshot recorded"""
+
+    def get_fields(rule):
+        return analyzer.get_triggering_fields(rule.arcade, snapshot["fields"], snapshot["shape_field"])
+
+    return get_fields
+
+
+def plan_table(table, rules, snapshot=None):
+    """returns the calls a diff deployment of rules makes against a table snapshot
+
+    without a snapshot the table is assumed to have no rules and every rule is added
+    """
+    if snapshot is None:
+        existing = {}
+
+        def get_fields(rule):
+            return sorted(analyzer.analyze(rule.arcade).fields)
+    else:
+        existing = snapshot["rules"]
+        get_fields = snapshot_fields(snapshot)
+
+    steps = diff.plan(rules, existing, get_fields)
+    changed = diff.count_changed(rules, steps)
+
+    return {
+        "table": table,
+        "rules": len(rules),
+        "unchanged": len(rules) - changed,
+        "touches_every_rule": len(rules) > 0 and changed == len(rules),
+        "calls": [{"operation": operation, "rule": rule.rule_name} for operation, rule in steps],
+        "legacy_calls": diff.legacy_call_count(rules, existing),
+    }
+
+
+def summarize(plans, timings):
+    """totals the plans and estimates their duration with timings"""
+    for plan in plans:
+        plan["estimated_seconds"] = round(sum(timings[call["operation"]] for call in plan["calls"]), 1)
+
+    return {
+        "tables": plans,
+        "calls": sum(len(plan["calls"]) for plan in plans),
+        "legacy_calls": sum(plan["legacy_calls"] for plan in plans),
+        "estimated_seconds": round(sum(plan["estimated_seconds"] for plan in plans), 1),
+    }
+
+
+def format_summary(summary):
+    lines = []
+
+    for plan in summary["tables"]:
+        lines.append(
+            "{}: {} calls, {} of {} rules unchanged, ~{}s".format(
+                plan["table"], len(plan["calls"]), plan["unchanged"], plan["rules"], plan["estimated_seconds"]
+            )
+        )
+
+        if plan["touches_every_rule"]:
+            lines.append("  warning: every rule in {} will be changed".format(plan["table"]))
+
+        for call in plan["calls"]:
+            lines.append("  {} {}".format(call["operation"], call["rule"]))
+
+    lines.append(
+        "{} geoprocessing calls (alter then add would make {}), estimated {}s".format(
+            summary["calls"], summary["legacy_calls"], summary["estimated_seconds"]
+        )
+    )
+
+    return "\n".join(lines)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+recalculator.py
+A module that recalculates the facility county fips, city and zip code for a whole table at once
+
+The facility location calculation rule only runs when a facility is edited. This reads the boundaries into STR trees
+and repeats what getAttributeFromLargestArea in the facility arcade does for every facility, so backfills and audits
+do not have to edit the rows one at a time. The work per facility is a few tree lookups, so it runs in one process;
+sending the boundaries to a process pool cost more than it saved.
+"""
+
+from types import SimpleNamespace
+
+from services import arcade, geometry
+
+TABLE = "UICFacility"
+
+#: what the location calculation returns when no zip code intersects, the county fips is null without a county
+NO_INTERSECTION = {"errorMessage": "No intersection found"}
+
+
+def format_fips(value):
+    """the fips part of locationCalculation.js, number('490' + text(result, '00')) or null"""
+    code = arcade.functions["number"]("490" + arcade.text(value, "00"))
+
+    return None if arcade.functions["isnan"](code) else code
+
+
+#: the facility field each calculation fills, the boundaries it reads and what it does with the result
+LOCATIONS = [
+    SimpleNamespace(field="CountyFIPS", table="Counties", source="FIPS", missing=NO_INTERSECTION, finish=format_fips),
+    SimpleNamespace(field="FacilityCity", table="Municipalities", source="NAME", missing=None, finish=None),
+    SimpleNamespace(field="FacilityZIP", table="ZipCodes", source="ZIP5", missing=NO_INTERSECTION, finish=None),
+]
+
+
+class Boundaries(object):
+    """the shapes and values of a boundary table in feature set order with an STR tree over them"""
+
+    def __init__(self, rows):
+        rows = list(rows)
+        self.values = [value for value, _ in rows]
+        self.shapes = [shape for _, shape in rows]
+        self.tree = geometry.STRtree(self.shapes)
+
+    def largest_overlap(self, shape, missing):
+        """getAttributeFromLargestArea: the only intersecting value, or the one with the most overlap
+
+        the first of equal overlaps wins, so a point facility gets the first boundary that contains it
+        """
+        items = [index for index in self.tree.query(shape.extent) if geometry.intersects(self.shapes[index], shape)]
+
+        if not items:
+            return missing
+
+        if len(items) == 1:
+            return self.values[items[0]]
+
+        largest = -1
+        result = None
+
+        for index in items:
+            size = geometry.overlap_area(self.shapes[index], shape)
+
+            if size > largest:
+                largest = size
+                result = self.values[index]
+
+        return result
+
+
+def calculate(shape, boundaries):
+    """returns the value the location calculation gives each field for a facility shape"""
+    results = {}
+
+    for location in LOCATIONS:
+        if shape is None:
+            #: intersects fails without a geometry so the edit is rejected
+            results[location.field] = {"errorMessage": "The facility has no shape"}
+
+            continue
+
+        value = boundaries[location.table].largest_overlap(shape, location.missing)
+
+        if location.finish is not None:
+            value = location.finish(value)
+
+        results[location.field] = value
+
+    return results
+
+
+def is_rejected(value):
+    """a calculation that returns an error message fails the edit, so the row keeps its value"""
+    return isinstance(value, dict) and "errorMessage" in value
+
+
+def is_same(value, current):
+    """the value is stored in the field's type so 49001.0 and '84101' match 49001 and 84101"""
+    return value == current or arcade.text(value) == arcade.text(current)
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def find_changes(facilities, boundaries):
+    """calculates every facility and returns the changed values and the rejected fields per objectid
+
+    a row with a rejected field is rejected as a whole and keeps every value. facilities is a list of
+    (objectid, shape, {field: current value}) tuples
+    """
+    changes = {}
+    rejected = {}
+
+    for objectid, shape, current in facilities:
+        values = calculate(shape, boundaries)
+        failed = [field for field, value in values.items() if is_rejected(value)]
+
+        if failed:
+            #: the calculation fails the whole edit so none of the row's fields change
+            rejected[objectid] = failed
+
+            continue
+
+        for field, value in values.items():
+            if not is_same(value, current.get(field)):
+                changes.setdefault(objectid, {})[field] = value
+
+    return changes, rejected
+
+
+def load_boundaries(sde):
+    """reads every boundary table in objectid order, the order FeatureSetByName returns them"""
+    import arcpy
+
+    boundaries = {}
+
+    for location in LOCATIONS:
+        with arcpy.da.SearchCursor(
+            in_table=str(sde / location.table),
+            field_names=[location.source, "SHAPE@"],
+            sql_clause=(None, "ORDER BY OBJECTID"),
+        ) as cursor:
+            boundaries[location.table] = Boundaries(
+                (value, geometry.from_geo_interface(shape)) for value, shape in cursor
+            )
+
+    return boundaries
+
+
+def read_facilities(sde):
+    import arcpy
+
+    fields = [location.field for location in LOCATIONS]
+
+    with arcpy.da.SearchCursor(in_table=str(sde / TABLE), field_names=["OID@", "SHAPE@", *fields]) as cursor:
+        return [
+            (objectid, geometry.from_geo_interface(shape), dict(zip(fields, values)))
+            for objectid, shape, *values in cursor
+        ]
+
+
+def write_changes(sde, changes, batch_size=500):
+    """updates only the rows and fields that changed, a batch of objectids at a time"""
+    import arcpy
+
+    fields = [location.field for location in LOCATIONS]
+    objectids = sorted(changes)
+    updated = 0
+
+    with arcpy.da.Editor(str(sde)):
+        for batch in _chunks(objectids, batch_size):
+            where = "OBJECTID IN ({})".format(",".join(str(objectid) for objectid in batch))
+
+            with arcpy.da.UpdateCursor(
+                in_table=str(sde / TABLE), field_names=["OID@", *fields], where_clause=where
+            ) as cursor:
+                for row in cursor:
+                    for field, value in changes[row[0]].items():
+                        row[fields.index(field) + 1] = value
+
+                    cursor.updateRow(row)
+                    updated += 1
+
+    return updated
+
+
+def format_summary(facilities, changes, rejected):
+    lines = ["{} facilities, {} changed".format(len(facilities), len(changes))]
+
+    for location in LOCATIONS:
+        changed = sum(1 for values in changes.values() if location.field in values)
+        failed = sum(1 for fields in rejected.values() if location.field in fields)
+        lines.append("  {:<14} {:>6} changed {:>6} rejected".format(location.field, changed, failed))
+
+    return "\n".join(lines)
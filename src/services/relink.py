@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+relink.py
+A module that points each contact at its facility from the many to many cross reference table
+
+The cross reference and the contacts are read a page at a time, both ordered by the contact guid as text, and merge
+joined so only a page of each side is held in memory no matter how large the tables are. Guids are compared in one
+canonical form, upper case without braces, and only the contacts whose Facility_FK is not already their facility are
+written, a chunk at a time.
+"""
+
+from services import mover
+
+XREF = "UICFACILITYTOCONTACT"
+CONTACT = "UICContact"
+
+_text = "convert(nvarchar(50),{})"
+
+
+def canonical_guid(value):
+    """the upper case guid without braces or None"""
+    if value is None:
+        return None
+
+    value = str(value)
+
+    if value[:1] == "{":
+        value = value[1:-1]
+
+    return value.upper()
+
+
+def xref_sql(size, after=None):
+    """a page of (contact guid, facility guid) ordered by contact then facility, after the last (contact, facility)"""
+    contact, facility = _text.format("contactGUID"), _text.format("FacilityGUID")
+    where = "1=1"
+
+    if after is not None:
+        where = "{0} > '{2}' OR ({0} = '{2}' AND {1} > '{3}')".format(contact, facility, *after)
+
+    return "SELECT TOP {} {}, {} FROM {} WHERE {} ORDER BY 1, 2".format(size, contact, facility, XREF, where)
+
+
+def contact_sql(size, after=None):
+    """a page of (objectid, guid, facility fk) ordered by the guid, after the guid"""
+    guid = _text.format("Guid")
+    where = "Guid IS NOT NULL"
+
+    if after is not None:
+        where += " AND {} > '{}'".format(guid, after)
+
+    return "SELECT TOP {} OBJECTID, {}, {} FROM {} WHERE {} ORDER BY 2".format(
+        size, guid, _text.format("Facility_FK"), CONTACT, where
+    )
+
+
+def pages(fetch, size, key):
+    """yields every row of the pages fetch(size, after) returns until a page is short
+
+    after is None for the first page and then key of the last row read
+    """
+    after = None
+
+    while True:
+        rows = fetch(size, after)
+
+        yield from rows
+
+        if len(rows) < size:
+            return
+
+        after = key(rows[-1])
+
+
+def _ordered(rows, key, name):
+    previous = None
+
+    for row in rows:
+        current = key(row)
+
+        if previous is not None and current < previous:
+            raise Exception("{} rows are not ordered by guid, {} came after {}".format(name, current, previous))
+
+        previous = current
+
+        yield current, row
+
+
+def merge_join(xref, contacts):
+    """yields (contact row, facility guid) for each contact in the cross reference
+
+    xref is (contact guid, facility guid) rows and contacts is (objectid, guid, facility fk) rows, both ordered by the
+    canonical contact guid. a contact with more than one facility is given the last one, the way a dictionary of the
+    cross reference would
+    """
+    xref = _ordered(xref, lambda row: canonical_guid(row[0]), XREF)
+    contacts = _ordered(contacts, lambda row: canonical_guid(row[1]), CONTACT)
+
+    link = next(xref, None)
+
+    for guid, contact in contacts:
+        while link is not None and link[0] < guid:
+            link = next(xref, None)
+
+        facility = None
+
+        while link is not None and link[0] == guid:
+            facility = link[1][1]
+            link = next(xref, None)
+
+        if facility is not None:
+            yield contact, canonical_guid(facility)
+
+
+def changes(joined):
+    """yields (objectid, braced facility guid) for the contacts that are not already linked to their facility"""
+    for (objectid, _, current), facility in joined:
+        if canonical_guid(current) != facility:
+            yield objectid, "{" + facility + "}"
+
+
+def query(sde, sql):
+    """runs a select and returns its rows"""
+    import arcpy
+
+    connection = arcpy.ArcSDESQLExecute(str(sde))
+    rows = connection.execute(sql)
+
+    del connection  #: removes workspace from in transaction mode so the update cursor can edit
+
+    return rows if isinstance(rows, list) else []
+
+
+def relink(sde, table_path, chunk_size=10000):
+    """sets the contacts' Facility_FK and returns the number of contacts that were written"""
+    import arcpy
+
+    xref = pages(lambda size, after: query(sde, xref_sql(size, after)), chunk_size, lambda row: row)
+    contacts = pages(lambda size, after: query(sde, contact_sql(size, after)), chunk_size, lambda row: row[1])
+    written = 0
+
+    for chunk in mover.chunks(changes(merge_join(xref, contacts)), chunk_size):
+        updates = dict(chunk)
+        where = "OBJECTID IN ({})".format(",".join(str(objectid) for objectid in updates))
+
+        with arcpy.da.UpdateCursor(str(table_path), ["OID@", "Facility_FK"], where_clause=where) as cursor:
+            for objectid, _ in cursor:
+                cursor.updateRow((objectid, updates[objectid]))
+
+        written += len(updates)
+
+    return written
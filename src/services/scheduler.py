@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+scheduler.py
+A module that runs rule groups concurrently in a process pool
+"""
+
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+
+from services import trace
+from services.backend import SchemaLockError
+
+_backend = None
+
+
+def _connect(backend, sde, tracing=False):
+    """process pool initializer so each worker opens its own workspace connection"""
+    global _backend
+
+    _backend = backend
+    _backend.connect(sde)
+
+    if tracing:
+        trace.enable()
+
+
+def _run(group, action, options, retries, delay):
+    """runs the action for one rule group and returns the captured output instead of printing it"""
+    output = io.StringIO()
+    error = None
+    start = time.perf_counter()
+
+    with redirect_stdout(output):
+        for attempt in range(retries + 1):
+            try:
+                _backend.run(group, action, **options)
+                error = None
+
+                break
+            except SchemaLockError as e:
+                error = e
+                print("  schema lock on {}, attempt {} of {}".format(group.name, attempt + 1, retries + 1))
+
+                if attempt < retries:
+                    time.sleep(delay * (attempt + 1))
+            except Exception as e:
+                error = e
+                print("  {} failed: {}".format(group.name, e))
+
+                break
+
+    return {
+        "table": group.name,
+        "output": output.getvalue(),
+        "calls_issued": group.calls_issued,
+        "calls_saved": group.calls_saved,
+        "error": None if error is None else str(error),
+        "seconds": time.perf_counter() - start,
+        "spans": trace.drain(),
+    }
+
+
+def run(groups, action, sde, backend, jobs=1, retries=3, delay=5, tracing=False, **options):
+    """runs action on every rule group using up to jobs worker processes
+
+    each table's output is printed as a single block when it finishes and the spans each worker traced are
+    collected in this process. returns the list of results and the failed table names so the caller can decide
+    whether the run succeeded.
+    """
+    results = []
+    by_name = {group.name: group for group in groups}
+
+    def collect(result):
+        print(result["output"], end="")
+        by_name[result["table"]].calls_issued = result["calls_issued"]
+        by_name[result["table"]].calls_saved = result["calls_saved"]
+        trace.extend(result["spans"])
+        results.append(result)
+
+    if jobs <= 1:
+        _connect(backend, sde, tracing)
+
+        for group in groups:
+            collect(_run(group, action, options, retries, delay))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_connect, initargs=(backend, sde, tracing)) as pool:
+            futures = [pool.submit(_run, group, action, options, retries, delay) for group in groups]
+
+            for future in as_completed(futures):
+                collect(future.result())
+
+    failures = [result["table"] for result in results if result["error"] is not None]
+
+    return results, failures
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+steps.py
+A module that runs migration steps in the order their dependencies allow
+
+Each step names the steps it runs after and a probe that reads a schema snapshot to tell if the step has already
+been applied. The snapshot is read once, with one describe of the workspace, one listing of the domains and a few
+listings for each table the probes look at, so applied steps are skipped without a geoprocessing call. The steps
+left are run in waves and the steps in a wave do not depend on each other, so they run at the same time with the
+same scheduler the rules and the versioning use.
+"""
+
+from types import SimpleNamespace
+
+from services import indexes, scheduler
+
+#: the field type ListFields reports for each AddField field type
+_field_types = {
+    "TEXT": "String",
+    "LONG": "Integer",
+    "SHORT": "SmallInteger",
+    "DOUBLE": "Double",
+    "FLOAT": "Single",
+    "DATE": "Date",
+    "GUID": "Guid",
+}
+
+
+class Step(object):
+    """a migration step. run is called with the sde path and applied with the schema snapshot
+
+    tables are unversioned while the step runs. locks are the other tables it needs a schema lock on, like the ones
+    it deletes. run and applied are sent to the worker processes so they need to be module level functions or
+    partials of them
+    """
+
+    def __init__(self, name, run, tables=None, after=None, applied=None, locks=None):
+        self.name = name
+        self.run = run
+        self.tables = tables or []
+        self.locks = self.tables + (locks or [])
+        self.after = after or []
+        self.applied = applied
+        self.meta_rules = []
+        self.calls_issued = 0
+        self.calls_saved = 0
+
+    def migrate(self, sde):
+        self.run(sde)
+
+
+def _name(name):
+    return name.split(".")[-1].lower()
+
+
+def order(steps):
+    """the steps in waves where every step comes after the steps it runs after
+
+    the steps in a wave do not depend on each other. dependencies on steps that are not given, because they are
+    applied or were not asked for, are ignored
+    """
+    names = {step.name for step in steps}
+    unknown = [name for step in steps for name in step.after if name not in names]
+    done = set(unknown)
+    remaining = list(steps)
+    waves = []
+
+    while remaining:
+        wave = [step for step in remaining if all(name in done for name in step.after)]
+
+        if not wave:
+            raise Exception("migration steps depend on each other: {}".format(", ".join(s.name for s in remaining)))
+
+        waves.append(wave)
+        done.update(step.name for step in wave)
+        remaining = [step for step in remaining if step.name not in done]
+
+    return waves
+
+
+def pending(steps, schema):
+    """the steps the schema snapshot shows are not applied yet"""
+    todo = []
+
+    for step in steps:
+        if step.applied is not None and step.applied(schema):
+            print("  {} already applied".format(step.name))
+
+            continue
+
+        todo.append(step)
+
+    return todo
+
+
+def run(steps, sde, backend, jobs=1, tracing=False):
+    """runs the steps a wave at a time with up to jobs steps at the same time
+
+    a step is skipped when a step it runs after fails. returns the results and the failed or skipped step names
+    """
+    results = []
+    failures = []
+
+    for wave in order(steps):
+        ready = []
+
+        for step in wave:
+            failed = [name for name in step.after if name in failures]
+
+            if failed:
+                print("skipping {}, {} failed".format(step.name, ", ".join(failed)))
+                failures.append(step.name)
+
+                continue
+
+            ready.append(step)
+
+        if not ready:
+            continue
+
+        print("running {}".format(", ".join(step.name for step in ready)))
+
+        wave_results, wave_failures = scheduler.run(
+            ready, "migrate", sde, backend, jobs=min(jobs, len(ready)), tracing=tracing
+        )
+
+        results += wave_results
+        failures += wave_failures
+
+    return results, failures
+
+
+def read_schema(sde, tables):
+    """a snapshot of the datasets, domains and the fields, field groups and indexes of the tables the probes read
+
+    names are the owner qualified table and feature class names. the other names are lower cased without the owner
+    """
+    import arcpy
+
+    schema = SimpleNamespace(names=[], tables=set(), relationships=set(), domains={}, fields={}, groups={}, indexes={})
+    paths = {}
+    children = list(arcpy.Describe(str(sde)).children)
+    wanted = {table.lower() for table in tables}
+
+    while children:
+        child = children.pop(0)
+
+        if child.dataType == "FeatureDataset":
+            children += list(child.children)
+        elif child.dataType == "RelationshipClass":
+            schema.relationships.add(_name(child.name))
+        elif child.dataType in ("Table", "FeatureClass"):
+            schema.names.append(child.name)
+            schema.tables.add(_name(child.name))
+            paths[_name(child.name)] = child.catalogPath
+
+    for domain in arcpy.da.ListDomains(str(sde)):
+        schema.domains[domain.name.lower()] = {str(code) for code in (domain.codedValues or {})}
+
+    for table in wanted & set(paths):
+        schema.fields[table] = {
+            field.name.lower(): (field.type, field.length) for field in arcpy.ListFields(paths[table])
+        }
+        schema.groups[table] = {group.name.lower() for group in arcpy.da.ListFieldGroups(paths[table])}
+        schema.indexes[table] = indexes.existing_indexes(paths[table])
+
+    return schema
+
+
+def tables_deleted(tables, schema):
+    return not any(table.lower() in schema.tables for table in tables)
+
+
+def tables_created(tables, schema):
+    return all(table.lower() in schema.tables for table in tables)
+
+
+def fields_modified(changes, schema):
+    """the added fields exist with their type and length and the deleted fields that are not added back are gone"""
+    for table, modification in changes.items():
+        fields = schema.fields.get(table.lower(), {})
+        added = set()
+
+        for add in modification["add"]:
+            name = add["field_name"].lower()
+            added.add(name)
+
+            if name not in fields or fields[name][0] != _field_types.get(add["field_type"], add["field_type"]):
+                return False
+
+            length = add.get("field_length")
+
+            if add["field_type"] == "TEXT" and isinstance(length, int) and fields[name][1] != length:
+                return False
+
+        if any(name.lower() in fields for name in modification["delete"] if name.lower() not in added):
+            return False
+
+    return True
+
+
+def fields_moved(moves, schema):
+    return all(move["field"].lower() not in schema.fields.get(move["from_table"].lower(), {}) for move in moves)
+
+
+def domains_deleted(domains, schema):
+    return not any(domain.lower() in schema.domains for domain in domains)
+
+
+def codes_added(changes, schema):
+    return all(str(change["code"]) in schema.domains.get(name.lower(), set()) for name, change in changes.items())
+
+
+def field_group_created(table, group, schema):
+    return group.lower() in schema.groups.get(table.lower(), set())
+
+
+def relationship_replaced(old, new, schema):
+    """the new relationship class exists and the old one is gone"""
+    return new.lower() in schema.relationships and old.lower() not in schema.relationships | schema.tables
+
+
+def indexes_added(advice, schema):
+    return not indexes.missing(advice, schema.indexes)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+trace.py
+A module that times geoprocessing calls and writes them to a json lines trace file
+
+Each line is a span with the keys format, operation, table, rule, start, duration and outcome. Bump FORMAT when
+the keys change so traces from different runs can be compared.
+"""
+
+import functools
+import json
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+
+FORMAT = 1
+
+#: the arcpy functions outside of arcpy.management that make a round trip to the database
+_arcpy_functions = [
+    "Describe",
+    "Exists",
+    "ListFields",
+    "ListTables",
+    "ListFeatureClasses",
+    "ListDatasets",
+    "TestSchemaLock",
+]
+
+#: keyword arguments that hold the table a tool acts on, in order of preference
+_table_arguments = [
+    "in_table",
+    "in_dataset",
+    "target_table",
+    "target",
+    "origin_table",
+    "out_relationship_class",
+    "input_database",
+]
+
+_spans = []
+_enabled = False
+
+
+def _get_table(args, kwargs):
+    for key in _table_arguments:
+        if key in kwargs:
+            return os.path.basename(str(kwargs[key]))
+
+    if args:
+        return os.path.basename(str(args[0]))
+
+    return None
+
+
+def _get_rule(kwargs):
+    return kwargs.get("name") or kwargs.get("names")
+
+
+def traced(operation, function):
+    """wraps function so every call is recorded as a span"""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.time()
+        began = time.perf_counter()
+        outcome = "ok"
+
+        try:
+            return function(*args, **kwargs)
+        except Exception:
+            outcome = "error"
+
+            raise
+        finally:
+            _spans.append(
+                {
+                    "format": FORMAT,
+                    "operation": operation,
+                    "table": _get_table(args, kwargs),
+                    "rule": _get_rule(kwargs),
+                    "start": round(start, 3),
+                    "duration": round(time.perf_counter() - began, 4),
+                    "outcome": outcome,
+                }
+            )
+
+    wrapper.__traced__ = True
+
+    return wrapper
+
+
+def instrument(module, names=None):
+    """replaces the public functions of module, or only names, with traced versions"""
+    if names is None:
+        names = [name for name in dir(module) if not name.startswith("_")]
+
+    for name in names:
+        function = getattr(module, name, None)
+
+        if not callable(function) or isinstance(function, type) or getattr(function, "__traced__", False):
+            continue
+
+        setattr(module, name, traced(name, function))
+
+
+def enable():
+    """traces every arcpy.management tool and the arcpy functions that query the database in this process"""
+    global _enabled
+
+    if _enabled:
+        return
+
+    import arcpy
+
+    instrument(arcpy.management)
+    instrument(arcpy, _arcpy_functions)
+    _enabled = True
+
+
+def is_enabled():
+    return _enabled
+
+
+def drain():
+    """returns the spans recorded so far and forgets them"""
+    spans = list(_spans)
+    _spans.clear()
+
+    return spans
+
+
+def extend(spans):
+    """adds spans recorded in another process"""
+    _spans.extend(spans)
+
+
+def write(path, spans):
+    with open(path, "w", encoding="utf-8") as trace_file:
+        trace_file.writelines(json.dumps(span, sort_keys=True) + "\n" for span in spans)
+
+    return path
+
+
+def finish(path):
+    """writes the spans recorded so far to path and prints the summary"""
+    spans = drain()
+    write(path, spans)
+    print(summarize(spans))
+
+
+def read(path):
+    with open(path, encoding="utf-8") as trace_file:
+        return [json.loads(line) for line in trace_file if line.strip()]
+
+
+def summarize(spans, top=10):
+    """returns the slowest calls and the totals per table and operation as text"""
+    lines = ["{} geoprocessing calls in {:.1f}s".format(len(spans), sum(span["duration"] for span in spans))]
+
+    lines.append("slowest calls")
+    for span in sorted(spans, key=lambda span: span["duration"], reverse=True)[:top]:
+        lines.append(
+            "  {:>8.2f}s {} {} {} {}".format(
+                span["duration"], span["operation"], span["table"], span["rule"] or "", span["outcome"]
+            )
+        )
+
+    for key in ("table", "operation"):
+        totals = defaultdict(lambda: [0, 0.0])
+
+        for span in spans:
+            totals[span[key]][0] += 1
+            totals[span[key]][1] += span["duration"]
+
+        lines.append("per {}".format(key))
+        for name, (count, duration) in sorted(totals.items(), key=lambda item: item[1][1], reverse=True):
+            lines.append("  {:>8.2f}s {:>4} calls {}".format(duration, count, name))
+
+    return "\n".join(lines)
+
+
+def average_durations(path):
+    """returns the mean seconds per operation in a trace file"""
+    totals = defaultdict(list)
+
+    for span in read(Path(path)):
+        totals[span["operation"]].append(span["duration"])
+
+    return {operation: sum(durations) / len(durations) for operation, durations in totals.items()}
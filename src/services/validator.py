@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+validator.py
+A module that audits whole tables against the templated constraint rules
+
+The rules built from the common.py templates are recognized by their arcade text and evaluated a column at a time
+with numpy over chunks of rows. numpy ships with arcgis pro so it is imported with arcpy where the rows are read.
+"""
+
+import csv
+import itertools
+import re
+from types import SimpleNamespace
+
+from config import config
+from rules import common
+from services import arcade
+from services.loader import preprocess
+
+TEMPLATES = {
+    "allow_empty": common.ALLOW_EMPTY,
+    "no_empty": common.NO_EMPTY,
+    "required": common.REQUIRED,
+}
+
+REPORT_COLUMNS = ["table", "objectid", "rule", "field", "value", "message"]
+
+_message_pattern = re.compile(r"'errorMessage':\s*'((?:\\.|[^'\\])*)'")
+
+
+def _template_pattern(template):
+    """turns a str.format template into a regex over the preprocessed rule that captures the field and domain"""
+    pattern = re.escape(preprocess(template.format("__field__", "__domain__")))
+    pattern = pattern.replace("__field__", "(?P<field>\\w+)", 1).replace("__field__", "(?P=field)")
+
+    return re.compile(pattern.replace("__domain__", "(?P<domain>[^(]*)") + "$")
+
+
+_patterns = {kind: _template_pattern(template) for kind, template in TEMPLATES.items()}
+
+
+def classify(rule):
+    """returns the template check for a rule or None when the rule is not built from a template"""
+    if rule.type != config.rule_types.constraint:
+        return None
+
+    for kind, pattern in _patterns.items():
+        match = pattern.match(rule.arcade)
+
+        if match is None:
+            continue
+
+        message = _message_pattern.search(rule.arcade)
+
+        return SimpleNamespace(
+            rule=rule,
+            kind=kind,
+            field=match.group("field"),
+            message=message.group(1).replace("\\'", "'") if message else "",
+        )
+
+    return None
+
+
+def expand(rules):
+    """the rules with each composite constraint replaced by the constraints it is built from"""
+    return [member for rule in rules for member in getattr(rule, "constraints", [rule])]
+
+
+def lookup(codes):
+    """the sorted array of a coded value domain's codes"""
+    import numpy as np
+
+    return np.array(sorted(codes))
+
+
+def _is_empty(column):
+    import numpy as np
+
+    return np.equal(column, None) | np.equal(column, "")
+
+
+def _in_domain(column, codes):
+    import numpy as np
+
+    if codes.dtype.kind in "iuf":
+        try:
+            return np.isin(column.astype(float), codes)
+        except (TypeError, ValueError):
+            #: text in a number column is compared a value at a time below
+            pass
+
+    members = frozenset(codes.tolist())
+
+    return np.frompyfunc(members.__contains__, 1, 1)(column).astype(bool)
+
+
+def find_violations(check, column, codes=None):
+    """returns a boolean array that is true for the values in column that fail the check
+
+    codes is the lookup array of the field's coded value domain. without one domainname returns the value itself so
+    only empty values fail.
+    """
+    import numpy as np
+
+    empty = _is_empty(column)
+
+    if check.kind == "required":
+        text = np.where(empty, "", column).astype(str)
+
+        return empty | (np.char.lower(text) == "<null>")
+
+    in_domain = ~empty
+
+    if codes is not None and len(column):
+        in_domain &= _in_domain(np.where(empty, 0 if codes.dtype.kind in "iuf" else "", column), codes)
+
+    if check.kind == "allow_empty":
+        return ~empty & ~in_domain
+
+    return ~in_domain
+
+
+def _message(check, value):
+    if check.kind == "required":
+        return check.message
+
+    return check.message + arcade.text(value)
+
+
+def get_columns(checks):
+    """the fields the checks read, once each, in the order they are first used"""
+    return list(dict.fromkeys(check.field.lower() for check in checks))
+
+
+def validate_table(table, checks, chunks, codes=None):
+    """evaluates the checks against chunks of rows
+
+    each chunk is a list of (objectid, value, ...) rows with a value for each of the get_columns fields.
+    returns the number of violations per check and a report row for every violation.
+    """
+    import numpy as np
+
+    codes = codes or {}
+    columns = get_columns(checks)
+    counts = [0] * len(checks)
+    violations = []
+
+    for rows in chunks:
+        if not rows:
+            continue
+
+        data = np.empty((len(rows), len(rows[0])), dtype=object)
+        data[:] = rows
+        objectids = data[:, 0]
+
+        for index, check in enumerate(checks):
+            column = data[:, columns.index(check.field.lower()) + 1]
+            failed = find_violations(check, column, codes.get(check.field.lower()))
+            counts[index] += int(failed.sum())
+
+            for objectid, value in zip(objectids[failed], column[failed], strict=True):
+                violations.append(
+                    {
+                        "table": table,
+                        "objectid": objectid,
+                        "rule": check.rule.rule_name,
+                        "field": check.field,
+                        "value": arcade.text(value),
+                        "message": _message(check, value),
+                    }
+                )
+
+    summary = [
+        {"table": table, "rule": check.rule.rule_name, "kind": check.kind, "field": check.field, "violations": count}
+        for check, count in zip(checks, counts, strict=True)
+    ]
+
+    return summary, violations
+
+
+def validate_rows(table, checks, rows, store=None):
+    """the naive loop, evaluating every check's arcade against every row one at a time"""
+    columns = get_columns(checks)
+    counts = [0] * len(checks)
+
+    for row in rows:
+        feature = arcade.Feature(dict(zip(columns, row[1:], strict=True)), table=table)
+
+        for index, check in enumerate(checks):
+            if not arcade.is_valid(arcade.evaluate(check.rule.arcade, feature, store)):
+                counts[index] += 1
+
+    return counts
+
+
+def read_chunks(table_path, fields, chunk_size):
+    """yields lists of up to chunk_size (objectid, value, ...) rows"""
+    import arcpy
+
+    with arcpy.da.SearchCursor(str(table_path), ["OID@", *fields]) as cursor:
+        while True:
+            rows = list(itertools.islice(cursor, chunk_size))
+
+            if not rows:
+                return
+
+            yield rows
+
+
+def load_domains(sde):
+    """reads every coded value domain in the geodatabase once as a dictionary of name to lookup array"""
+    import arcpy
+
+    return {
+        domain.name: lookup(domain.codedValues)
+        for domain in arcpy.da.ListDomains(str(sde))
+        if domain.domainType == "CodedValue"
+    }
+
+
+def validate_group(group, domains, chunk_size):
+    """validates the templated constraints of a rule group against every row in its table"""
+    import arcpy
+
+    fields = {field.name.lower(): field for field in arcpy.ListFields(str(group.table_path))}
+    checks = []
+
+    for rule in expand(group.meta_rules):
+        check = classify(rule)
+
+        #: haskey is false for a field the table does not have so the rule never fails
+        if check is not None and check.field.lower() in fields:
+            checks.append(check)
+
+    if not checks:
+        return [], []
+
+    codes = {
+        check.field.lower(): domains[fields[check.field.lower()].domain]
+        for check in checks
+        if fields[check.field.lower()].domain in domains
+    }
+    column_names = [fields[column].name for column in get_columns(checks)]
+
+    return validate_table(group.name, checks, read_chunks(group.table_path, column_names, chunk_size), codes)
+
+
+def write_report(path, violations):
+    with open(path, "w", newline="", encoding="utf-8") as report_file:
+        writer = csv.DictWriter(report_file, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(violations)
+
+    return path
+
+
+def format_summary(summary):
+    lines = []
+
+    for item in summary:
+        lines.append(
+            "{}: {} {} ({}) {} violations".format(
+                item["table"], item["rule"], item["field"], item["kind"], item["violations"]
+            )
+        )
+
+    lines.append("{} violations in {} rules".format(sum(item["violations"] for item in summary), len(summary)))
+
+    return "\n".join(lines)
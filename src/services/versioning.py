@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+versioning.py
+A module that registers a table as versioned with editor tracking or takes both away
+
+A Table has the name, table_path and call counts of a rule group so the scheduler can run the tables concurrently,
+each worker with its own connection.
+"""
+
+import os
+
+
+class Table(object):
+    def __init__(self, sde, name):
+        self.name = name
+        self.table_path = os.path.join(str(sde), name)
+        self.meta_rules = []
+        self.calls_issued = 0
+        self.calls_saved = 0
+
+    def version(self):
+        import arcpy
+
+        print("versioning {}".format(self.name))
+
+        self.calls_issued += 1
+        arcpy.management.EnableEditorTracking(
+            in_dataset=self.table_path,
+            creator_field="CreatedBy",
+            creation_date_field="CreatedOn",
+            last_editor_field="EditedBy",
+            last_edit_date_field="ModifiedOn",
+            add_fields="ADD_FIELDS",
+            # record_dates_in='UTC',
+        )
+
+        self.calls_issued += 1
+        arcpy.management.RegisterAsVersioned(
+            in_dataset=self.table_path,
+            edit_to_base="NO_EDITS_TO_BASE",
+        )
+
+    def unversion(self):
+        import arcpy
+
+        print("unversioning {}".format(self.name))
+
+        self.calls_issued += 1
+        arcpy.management.UnregisterAsVersioned(
+            in_dataset=self.table_path,
+            keep_edit="NO_KEEP_EDIT",
+        )
+
+        self.calls_issued += 1
+        arcpy.management.DisableEditorTracking(
+            in_dataset=self.table_path,
+            creator="DISABLE_CREATOR",
+            creation_date="DISABLE_CREATION_DATE",
+            last_editor="DISABLE_LAST_EDITOR",
+            last_edit_date="DISABLE_LAST_EDIT_DATE",
+        )
+
+
+def get_tables(sde, names, skip_tables):
+    """a Table for each owner qualified name that is not skipped"""
+    return [Table(sde, name) for name in names if name.split(".")[-1] not in skip_tables]
+
+
+def touched(names, steps):
+    """the owner qualified names of the tables the migration steps change"""
+    tables = {table.lower() for step in steps for table in step.tables}
+
+    return [name for name in names if name.split(".")[-1].lower() in tables]
+
+
+def format_timings(results):
+    """the seconds each table took, slowest first, and the total"""
+    lines = [
+        "  {:<40} {:>8.1f}s{}".format(result["table"], result["seconds"], "" if result["error"] is None else " failed")
+        for result in sorted(results, key=lambda result: -result["seconds"])
+    ]
+    lines.append("  {:<40} {:>8.1f}s".format("total", sum(result["seconds"] for result in results)))
+
+    return "\n".join(lines)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_analyzer.py
+A module that tests the static arcade analysis
+"""
+
+import rules
+from rules import common
+from services import analyzer
+from services.loader import load_rule_for
+
+table_fields = ["FacilityName", "CountyFIPS", "FacilityCity", "FacilityZIP", "Comments", "Shape"]
+
+
+def test_template_fields():
+    analysis = analyzer.analyze(common.constrain_to_domain("WellClass", domain="UICWellClassDomain"))
+
+    assert analysis.fields == {"wellclass"}
+    assert not analysis.geometry
+    assert not analysis.dynamic
+
+
+def test_haskey_variables_are_resolved():
+    analysis = analyzer.analyze(load_rule_for("facility", "idCalculation"))
+
+    assert analysis.fields == {"countyfips", "guid"}
+    assert not analysis.geometry
+
+
+def test_spatial_calculations_only_trigger_on_shape():
+    arcade = rules.load("facility").location_calculation.arcade
+
+    assert analyzer.get_triggering_fields(arcade, table_fields, "Shape") == ["Shape"]
+
+
+def test_geometry_function_is_geometry_use():
+    analysis = analyzer.analyze(rules.load("well").id_calculation.arcade)
+
+    assert analysis.fields == {"wellclass", "guid"}
+    assert analysis.geometry
+
+
+def test_unresolved_fields_fall_back_to_every_field():
+    arcade = "var name = lower('COMMENTS'); return $feature[name];"
+
+    assert analyzer.analyze(arcade).dynamic
+    assert analyzer.get_triggering_fields(arcade, table_fields, "Shape") == table_fields
+
+
+def test_no_fields_fall_back_to_every_field():
+    assert analyzer.get_triggering_fields("return GUID();", table_fields, "Shape") == table_fields
+
+
+def test_comments_are_ignored():
+    arcade = "// $feature.FacilityName\nreturn $feature.comments;"
+
+    assert analyzer.get_triggering_fields(arcade, table_fields, "Shape") == ["Comments"]
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_arcade.py
+A module that tests evaluating the rules without a geodatabase
+"""
+
+from datetime import datetime
+
+import pytest
+
+import rules
+from config import config
+from rules import common
+from services import arcade, geometry
+from services.loader import load_rule_for
+
+GUID = "{0F6C4B3B-1234-4C5D-9E8F-ABCDEF012345}"
+
+
+def square(x, y, size):
+    return geometry.Polygon([[(x, y), (x, y + size), (x + size, y + size), (x + size, y), (x, y)]])
+
+
+def test_every_rule_parses():
+    for name in rules.NAMES:
+        for rule in rules.load(name).RULES:
+            assert arcade.compile_script(rule.arcade).tree.kind == "program"
+
+
+def test_programs_are_cached_by_script():
+    script = "return 1 + 1;"
+
+    assert arcade.compile_script(script) is arcade.compile_script(script)
+    assert arcade.evaluate(script) == 2
+
+
+def test_fips_constraint():
+    script = load_rule_for("facility", "fipsConstraint")
+
+    assert arcade.evaluate(script, arcade.Feature({"CountyFIPS": 49001})) is True
+    assert arcade.evaluate(script, arcade.Feature({"countyfips": "49057"})) is True
+    assert arcade.evaluate(script, arcade.Feature({"CountyFIPS": None})) == {"errorMessage": "The fips code is empty."}
+    assert arcade.evaluate(script, arcade.Feature({"CountyFIPS": 49002})) == {
+        "errorMessage": "The fips code should be odd. Input: 49002"
+    }
+    assert arcade.evaluate(script, arcade.Feature({})) is True
+
+
+def test_id_calculation_uses_mid_and_right():
+    script = load_rule_for("facility", "idCalculation")
+
+    assert arcade.evaluate(script, arcade.Feature({"CountyFIPS": 49001, "GUID": GUID})) == "UTU01FEF012345"
+    assert arcade.evaluate(script, arcade.Feature({"GUID": GUID})) is None
+
+
+def test_domain_constraints():
+    store = arcade.FeatureStore()
+    store.add_domain("UICWell", "WellClass", {1: "Class I", 5: "Class V"})
+    script = common.constrain_to_domain("WellClass", domain="UICWellClassDomain")
+
+    def run(value):
+        return arcade.evaluate(script, arcade.Feature({"WellClass": value}, table="UICWell"), store)
+
+    assert run(1) is True
+    assert run(None) is True
+    assert run(3)["errorMessage"].endswith("Input: 3")
+
+
+@pytest.mark.parametrize("traversal", ["filter", "relationship"])
+def test_filter_and_relationship_traversal(traversal):
+    store = arcade.FeatureStore()
+    store.add("UICFacility", {"GUID": "{A}"})
+    store.add("UICContact", {"Facility_FK": "{A}", "ContactType": 3})
+    store.add_relationship("FacilityToContact", "UICFacility", "UICContact", "GUID", "Facility_FK")
+
+    constants = common.related("UICFacility", "UICContact", "GUID", "Facility_FK")
+    assert constants["traversal"] == "relationship"
+    assert common.related("UICFacility", "UICAuthorization", "GUID", "Facility_FK")["traversal"] == "filter"
+
+    constants["traversal"] = traversal
+    script = load_rule_for("contact", "contactType", **constants)
+    assert ("FeatureSetByRelationshipName" in script) == (traversal == "relationship")
+
+    contact = arcade.Feature({"GUID": "{C}", "Facility_FK": "{a}", "ContactType": 3}, table="UICContact")
+
+    assert arcade.evaluate(script, contact, store) == {
+        "errorMessage": "There is no owner, owner/operator, or legal representative contact type for this facility."
+    }
+
+    store.add("UICContact", {"Facility_FK": "{A}", "ContactType": 1})
+
+    assert arcade.evaluate(script, contact, store) is True
+
+    orphan = arcade.Feature({"GUID": "{D}", "Facility_FK": None, "ContactType": 3}, table="UICContact")
+
+    assert arcade.evaluate(script, orphan, store) == {
+        "errorMessage": "There are no facilities related to this contact."
+    }
+
+
+def test_filter_reads_only_requested_fields():
+    store = arcade.FeatureStore()
+    store.add("UICFacility", {"GUID": "{A}", "CountyFIPS": 49001})
+
+    script = (
+        "var fk = '{A}';"
+        "var set = FeatureSetByName($datastore, 'UICFacility', ['guid'], false);"
+        "return first(filter(set, 'GUID = @fk')).countyfips;"
+    )
+
+    with pytest.raises(arcade.ArcadeError, match="countyfips"):
+        arcade.evaluate(script, None, store)
+
+
+def test_location_calculation_sets_every_field():
+    store = arcade.FeatureStore()
+    store.add("Counties", {"FIPS": 1}, square(0, 0, 10))
+    store.add("Counties", {"FIPS": 3}, square(10, 0, 10))
+    store.add("Municipalities", {"NAME": "Salt Lake City"}, square(0, 0, 5))
+    store.add("ZipCodes", {"ZIP5": 84101}, square(0, 0, 20))
+    script = rules.load("facility").location_calculation.arcade
+
+    def run(shape):
+        return arcade.calculated_attributes(arcade.evaluate(script, arcade.Feature({}, shape, "UICFacility"), store))
+
+    assert run(square(2, 2, 2)) == {"CountyFIPS": 49001, "FacilityCity": "Salt Lake City", "FacilityZIP": 84101}
+    assert run(square(8, 2, 8))["CountyFIPS"] == 49003
+    assert run(geometry.Point(15, 5)) == {"CountyFIPS": 49003, "FacilityCity": None, "FacilityZIP": 84101}
+    assert run(square(50, 50, 1)) == {}
+
+
+def test_point_lookup_matches_the_area_lookup():
+    store = arcade.FeatureStore()
+    store.add("Counties", {"FIPS": 1}, square(0, 0, 10))
+    store.add("Counties", {"FIPS": 3}, square(5, 0, 10))
+    store.add("UICFacility", {"GUID": "{A}"}, square(2, 2, 4))
+    store.add("UICFacility", {"GUID": "{B}"}, square(4, 4, 4))
+
+    for name in ("idCalculation", "facilityCalculation"):
+        point = load_rule_for("well", name, shape_type=config.shape_types.point)
+        polygon = load_rule_for("well", name, shape_type=config.shape_types.polygon)
+
+        for x, y in [(1, 1), (7, 5), (5, 5), (12, 1), (30, 30)]:
+            well = arcade.Feature({"WellClass": 1, "GUID": GUID}, geometry.Point(x, y), "UICWell")
+
+            assert arcade.evaluate(point, well, store) == arcade.evaluate(polygon, well, store)
+
+    assert "area(" not in rules.load("well").id_calculation.arcade
+
+
+def test_calculated_attributes():
+    assert arcade.calculated_attributes(1, "Field") == {"Field": 1}
+    assert arcade.calculated_attributes({"result": 1}, "Field") == {"Field": 1}
+    assert arcade.calculated_attributes({"result": {"attributes": {"A": 1, "B": None}}}) == {"A": 1, "B": None}
+    assert arcade.calculated_attributes({"errorMessage": "no"}, "Field") == {}
+
+
+def test_date_math():
+    script = load_rule_for("operatingStatus", "dateConstraint")
+
+    assert arcade.evaluate(script, arcade.Feature({"OperatingStatusDate": datetime(2000, 1, 1)})) is True
+    assert "errorMessage" in arcade.evaluate(script, arcade.Feature({"OperatingStatusDate": datetime(1900, 1, 1)}))
+    assert arcade.evaluate("return datediff(dateadd(date(2020, 0, 31), 1, 'months'), date(2020, 0, 31), 'days');") == 29
+
+
+def test_text_formats():
+    assert arcade.evaluate("return text(1, '00') + text(49.5) + text(1234.5, '#,###.00');") == "0149.51,234.50"
+    assert arcade.evaluate("return text(date(2020, 11, 25), 'YYYY-MM-DD');") == "2020-12-25"
+
+
+def test_scripts_without_return_give_the_last_value():
+    store = arcade.FeatureStore()
+    feature = arcade.Feature({"RemediationProjectType": 12, "WellSubClass": 5001})
+
+    result = arcade.evaluate(load_rule_for("well", "remediationConstraint_update"), feature, store)
+
+    assert result["errorMessage"].endswith("Input: 12")
+
+
+def test_unsupported_syntax_is_reported():
+    with pytest.raises(arcade.ArcadeError, match="line 2"):
+        arcade.compile_script("var a = 1;\nfor (var i = 0; i < 2; i++) {}")
+
+
+def test_polygon_intersection_area():
+    overlap = geometry.intersection(square(0, 0, 10), square(5, 5, 10))
+
+    assert geometry.area(overlap) == pytest.approx(25)
+    assert not geometry.intersects(square(0, 0, 1), square(2, 2, 1))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_cost.py
+A module that tests estimating the work a rule does per edit
+"""
+
+import rules
+from config import config
+from models.ruletypes import Calculation, Constraint
+from services import cost
+
+
+def test_contact_type_counts():
+    counts, total = cost.estimate(rules.load("contact").contact_type_constraint.arcade)
+
+    #: the facility and its contacts are read through the FacilityToContact relationship class
+    assert counts == {"featureset": 2, "filter": 0, "intersects": 0, "loop": 1, "geometry": 0}
+    assert total == 2 * cost.WEIGHTS["featureset"] + cost.WEIGHTS["loop"]
+
+
+def test_work_in_loops_and_functions_is_multiplied():
+    script = """
+    function largest(items) {
+      for (var item in items) {
+        area(intersection(item, $feature));
+      }
+    }
+
+    var set = FeatureSetByName($datastore, 'Counties', ['FIPS'], true);
+    largest(intersects(set, $feature));
+    largest(intersects(set, $feature));
+
+    for (var key in ['a', 'b']) {
+      area($feature);
+    }
+    """
+
+    counts, _ = cost.estimate(script)
+
+    assert counts == {
+        "featureset": 1,
+        "filter": 0,
+        "intersects": 2,
+        "loop": 2,
+        "geometry": 4 * cost.LOOP_ROWS + 1,
+    }
+
+
+def test_table_report_and_budget():
+    query = Constraint(
+        "Query", "Query", "var set = FeatureSetByName($datastore, 'T'); return count(filter(set, '1=1'));"
+    )
+    query.triggers = [config.triggers.update, config.triggers.delete]
+    cheap = Calculation("Cheap", "Field", "return 1;")
+
+    report = cost.table_report("Table", [query, cheap])
+
+    assert report["edits"] == {"INSERT": 0, "UPDATE": 15, "DELETE": 15}
+    assert cost.over_budget([report], 10) == [("Table", "Query", 15)]
+    assert cost.over_budget([report], 15) == []
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_diff.py
+A module that tests comparing rules against the rules in a table
+"""
+
+from types import SimpleNamespace
+
+from config import config
+from models.ruletypes import Calculation, Constraint, MultiCalculation
+from services import diff
+
+fields = ["FacilityName", "CountyFIPS"]
+
+
+def get_fields(rule):
+    return fields
+
+
+def existing_rule(rule, **overrides):
+    values = {
+        "name": rule.rule_name,
+        "type": "esriARTConstraint" if rule.type == config.rule_types.constraint else "esriARTCalculation",
+        "isEditable": rule.editable == config.editable.yes,
+        "errorNumber": getattr(rule, "error_number", -1),
+        "scriptExpression": rule.arcade.replace("\n", "\r\n"),
+        "triggeringEvents": ["esriARTEInsert"],
+        "triggeringFields": [field.upper() for field in fields],
+    }
+    values.update(overrides)
+
+    return SimpleNamespace(**values)
+
+
+def test_unchanged_rules_are_skipped():
+    rules = [Calculation("name", "Field", "return 1;"), Constraint("name", "Rule", "return true;")]
+    existing = {rule.rule_name: diff.existing_state(existing_rule(rule)) for rule in rules}
+
+    assert diff.plan(rules, existing, get_fields) == []
+    assert diff.legacy_call_count(rules, existing) == 2
+
+
+def test_changed_arcade_is_altered():
+    rule = Calculation("name", "Field", "return 2;")
+    existing = {rule.rule_name: diff.existing_state(existing_rule(rule, scriptExpression="return 1;"))}
+
+    assert diff.plan([rule], existing, get_fields) == [("alter", rule)]
+
+
+def test_changed_triggering_fields_are_altered():
+    rule = Calculation("name", "Field", "return 2;")
+    existing = {rule.rule_name: diff.existing_state(existing_rule(rule, triggeringFields=["FacilityName"]))}
+
+    assert diff.plan([rule], existing, get_fields) == [("alter", rule)]
+
+
+def test_changed_editability_is_recreated():
+    rule = Calculation("name", "Field", "return 1;")
+    existing = {rule.rule_name: diff.existing_state(existing_rule(rule, isEditable=False))}
+
+    steps = diff.plan([rule], existing, get_fields)
+
+    assert [(operation, step.rule_name, step.type) for operation, step in steps] == [
+        ("delete", rule.rule_name, rule.type),
+        ("add", rule.rule_name, rule.type),
+    ]
+    assert steps[1][1] is rule
+
+
+def test_changed_type_deletes_the_existing_type():
+    old = Constraint("name", "Rule", "return true;")
+    rule = Calculation("name", "Rule", "return 1;")
+    rule.rule_name = old.rule_name
+    existing = {old.rule_name: diff.existing_state(existing_rule(old))}
+
+    steps = diff.plan([rule], existing, get_fields)
+
+    assert [(operation, step.type) for operation, step in steps] == [
+        ("delete", config.rule_types.constraint),
+        ("add", config.rule_types.calculation),
+    ]
+    assert diff.count_changed([rule], steps) == 1
+
+
+def test_missing_rules_are_added():
+    rule = Constraint("name", "Rule", "return true;")
+
+    assert diff.plan([rule], {}, get_fields) == [("add", rule)]
+    assert diff.legacy_call_count([rule], {}) == 2
+
+
+def test_replaced_rules_are_deleted_first():
+    old = Calculation("name", "Field", "return 1;")
+    rule = MultiCalculation("name", "Fields", ["Field", "Other"], "return {};", replaces=["Field", "Other"])
+    existing = {old.rule_name: diff.existing_state(existing_rule(old))}
+
+    steps = diff.plan([rule], existing, get_fields)
+
+    assert [(operation, step.rule_name) for operation, step in steps] == [("delete", "Field"), ("add", "Fields")]
+    assert diff.count_changed([rule], steps) == 1
+    assert diff.legacy_call_count([rule], existing) == 4
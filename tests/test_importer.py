@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_importer.py
+A module that tests rendering rules into the ImportAttributeRules csv format
+"""
+
+import csv
+
+from config import config
+from models.ruletypes import Calculation, Constant, Constraint
+from services import importer
+
+
+def test_write_csv_round_trips(tmp_path):
+    calculation = Calculation("Facility Id", "FacilityID", "return 'UTU' + $feature.CountyFIPS;")
+    calculation.triggers = [config.triggers.insert, config.triggers.update]
+    calculation.editable = config.editable.no
+    constraint = Constraint(
+        "Facility name", "FacilityName.update", "return iif(true, {\n  'errorMessage': 'a, b'\n}, true);"
+    )
+    constraint.triggers = [config.triggers.update]
+
+    path = importer.write_csv(
+        tmp_path / "UICFacility.csv", [calculation, constraint], lambda rule: ["FacilityName", "CountyFIPS"]
+    )
+
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        rows = list(csv.DictReader(csv_file))
+
+    assert list(rows[0]) == importer.COLUMNS
+    assert rows[0]["TYPE"] == "esriARTCalculation"
+    assert rows[0]["ISEDITABLE"] == "False"
+    assert rows[0]["TRIGGERINSERT"] == rows[0]["TRIGGERUPDATE"] == "True"
+    assert rows[0]["ERRORNUMBER"] == ""
+    assert rows[0]["TRIGGERINGFIELDS"] == "FacilityName;CountyFIPS"
+    assert rows[1]["TYPE"] == "esriARTConstraint"
+    assert rows[1]["TRIGGERINSERT"] == "False"
+    assert rows[1]["SCRIPTEXPRESSION"] == constraint.arcade
+    assert rows[1]["ERRORNUMBER"] == str(constraint.error_number)
+
+
+def test_duplicate_names_keep_the_last_rule():
+    first = Constant("Guid", "GUID", "Guid()")
+    second = Constant("Guid", "GUID", "GUID()")
+
+    rows = importer.render_rows([first, second], lambda rule: [])
+
+    assert len(rows) == 1
+    assert rows[0]["SCRIPTEXPRESSION"] == "return GUID();"
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_indexes.py
+A module that tests finding the columns the rules filter related tables by
+"""
+
+import rules
+from services import arcade, indexes
+
+
+def test_where_fields():
+    assert arcade.where_fields("GUID=@fk") == ["GUID"]
+    assert arcade.where_fields("well_fk = @well AND (Status IS NOT NULL OR Code IN (1, 2))") == [
+        "well_fk",
+        "Status",
+        "Code",
+    ]
+
+
+def test_lookups_follow_the_feature_set_variables():
+    script = """var set = FeatureSetByName($datastore, 'UICWell', ['GUID'], false);
+var wells = filter(set, 'Facility_FK=@fk');
+var first = filter(filter(FeatureSetByName($datastore, 'UICContact'), 'ContactType=1'), 'Facility_FK=@fk');
+function lookup(items) {
+  return filter(items, 'Unknown=1');
+}
+return count(wells);"""
+
+    assert indexes.lookups(script) == [
+        ("UICWell", "Facility_FK"),
+        ("UICContact", "Facility_FK"),
+        ("UICContact", "ContactType"),
+    ]
+
+
+def test_missing_indexes():
+    advice = indexes.advise([rules.load(name) for name in rules.NAMES])
+    columns = {(item.table, item.column.lower()) for item in advice}
+
+    assert {
+        ("UICFacility", "guid"),
+        ("UICContact", "facility_fk"),
+        ("UICWellOperatingStatus", "well_fk"),
+        ("UICCorrection", "inspection_fk"),
+    } <= columns
+
+    existing = {"uicfacility": [["GUID"]], "uiccontact": [["ContactType", "Facility_FK"]]}
+    missing = {(item.table, item.column.lower()) for item in indexes.missing(advice, existing)}
+
+    assert ("UICFacility", "guid") not in missing
+    assert ("UICContact", "facility_fk") in missing
+    assert indexes.index_name(advice[0]) == "IX_{}_{}".format(advice[0].table, advice[0].column).upper()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_journal.py
+A module that tests the deployment journal
+"""
+
+from types import SimpleNamespace
+
+from services.journal import Journal
+
+
+def _rule(arcade="return true;"):
+    return SimpleNamespace(rule_name="Rule", arcade=arcade)
+
+
+def test_journal_remembers_applied_rules(tmp_path):
+    path = tmp_path / "rules.journal.jsonl"
+    Journal(path, "dev").record("UICFacility", _rule(), "add")
+
+    journal = Journal(path, "dev")
+
+    assert journal.is_applied("UICFacility", _rule())
+    assert not journal.is_applied("UICWell", _rule())
+
+
+def test_journal_redeploys_changed_rules(tmp_path):
+    path = tmp_path / "rules.journal.jsonl"
+    Journal(path, "dev").record("UICFacility", _rule(), "alter")
+
+    assert not Journal(path, "dev").is_applied("UICFacility", _rule("return false;"))
+
+
+def test_journal_keeps_environments_apart(tmp_path):
+    path = tmp_path / "rules.journal.jsonl"
+    Journal(path, "dev").record("UICFacility", _rule(), "add")
+    Journal(path, "prod").record("UICFacility", _rule(), "add")
+
+    assert not Journal(path, "stage").is_applied("UICFacility", _rule())
+
+    Journal(path, "dev").clear()
+
+    assert not Journal(path, "dev").is_applied("UICFacility", _rule())
+    assert Journal(path, "prod").is_applied("UICFacility", _rule())
+
+    Journal(path, "prod").clear()
+
+    assert not path.exists()
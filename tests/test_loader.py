@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_loader.py
+A module that tests loading the rule modules and arcade files
+"""
+
+import os
+import re
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import rules
+from services import analyzer, loader
+
+
+def test_load_only_imports_the_requested_module():
+    for name in rules.NAMES:
+        sys.modules.pop("rules." + name, None)
+
+    module = rules.load("contact")
+
+    assert module.TABLE == "UICContact"
+    assert [name for name in rules.NAMES if "rules." + name in sys.modules] == ["contact"]
+
+
+def test_load_unknown_rule():
+    with pytest.raises(Exception, match="rule not found"):
+        rules.load("common")
+
+
+def test_arcade_is_read_on_first_use(tmp_path, monkeypatch):
+    monkeypatch.setattr(loader, "ARCADE_PATH", tmp_path)
+    (tmp_path / "table").mkdir()
+    rule_file = tmp_path / "table" / "rule.js"
+
+    arcade = loader.lazy_rule_for("table", "rule")
+    rule_file.write_text("return 1;")
+
+    assert arcade() == "return 1;"
+
+
+def test_cache_is_refreshed_when_the_file_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(loader, "ARCADE_PATH", tmp_path)
+    (tmp_path / "table").mkdir()
+    rule_file = tmp_path / "table" / "rule.js"
+    rule_file.write_text("return 1;")
+
+    assert loader.load_rule_for("table", "rule") == "return 1;"
+
+    rule_file.write_text("return 2;")
+    modified = rule_file.stat().st_mtime_ns + 1_000_000
+    os.utime(rule_file, ns=(modified, modified))
+
+    assert loader.load_rule_for("table", "rule") == "return 2;"
+
+
+def test_missing_rule_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(loader, "ARCADE_PATH", tmp_path)
+
+    with pytest.raises(Exception, match="rule file not found"):
+        loader.load_rule_for("table", "missing")
+
+
+def test_includes_and_defines(tmp_path, monkeypatch):
+    monkeypatch.setattr(loader, "ARCADE_PATH", tmp_path)
+    (tmp_path / "lookup").mkdir()
+    (tmp_path / "table").mkdir()
+    (tmp_path / "lookup" / "point.js").write_text("function f(x) {\n  return x;\n}\n")
+    (tmp_path / "table" / "rule.js").write_text(
+        "#include lookup/{shape_type}\n#include lookup/point\n#define CODES ['a', 'b']\n\n"
+        "// the codes\nvar codes = CODES;\nreturn f(KIND) + ' ' + 'kind';\n"
+    )
+
+    assert loader.load_rule_for("table", "rule", shape_type="Point", KIND="x") == (
+        "function f(x){return x;}\nvar codes=['a','b'];return f('x')+' kind';"
+    )
+
+
+def test_newlines_that_end_statements_are_kept():
+    script = "var a = 1\nvar b = a +\n  2\nreturn {\n  'c': 'd' + \"e\" +\n    'f'\n}\n"
+
+    assert loader.preprocess(script) == "var a=1\nvar b=a+2\nreturn{'c':'def'}"
+    assert loader.preprocess("return 1 - 'a' + 'b' + x.y;") == "return 1-'a'+'b'+x.y;"
+
+
+def test_every_rule_is_smaller_and_behaves_the_same():
+    groups = [SimpleNamespace(name=name, meta_rules=rules.load(name).RULES) for name in rules.NAMES]
+
+    for row in loader.size_report(groups):
+        assert row["deployed"] <= row["source"]
+
+    for group in groups:
+        for rule in group.meta_rules:
+            assert analyzer.analyze(rule.source).fields == analyzer.analyze(rule.arcade).fields
+
+
+def test_names_are_kept_apart_from_dollar_names():
+    assert loader.preprocess("return $feature.x;") == "return $feature.x;"
+    assert loader.preprocess("if (x) { return $feature.y }") == "if(x){return $feature.y}"
+
+    for name in rules.NAMES:
+        for rule in rules.load(name).RULES:
+            assert re.search(r"\w\$", rule.arcade) is None, "{} {}".format(name, rule.rule_name)
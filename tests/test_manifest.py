@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_manifest.py
+A module that tests compiling rules into a manifest
+"""
+
+import json
+
+import pytest
+
+import rules
+from services import manifest, validator
+
+
+def test_manifest_round_trips_every_rule(tmp_path):
+    modules = {name: rules.load(name) for name in rules.NAMES}
+    path = manifest.write(tmp_path / "rules.manifest.json", manifest.build(modules, "test"))
+
+    tables = manifest.read(path)
+
+    assert list(tables) == rules.NAMES
+
+    for name, module in modules.items():
+        table, table_rules = tables[name]
+
+        assert table == module.TABLE
+        assert [manifest.rule_to_dict(rule) for rule in table_rules] == [
+            manifest.rule_to_dict(rule) for rule in module.RULES
+        ]
+        assert [type(rule) for rule in table_rules] == [type(rule) for rule in module.RULES]
+
+
+def test_manifest_rejects_other_formats(tmp_path):
+    path = tmp_path / "rules.manifest.json"
+    path.write_text(json.dumps({"format": manifest.FORMAT + 1, "tables": {}}))
+
+    with pytest.raises(Exception, match="not supported"):
+        manifest.read(path)
+
+
+def test_manifest_rejects_edited_rules(tmp_path):
+    data = manifest.build({"area_of_review": rules.load("area_of_review")}, "test")
+    data["tables"]["area_of_review"]["rules"][0]["arcade"] = "return 1;"
+    path = manifest.write(tmp_path / "rules.manifest.json", data)
+
+    with pytest.raises(Exception, match="does not match its hash"):
+        manifest.read(path)
+
+
+def test_manifest_keeps_the_members_of_composites(tmp_path):
+    modules = {name: rules.load(name) for name in rules.NAMES}
+    tables = manifest.read(manifest.write(tmp_path / "rules.manifest.json", manifest.build(modules, "test")))
+
+    for name, module in modules.items():
+        expected = validator.expand(module.RULES)
+        members = validator.expand(tables[name][1])
+
+        assert [manifest.rule_to_dict(rule) for rule in members] == [manifest.rule_to_dict(rule) for rule in expected]
+        assert [validator.classify(rule) is None for rule in members] == [
+            validator.classify(rule) is None for rule in expected
+        ]
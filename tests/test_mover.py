@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_mover.py
+A module that tests copying a field from a parent table to the rows that reference it
+"""
+
+import sqlite3
+
+from services import mover
+
+MOVE = {
+    "from_table": "UICFacility",
+    "key": "GUID",
+    "field": "FacilityType",
+    "to_table": "UICWell",
+    "foreign_key": "Facility_FK",
+    "to_field": "ClassIFacilityType",
+}
+
+
+def database():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE UICFacility (GUID TEXT PRIMARY KEY, FacilityType TEXT)")
+    connection.execute("CREATE TABLE UICWell (OBJECTID INTEGER PRIMARY KEY, Facility_FK TEXT, ClassIFacilityType TEXT)")
+    connection.executemany("INSERT INTO UICFacility VALUES (?, ?)", [("{A}", "C"), ("{B}", None), ("{C}", "I")])
+    connection.executemany(
+        "INSERT INTO UICWell VALUES (?, ?, ?)",
+        [(1, "{A}", None), (2, "{A}", "C"), (3, "{B}", "I"), (4, "{C}", "C"), (5, "{Z}", None), (6, None, "I")],
+    )
+
+    return connection
+
+
+def test_update_only_writes_rows_that_are_null_or_different():
+    connection = database()
+
+    assert connection.execute(mover.count_sql(MOVE)).fetchone()[0] == 3
+
+    connection.execute(mover.update_sql(MOVE))
+
+    assert connection.execute("SELECT ClassIFacilityType FROM UICWell ORDER BY OBJECTID").fetchall() == [
+        ("C",),
+        ("C",),
+        (None,),
+        ("I",),
+        (None,),
+        ("I",),
+    ]
+    assert connection.execute(mover.count_sql(MOVE)).fetchone()[0] == 0
+
+
+def test_cursor_changes_match_the_update():
+    connection = database()
+    values = dict(connection.execute("SELECT GUID, FacilityType FROM UICFacility"))
+    rows = connection.execute("SELECT OBJECTID, Facility_FK, ClassIFacilityType FROM UICWell").fetchall()
+
+    assert list(mover.find_changes(rows, values)) == [(1, "C"), (3, None), (4, "I")]
+    assert list(mover.chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
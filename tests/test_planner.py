@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_planner.py
+A module that tests planning a deployment from a snapshot
+"""
+
+from models.ruletypes import Calculation, Constraint
+from services import analyzer, diff, planner
+
+fields = ["FacilityName", "CountyFIPS", "Shape"]
+
+
+def get_snapshot(rules):
+    return {
+        "fields": fields,
+        "shape_field": "Shape",
+        "rules": {
+            rule.rule_name: diff.desired_state(rule, analyzer.get_triggering_fields(rule.arcade, fields, "Shape"))
+            for rule in rules
+        },
+    }
+
+
+def test_plan_only_changed_rules():
+    unchanged = Constraint("name", "FacilityName", "return !isempty($feature.FacilityName);")
+    changed = Calculation("fips", "CountyFIPS", "return 49001;")
+    snapshot = get_snapshot([unchanged, changed])
+    changed.arcade = "return 49003;"
+    added = Calculation("id", "FacilityID", "return $feature.CountyFIPS;")
+
+    plan = planner.plan_table("UICFacility", [unchanged, changed, added], snapshot)
+
+    assert plan["calls"] == [{"operation": "alter", "rule": "CountyFIPS"}, {"operation": "add", "rule": "FacilityID"}]
+    assert plan["unchanged"] == 1
+    assert plan["legacy_calls"] == 4
+    assert not plan["touches_every_rule"]
+
+
+def test_summary_estimates_with_timings():
+    rules = [Calculation("fips", "CountyFIPS", "return 49001;"), Calculation("id", "FacilityID", "return 1;")]
+    plan = planner.plan_table("UICFacility", rules)
+
+    summary = planner.summarize([plan], {"add": 2.5, "alter": 1.0, "delete": 1.0})
+
+    assert plan["touches_every_rule"]
+    assert summary["calls"] == 2
+    assert summary["legacy_calls"] == 4
+    assert summary["estimated_seconds"] == 5.0
+    assert "warning: every rule in UICFacility will be changed" in planner.format_summary(summary)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_recalculator.py
+A module that tests recalculating the facility locations in bulk
+"""
+
+import random
+
+import rules
+from services import arcade, geometry, recalculator
+
+
+def square(x, y, size):
+    return geometry.Polygon([[(x, y), (x, y + size), (x + size, y + size), (x + size, y)]])
+
+
+def build(generator):
+    store = arcade.FeatureStore()
+    rows = {location.table: [] for location in recalculator.LOCATIONS}
+
+    for location in recalculator.LOCATIONS:
+        for index in range(40):
+            shape = square(generator.uniform(0, 90), generator.uniform(0, 90), generator.choice([5, 10, 20]))
+            value = index + 1 if location.source != "NAME" else "city {}".format(index)
+            rows[location.table].append((value, shape))
+            store.add(location.table, {location.source: value}, shape)
+
+    return store, {table: recalculator.Boundaries(table_rows) for table, table_rows in rows.items()}
+
+
+def test_tree_finds_the_same_candidates_as_a_scan():
+    generator = random.Random(3)
+    shapes = [
+        square(generator.uniform(0, 100), generator.uniform(0, 100), generator.uniform(1, 10)) for _ in range(500)
+    ]
+    tree = geometry.STRtree(shapes)
+
+    for _ in range(50):
+        probe = square(generator.uniform(0, 100), generator.uniform(0, 100), 5)
+        expected = [index for index, shape in enumerate(shapes) if geometry.extents_overlap(shape.extent, probe.extent)]
+
+        assert tree.query(probe.extent) == expected
+
+
+def test_matches_the_arcade_calculations():
+    generator = random.Random(11)
+    store, boundaries = build(generator)
+    script = rules.load("facility").location_calculation.arcade
+
+    empty = {location.field: None for location in recalculator.LOCATIONS}
+    facilities = []
+
+    for index in range(150):
+        if index % 3:
+            shape = square(generator.uniform(-10, 100), generator.uniform(-10, 100), generator.uniform(0.5, 8))
+        else:
+            shape = geometry.Point(generator.uniform(0, 100), generator.uniform(0, 100))
+
+        facilities.append((index, shape, dict(empty)))
+
+    changes, rejected = recalculator.find_changes(facilities, boundaries)
+
+    for objectid, shape, _ in facilities:
+        result = arcade.evaluate(script, arcade.Feature({}, shape, recalculator.TABLE), store)
+
+        if recalculator.is_rejected(result):
+            assert result == recalculator.NO_INTERSECTION
+            assert objectid in rejected and objectid not in changes
+        else:
+            written = {
+                field: value for field, value in arcade.calculated_attributes(result).items() if value is not None
+            }
+
+            assert objectid not in rejected
+            assert changes.get(objectid, {}) == written
+
+
+def test_fips_formatting():
+    assert recalculator.format_fips(1) == 49001
+    assert recalculator.format_fips(49) == 49049
+    assert recalculator.format_fips(recalculator.NO_INTERSECTION) is None
+
+
+def test_only_changed_rows_are_returned():
+    boundaries = {
+        "Counties": recalculator.Boundaries([(1, square(0, 0, 10)), (3, square(10, 0, 10)), (5, square(20, 0, 10))]),
+        "Municipalities": recalculator.Boundaries([("Salt Lake City", square(0, 0, 10))]),
+        "ZipCodes": recalculator.Boundaries([(84101, square(0, 0, 20))]),
+    }
+    facilities = [
+        (1, square(1, 1, 2), {"CountyFIPS": 49001, "FacilityCity": "Salt Lake City", "FacilityZIP": "84101"}),
+        (2, square(12, 1, 2), {"CountyFIPS": 49001, "FacilityCity": None, "FacilityZIP": 84101}),
+        (3, square(50, 50, 2), {"CountyFIPS": 49001, "FacilityCity": None, "FacilityZIP": 84101}),
+        (4, None, {"CountyFIPS": None, "FacilityCity": None, "FacilityZIP": None}),
+        (5, square(22, 1, 2), {"CountyFIPS": None, "FacilityCity": "Salt Lake City", "FacilityZIP": None}),
+    ]
+
+    changes, rejected = recalculator.find_changes(facilities, boundaries)
+
+    assert changes == {2: {"CountyFIPS": 49003}}
+    assert rejected == {3: ["FacilityZIP"], 4: ["CountyFIPS", "FacilityCity", "FacilityZIP"], 5: ["FacilityZIP"]}
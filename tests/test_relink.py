@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_relink.py
+A module that tests linking contacts to their facility from the cross reference table
+"""
+
+import pytest
+
+from services import relink
+
+
+def test_canonical_guid():
+    assert relink.canonical_guid("{0f6c4b3b-1234-4c5d-9e8f-abcdef012345}") == "0F6C4B3B-1234-4C5D-9E8F-ABCDEF012345"
+    assert relink.canonical_guid("0F6C4B3B-1234-4C5D-9E8F-ABCDEF012345") == "0F6C4B3B-1234-4C5D-9E8F-ABCDEF012345"
+    assert relink.canonical_guid(None) is None
+
+
+def test_only_contacts_with_a_different_facility_change():
+    xref = [("A", "F1"), ("B", "F2"), ("B", "F3"), ("D", "F4"), ("E", "F5")]
+    contacts = [(1, "{a}", None), (2, "{b}", "{f3}"), (3, "{c}", None), (4, "{e}", "{F1}")]
+
+    assert list(relink.changes(relink.merge_join(iter(xref), iter(contacts)))) == [(1, "{F1}"), (4, "{F5}")]
+
+
+def test_pages_read_until_a_short_page():
+    rows = [("A", "F1"), ("B", "F2"), ("C", "F3"), ("D", "F4"), ("E", "F5")]
+    calls = []
+
+    def fetch(size, after):
+        calls.append(after)
+        start = 0 if after is None else rows.index(after) + 1
+
+        return rows[start : start + size]
+
+    assert list(relink.pages(fetch, 2, lambda row: row)) == rows
+    assert calls == [None, ("B", "F2"), ("D", "F4")]
+
+
+def test_unordered_rows_are_rejected():
+    with pytest.raises(Exception, match="not ordered"):
+        list(relink.merge_join(iter([("A", "F1")]), iter([(1, "B", None), (2, "A", None)])))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_ruletypes.py
+A module that tests the composite constraints against the constraints they are built from
+"""
+
+import random
+
+import rules
+from config import config
+from models.ruletypes import CompositeConstraint, Constraint
+from rules import common
+from services import arcade, validator
+
+
+def test_composite_replaces_and_triggers():
+    insert = Constraint("Type", "Type", common.constrain_to_domain("Type", allow_null=True, domain="Domain"))
+    update = Constraint("Type", "Type", common.constrain_to_domain("Type", allow_null=False, domain="Domain"))
+    update.triggers = [config.triggers.update]
+
+    rule = CompositeConstraint("Fields", "Table.fields", [insert, update])
+
+    assert rule.replaces == ["Type"]
+    assert rule.triggers == [config.triggers.insert, config.triggers.update]
+    assert rule.type == config.rule_types.constraint
+    assert arcade.evaluate(rule.arcade, arcade.Feature({"type": None}), edit_type="INSERT") is True
+    assert "errorMessage" in arcade.evaluate(rule.arcade, arcade.Feature({"type": None}), edit_type="UPDATE")
+
+
+def test_composites_match_the_constraints_they_replace():
+    generator = random.Random(11)
+    values = [None, "", "<null>", 1, 5, "OT", "UT", "Y"]
+
+    for name in ["contact", "inspection", "violation"]:
+        module = rules.load(name)
+        rule = module.field_constraint
+        fields = sorted({validator.classify(member).field for member in rule.constraints})
+        store = arcade.FeatureStore()
+
+        for field in fields:
+            store.add_domain(module.TABLE, field, {1: "one", "OT": "other", "UT": "utah"})
+
+        for _ in range(200):
+            feature = arcade.Feature({field: generator.choice(values) for field in fields}, table=module.TABLE)
+
+            for edit_type in [config.triggers.insert, config.triggers.update]:
+                expected = True
+
+                for member in rule.constraints:
+                    if edit_type not in member.triggers:
+                        continue
+
+                    result = arcade.evaluate(member.arcade, feature, store, edit_type)
+
+                    if result is not True:
+                        expected = result
+                        break
+
+                assert arcade.evaluate(rule.arcade, feature, store, edit_type) == expected
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_scheduler.py
+A module that tests running rule groups concurrently
+"""
+
+from models.ruletypes import Constant
+from services import scheduler
+from services.backend import FakeBackend
+
+
+class Group(object):
+    """the parts of a RuleGroup the scheduler uses"""
+
+    def __init__(self, table, rules):
+        self.name = table
+        self.table_path = "sde/" + table
+        self.meta_rules = rules
+        self.calls_issued = 0
+        self.calls_saved = 0
+
+
+def get_groups():
+    return [
+        Group(table, [Constant("Guid", "GUID", "GUID()"), Constant("State", "State", "'UT'")])
+        for table in ("UICFacility", "UICWell", "UICContact")
+    ]
+
+
+def test_run_collects_output_per_table(capsys):
+    groups = get_groups()
+
+    results, failures = scheduler.run(groups, "execute", "sde", FakeBackend(delay=0.05), jobs=3)
+    output = capsys.readouterr().out
+
+    assert failures == []
+    assert sorted(result["table"] for result in results) == ["UICContact", "UICFacility", "UICWell"]
+    assert [group.calls_issued for group in groups] == [2, 2, 2]
+
+    for table in ("UICFacility", "UICWell", "UICContact"):
+        block = "execute rules for {}\n  execute GUID rule\n  execute State rule\n".format(table)
+
+        assert block in output
+
+
+def test_run_retries_schema_locks():
+    results, failures = scheduler.run(
+        get_groups(), "execute", "sde", FakeBackend(locks={"UICWell": 2}), jobs=2, delay=0
+    )
+
+    assert failures == []
+    assert "attempt 2 of 4" in next(result for result in results if result["table"] == "UICWell")["output"]
+
+
+def test_run_reports_failures():
+    _, failures = scheduler.run(
+        get_groups(), "execute", "sde", FakeBackend(locks={"UICWell": 5}, failures=["UICContact"]), delay=0
+    )
+
+    assert sorted(failures) == ["UICContact", "UICWell"]
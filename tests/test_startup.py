@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_startup.py
+A module that tests the command line tools start without arcpy
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+def run(*args):
+    return subprocess.run([sys.executable, *args], cwd=SRC, capture_output=True, text=True)
+
+
+def test_modules_do_not_import_arcpy():
+    result = run("-c", "import sys, ar, migrations, reference, models.rule; print('arcpy' in sys.modules)")
+
+    assert result.stdout.strip() == "False"
+
+
+def test_version_without_arcpy():
+    import ar
+
+    result = run("ar.py", "--version")
+
+    assert result.returncode == 0
+    assert result.stdout.strip() == ar.VERSION
+
+
+def test_fields_without_arcpy():
+    result = run("ar.py", "fields", "--rule=facility")
+
+    assert result.returncode == 0
+    assert "FacilityID: countyfips, guid" in result.stdout
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_steps.py
+A module that tests running migration steps in dependency order
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from services import steps
+from services.backend import FakeBackend
+
+
+def noop(sde):
+    pass
+
+
+def get_steps():
+    return [
+        steps.Step("delete_tables", noop),
+        steps.Step("modify_tables", noop),
+        steps.Step("delete_domains", noop, after=["delete_tables", "modify_tables"]),
+        steps.Step("create_relationship", noop, after=["delete_tables", "modify_tables"]),
+        steps.Step("create_indexes", noop, after=["create_relationship"]),
+    ]
+
+
+def get_schema(**parts):
+    schema = SimpleNamespace(names=[], tables=set(), relationships=set(), domains={}, fields={}, groups={}, indexes={})
+    schema.__dict__.update(parts)
+
+    return schema
+
+
+def test_independent_steps_share_a_wave():
+    waves = steps.order(get_steps())
+
+    assert [[step.name for step in wave] for wave in waves] == [
+        ["delete_tables", "modify_tables"],
+        ["delete_domains", "create_relationship"],
+        ["create_indexes"],
+    ]
+
+
+def test_dependencies_that_are_not_given_are_ignored():
+    waves = steps.order(get_steps()[2:])
+
+    assert [[step.name for step in wave] for wave in waves] == [
+        ["delete_domains", "create_relationship"],
+        ["create_indexes"],
+    ]
+
+
+def test_steps_lock_the_tables_they_change_and_the_ones_they_name():
+    step = steps.Step("delete_tables", noop, tables=["UICWell"], locks=["UICToolbox"])
+
+    assert step.tables == ["UICWell"]
+    assert step.locks == ["UICWell", "UICToolbox"]
+
+
+def test_cycles_are_rejected():
+    with pytest.raises(Exception, match="depend on each other"):
+        steps.order([steps.Step("a", noop, after=["b"]), steps.Step("b", noop, after=["a"])])
+
+
+def test_applied_steps_are_skipped(capsys):
+    todo = steps.pending(
+        [
+            steps.Step("delete_tables", noop, applied=lambda schema: "uictoolbox" not in schema.tables),
+            steps.Step("create_tables", noop, applied=lambda schema: "version_information" in schema.tables),
+        ],
+        get_schema(tables={"version_information", "uictoolbox"}),
+    )
+
+    assert [step.name for step in todo] == ["delete_tables"]
+    assert "create_tables already applied" in capsys.readouterr().out
+
+
+def test_steps_after_a_failure_are_skipped(capsys):
+    results, failures = steps.run(get_steps(), "sde", FakeBackend(failures=["modify_tables"]), jobs=2)
+
+    assert sorted(result["table"] for result in results) == ["delete_tables", "modify_tables"]
+    assert failures == ["modify_tables", "delete_domains", "create_relationship", "create_indexes"]
+    assert "skipping delete_domains, modify_tables failed" in capsys.readouterr().out
+
+
+def test_fields_modified_compares_fields_that_are_added_back():
+    changes = {
+        "UICArtPen": {
+            "add": [{"field_name": "EditedBy", "field_type": "TEXT", "field_length": 40}],
+            "delete": ["EditedBy", "Remarks"],
+        }
+    }
+
+    assert steps.fields_modified(changes, get_schema(fields={"uicartpen": {"editedby": ("String", 40)}}))
+    assert not steps.fields_modified(changes, get_schema(fields={"uicartpen": {"editedby": ("String", 255)}}))
+    assert not steps.fields_modified(
+        changes, get_schema(fields={"uicartpen": {"editedby": ("String", 40), "remarks": ("String", 10)}})
+    )
+
+
+def test_probes_read_the_snapshot():
+    schema = get_schema(
+        tables={"uicartpen"},
+        relationships={"areaofreviewtoartpen"},
+        domains={"uicarttpencatype": {"5"}},
+        groups={"uicwell": {"well class"}},
+    )
+
+    assert steps.relationship_replaced("AreaOfReviewToArtificialPenetrations", "AreaOfReviewToArtPen", schema)
+    assert not steps.relationship_replaced("UICFacilityToContact", "FacilityToContact", schema)
+    assert steps.codes_added({"UICArtTPenCAType": {"code": 5, "value": "waiting"}}, schema)
+    assert not steps.domains_deleted(["UICArttPenCAType"], schema)
+    assert steps.field_group_created("UICWell", "Well Class", schema)
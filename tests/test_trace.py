@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_trace.py
+A module that tests timing geoprocessing calls
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from services import planner, trace
+
+
+def get_tools():
+    def AlterAttributeRule(in_table, name, script_expression):
+        return name
+
+    def DeleteAttributeRule(in_table, names, type):
+        raise Exception("ERROR 002556")
+
+    return SimpleNamespace(AlterAttributeRule=AlterAttributeRule, DeleteAttributeRule=DeleteAttributeRule)
+
+
+def test_instrumented_calls_are_recorded(tmp_path):
+    trace.drain()
+    tools = get_tools()
+    trace.instrument(tools)
+    trace.instrument(tools)
+
+    assert tools.AlterAttributeRule(in_table="sde/UICWell", name="WellId", script_expression="") == "WellId"
+
+    with pytest.raises(Exception):
+        tools.DeleteAttributeRule(in_table="sde/UICWell", names="Class", type="CONSTRAINT")
+
+    spans = trace.drain()
+
+    assert [(span["operation"], span["table"], span["rule"], span["outcome"]) for span in spans] == [
+        ("AlterAttributeRule", "UICWell", "WellId", "ok"),
+        ("DeleteAttributeRule", "UICWell", "Class", "error"),
+    ]
+    assert set(spans[0]) == {"format", "operation", "table", "rule", "start", "duration", "outcome"}
+
+    path = trace.write(tmp_path / "trace.jsonl", spans)
+
+    assert trace.read(path) == spans
+    assert "per table" in trace.summarize(spans)
+
+
+def test_trace_timings_estimate_a_plan(tmp_path):
+    spans = [
+        {"operation": "AlterAttributeRule", "duration": 2.0},
+        {"operation": "AlterAttributeRule", "duration": 4.0},
+        {"operation": "Describe", "duration": 1.0},
+    ]
+    path = trace.write(tmp_path / "trace.jsonl", spans)
+
+    timings = planner.read_timings(path)
+
+    assert timings["alter"] == 3.0
+    assert timings["add"] == planner.DEFAULT_TIMINGS["add"]
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_validator.py
+A module that tests validating whole tables against the templated constraints
+"""
+
+import random
+
+import rules
+from models.ruletypes import Constraint
+from rules import common
+from services import arcade, validator
+
+
+def test_classify_finds_every_template():
+    well = rules.load("well")
+    checks = [validator.classify(rule) for rule in well.RULES]
+
+    assert {(check.kind, check.field) for check in checks if check is not None} >= {
+        ("required", "WellName"),
+        ("allow_empty", "WellClass"),
+        ("no_empty", "WellClass"),
+    }
+    assert validator.classify(well.guid_constant) is None
+    assert validator.classify(Constraint("Custom", "Custom", "return true;")) is None
+
+
+def test_required_values():
+    check = validator.classify(Constraint("Name", "Name", common.constrain_to_required("Name")))
+    rows = [(1, "a"), (2, None), (3, ""), (4, "<Null>")]
+
+    summary, violations = validator.validate_table("Table", [check], [rows])
+
+    assert summary[0]["violations"] == 3
+    assert [violation["objectid"] for violation in violations] == [2, 3, 4]
+    assert violations[0]["message"] == "Name must not be empty."
+
+
+def test_domain_values():
+    allow = validator.classify(Constraint("Class", "Class", common.constrain_to_domain("WellClass", True, "Domain")))
+    deny = validator.classify(Constraint("Class", "Class", common.constrain_to_domain("WellClass", False, "Domain")))
+    rows = [(1, 1), (2, None), (3, 3), (4, 5)]
+
+    summary, violations = validator.validate_table(
+        "UICWell", [allow, deny], [rows[:2], rows[2:]], {"wellclass": validator.lookup([1, 5])}
+    )
+
+    assert [item["violations"] for item in summary] == [1, 2]
+    assert [violation["objectid"] for violation in violations] == [2, 3, 3]
+    assert violations[1]["message"].endswith("(dropdown menu). Input: 3")
+
+
+def test_matches_the_arcade_rules():
+    generator = random.Random(7)
+    checks = [
+        validator.classify(rule)
+        for name in rules.NAMES
+        for rule in validator.expand(rules.load(name).RULES)
+        if validator.classify(rule) is not None
+    ]
+    values = [None, "", "<null>", 1, 2, 5, "OT", "Y", "N"]
+    domain = [1, 5]
+    store = arcade.FeatureStore()
+
+    for check in checks:
+        store.add_domain("Table", check.field, {code: str(code) for code in domain})
+
+    columns = validator.get_columns(checks)
+    rows = [(index, *(generator.choice(values) for _ in columns)) for index in range(300)]
+
+    summary, _ = validator.validate_table(
+        "Table",
+        checks,
+        [rows[:128], rows[128:]],
+        {column: validator.lookup(domain) for column in columns},
+    )
+
+    assert [item["violations"] for item in summary] == validator.validate_rows("Table", checks, rows, store)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# * coding: utf8 *
+"""
+test_versioning.py
+A module that tests versioning tables concurrently
+"""
+
+from types import SimpleNamespace
+
+from services import scheduler, versioning
+from services.backend import FakeBackend
+
+
+def test_get_tables_skips_by_table_name():
+    tables = versioning.get_tables(
+        "sde", ["udeq.uicadmin.UICWell", "udeq.uicadmin.Counties", "UICFacility"], ["Counties"]
+    )
+
+    assert [table.name for table in tables] == ["udeq.uicadmin.UICWell", "UICFacility"]
+    assert tables[0].table_path.endswith("udeq.uicadmin.UICWell")
+
+
+def test_tables_are_timed_and_retried(capsys):
+    tables = versioning.get_tables("sde", ["UICWell", "UICFacility", "UICContact"], [])
+
+    results, failures = scheduler.run(
+        tables, "version", "sde", FakeBackend(delay=0.01, locks={"UICWell": 1}), jobs=3, delay=0
+    )
+    report = versioning.format_timings(results)
+
+    assert failures == []
+    assert all(result["seconds"] >= 0.01 for result in results)
+    assert report.splitlines()[-1].split()[0] == "total"
+    assert "UICWell" in report
+
+
+def test_only_the_tables_the_steps_change_are_touched():
+    steps = [SimpleNamespace(tables=["UICWell", "uicfacility"]), SimpleNamespace(tables=[])]
+    names = ["udeq.uicadmin.UICWell", "udeq.uicadmin.UICFacility", "udeq.uicadmin.UICInspection"]
+
+    assert versioning.touched(names, steps) == ["udeq.uicadmin.UICWell", "udeq.uicadmin.UICFacility"]
+    assert versioning.touched(names, steps[1:]) == []